@@ -2,11 +2,13 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 import asyncio
+import os
 
 from app.backend.routes import api_router
 from app.backend.database.connection import engine
 from app.backend.database.models import Base
 from app.backend.services.ollama_service import ollama_service
+from src.data.cache import get_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +31,16 @@ app.add_middleware(
 # Include all routes
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def load_dataset_snapshot():
+    """Startup event to load the dataset snapshot named by FINANCIAL_DATASETS_SNAPSHOT, if any."""
+    path = os.environ.get("FINANCIAL_DATASETS_SNAPSHOT")
+    if not path:
+        return
+    manifest = get_cache().load_snapshot(os.path.expanduser(path))
+    logger.info(f"✓ Loaded dataset snapshot of {len(manifest['tickers'])} tickers created {manifest['created_at']}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event to check Ollama availability."""
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+from src.data.cache import get_cache
+
+router = APIRouter(prefix="/cache")
+
+
+@router.get(
+    path="/stats",
+    responses={
+        200: {"description": "Cache and API usage counters per dataset and per agent"},
+    },
+)
+async def get_cache_stats():
+    """Return hit/miss, HTTP latency, retry and 429 counters for the shared data cache."""
+    return get_cache().stats()
+
+
+@router.post(
+    path="/stats/reset",
+    responses={
+        200: {"description": "Counters reset"},
+    },
+)
+async def reset_cache_stats():
+    """Zero the cache counters, e.g. before starting a new run."""
+    get_cache().reset_stats()
+    return {"success": True}
@@ -10,6 +10,7 @@ from app.backend.services.graph import create_graph, parse_hedge_fund_response,
 from app.backend.services.portfolio import create_portfolio
 from app.backend.services.backtest_service import BacktestService
 from app.backend.services.api_key_service import ApiKeyService
+from src.data.stats import track_data_age
 from src.utils.progress import progress
 from src.utils.analysts import get_agents_list
 
@@ -75,19 +76,20 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
             progress.register_handler(progress_handler)
 
             try:
-                # Start the graph execution in a background task
-                run_task = asyncio.create_task(
-                    run_graph_async(
-                        graph=graph,
-                        portfolio=portfolio,
-                        tickers=request_data.tickers,
-                        start_date=request_data.start_date,
-                        end_date=request_data.end_date,
-                        model_name=request_data.model_name,
-                        model_provider=model_provider,
-                        request=request_data,  # Pass the full request for agent-specific model access
+                # Start the graph execution in a background task, noting how old the live data it is served is
+                with track_data_age() as data_age:
+                    run_task = asyncio.create_task(
+                        run_graph_async(
+                            graph=graph,
+                            portfolio=portfolio,
+                            tickers=request_data.tickers,
+                            start_date=request_data.start_date,
+                            end_date=request_data.end_date,
+                            model_name=request_data.model_name,
+                            model_provider=model_provider,
+                            request=request_data,  # Pass the full request for agent-specific model access
+                        )
                     )
-                )
                 
                 # Start the disconnect detection task
                 disconnect_task = asyncio.create_task(wait_for_disconnect())
@@ -132,6 +134,7 @@ async def run(request_data: HedgeFundRequest, request: Request, db: Session = De
                         "decisions": parse_hedge_fund_response(result.get("messages", [])[-1].content),
                         "analyst_signals": result.get("data", {}).get("analyst_signals", {}),
                         "current_prices": result.get("data", {}).get("current_prices", {}),
+                        "data_age": data_age,
                     }
                 )
                 yield final_data.to_sse()
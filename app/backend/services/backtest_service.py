@@ -5,13 +5,8 @@ import numpy as np
 from typing import Callable, Dict, List, Optional, Any
 import asyncio
 
-from src.tools.api import (
-    get_company_news,
-    get_price_data,
-    get_prices,
-    get_financial_metrics,
-    get_insider_trades,
-)
+from src.tools.api import get_price_data
+from src.tools.async_api import prefetch_tickers
 from app.backend.services.graph import run_graph_async, parse_hedge_fund_response
 from app.backend.services.portfolio import create_portfolio
 from app.backend.services.strategies.strategy import TradingStrategy
@@ -241,18 +236,14 @@ class BacktestService:
 
         return total_value
 
-    def prefetch_data(self):
+    async def prefetch_data(self):
         """Pre-fetch all data needed for the backtest period."""
         end_date_dt = datetime.strptime(self.end_date, "%Y-%m-%d")
         start_date_dt = end_date_dt - relativedelta(years=1)
         start_date_str = start_date_dt.strftime("%Y-%m-%d")
         api_key = self.request.api_keys.get("FINANCIAL_DATASETS_API_KEY")
 
-        for ticker in self.tickers:
-            get_prices(ticker, start_date_str, self.end_date, api_key=api_key)
-            get_financial_metrics(ticker, self.end_date, limit=10, api_key=api_key)
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000, api_key=api_key)
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000, api_key=api_key)
+        await prefetch_tickers(self.tickers, start_date_str, self.end_date, news_start_date=self.start_date, api_key=api_key)
 
     def _update_performance_metrics(self, performance_metrics: Dict[str, Any]):
         """Update performance metrics using daily returns."""
@@ -307,7 +298,7 @@ class BacktestService:
         Uses the pre-compiled graph for trading decisions.
         """
         # Pre-fetch all data at the start
-        self.prefetch_data()
+        await self.prefetch_data()
 
         dates = pd.date_range(self.start_date, self.end_date, freq="B")
         performance_metrics = {
@@ -1,4 +1,5 @@
 import asyncio
+import contextvars
 import json
 import re
 from langchain_core.messages import HumanMessage
@@ -132,9 +133,10 @@ def create_graph(graph_nodes: list, graph_edges: list) -> StateGraph:
 async def run_graph_async(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request=None):
     """Async wrapper for run_graph to work with asyncio."""
     # Use run_in_executor to run the synchronous function in a separate thread
-    # so it doesn't block the event loop
+    # so it doesn't block the event loop; the thread keeps this task's context variables
     loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, lambda: run_graph(graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request))  # Use default executor
+    context = contextvars.copy_context()
+    result = await loop.run_in_executor(None, lambda: context.run(run_graph, graph, portfolio, tickers, start_date, end_date, model_name, model_provider, request))  # Use default executor
     return result
 
 
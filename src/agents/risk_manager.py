@@ -1,7 +1,7 @@
 from langchain_core.messages import HumanMessage
 from src.graph.state import AgentState, show_agent_reasoning
 from src.utils.progress import progress
-from src.tools.api import get_prices, prices_to_df
+from src.tools.api import get_price_series, prices_to_df
 import json
 import numpy as np
 import pandas as pd
@@ -27,7 +27,7 @@ def risk_management_agent(state: AgentState, agent_id: str = "risk_management_ag
     for ticker in all_tickers:
         progress.update_status(agent_id, ticker, "Fetching price data and calculating volatility")
         
-        prices = get_prices(
+        prices = get_price_series(
             ticker=ticker,
             start_date=data["start_date"],
             end_date=data["end_date"],
@@ -1,3 +1,4 @@
+from src.data.price_series import PriceSeries
 from src.graph.state import AgentState, show_agent_reasoning
 from src.tools.api import (
     get_financial_metrics,
@@ -5,7 +6,7 @@ from src.tools.api import (
     search_line_items,
     get_insider_trades,
     get_company_news,
-    get_prices,
+    get_price_series,
 )
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
@@ -85,7 +86,7 @@ def stanley_druckenmiller_agent(state: AgentState, agent_id: str = "stanley_druc
         company_news = get_company_news(ticker, end_date, limit=50, api_key=api_key)
 
         progress.update_status(agent_id, ticker, "Fetching recent price data for momentum")
-        prices = get_prices(ticker, start_date=start_date, end_date=end_date, api_key=api_key)
+        prices = get_price_series(ticker, start_date=start_date, end_date=end_date, api_key=api_key)
 
         progress.update_status(agent_id, ticker, "Analyzing growth & momentum")
         growth_momentum_analysis = analyze_growth_and_momentum(financial_line_items, prices)
@@ -163,7 +164,7 @@ def stanley_druckenmiller_agent(state: AgentState, agent_id: str = "stanley_druc
     return {"messages": [message], "data": state["data"]}
 
 
-def analyze_growth_and_momentum(financial_line_items: list, prices: list) -> dict:
+def analyze_growth_and_momentum(financial_line_items: list, prices: PriceSeries) -> dict:
     """
     Evaluate:
       - Revenue Growth (YoY)
@@ -232,8 +233,7 @@ def analyze_growth_and_momentum(financial_line_items: list, prices: list) -> dic
     #
     # We'll give up to 3 points for strong momentum
     if prices and len(prices) > 30:
-        sorted_prices = sorted(prices, key=lambda p: p.time)
-        close_prices = [p.close for p in sorted_prices if p.close is not None]
+        close_prices = prices.close.tolist()
         if len(close_prices) >= 2:
             start_price = close_prices[0]
             end_price = close_prices[-1]
@@ -344,7 +344,7 @@ def analyze_sentiment(news_items: list) -> dict:
     return {"score": score, "details": "; ".join(details)}
 
 
-def analyze_risk_reward(financial_line_items: list, prices: list) -> dict:
+def analyze_risk_reward(financial_line_items: list, prices: PriceSeries) -> dict:
     """
     Assesses risk via:
       - Debt-to-Equity
@@ -385,8 +385,7 @@ def analyze_risk_reward(financial_line_items: list, prices: list) -> dict:
     # 2. Price Volatility
     #
     if len(prices) > 10:
-        sorted_prices = sorted(prices, key=lambda p: p.time)
-        close_prices = [p.close for p in sorted_prices if p.close is not None]
+        close_prices = prices.close.tolist()
         if len(close_prices) > 10:
             daily_returns = []
             for i in range(1, len(close_prices)):
@@ -8,7 +8,7 @@ import json
 import pandas as pd
 import numpy as np
 
-from src.tools.api import get_prices, prices_to_df
+from src.tools.api import get_price_series, prices_to_df
 from src.utils.progress import progress
 
 
@@ -53,7 +53,7 @@ def technical_analyst_agent(state: AgentState, agent_id: str = "technical_analys
         progress.update_status(agent_id, ticker, "Analyzing price data")
 
         # Get the historical price data
-        prices = get_prices(
+        prices = get_price_series(
             ticker=ticker,
             start_date=start_date,
             end_date=end_date,
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 
 from datetime import datetime, timedelta
@@ -13,14 +14,10 @@ import itertools
 from src.llm.models import LLM_ORDER, OLLAMA_LLM_ORDER, get_model_info, ModelProvider
 from src.utils.analysts import ANALYST_ORDER
 from src.main import run_hedge_fund
-from src.tools.api import (
-    get_company_news,
-    get_price_data,
-    get_prices,
-    get_financial_metrics,
-    get_insider_trades,
-)
-from src.utils.display import print_backtest_results, format_backtest_row
+from src.tools.api import configure_base_url, configure_cassette, configure_price_panel, get_price_data
+from src.tools.async_api import prefetch_tickers
+from src.utils.display import print_backtest_results, format_backtest_row, print_data_stats
+from src.data.cache import get_cache
 from typing_extensions import Callable
 from src.utils.ollama import ensure_ollama_and_model
 
@@ -272,18 +269,9 @@ class Backtester:
         start_date_dt = end_date_dt - relativedelta(years=1)
         start_date_str = start_date_dt.strftime("%Y-%m-%d")
 
-        for ticker in self.tickers:
-            # Fetch price data for the entire period, plus 1 year
-            get_prices(ticker, start_date_str, self.end_date)
-
-            # Fetch financial metrics
-            get_financial_metrics(ticker, self.end_date, limit=10)
-
-            # Fetch insider trades
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000)
-
-            # Fetch company news
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000)
+        # Fetch prices for the entire period plus 1 year, financial metrics, insider trades
+        # and company news for all tickers concurrently
+        asyncio.run(prefetch_tickers(self.tickers, start_date_str, self.end_date, news_start_date=self.start_date))
 
         print("Data pre-fetch complete.")
 
@@ -652,9 +640,28 @@ if __name__ == "__main__":
         help="Use all available analysts (overrides --analysts)",
     )
     parser.add_argument("--ollama", action="store_true", help="Use Ollama for local LLM inference")
+    parser.add_argument("--data-base-url", type=str, help="Base URL of the financial data API, e.g. a local mock server. Defaults to FINANCIAL_DATASETS_BASE_URL or the public API")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record-data", type=str, metavar="PATH", help="Record every financial data API response to this cassette file")
+    cassette_group.add_argument("--replay-data", type=str, metavar="PATH", help="Serve financial data from this cassette file instead of the API")
+    parser.add_argument("--price-panel", type=str, metavar="PATH", help="Serve historical prices from this price panel file (see python -m src.tools.warm_cache --price-panel)")
+    parser.add_argument("--snapshot", type=str, metavar="PATH", help="Load this dataset snapshot bundle into the cache before running")
+    parser.add_argument("--export-snapshot", type=str, metavar="PATH", help="Write the data this run used to a dataset snapshot bundle")
 
     args = parser.parse_args()
 
+    if args.data_base_url:
+        configure_base_url(args.data_base_url)
+    if args.record_data:
+        configure_cassette(args.record_data, "record")
+    elif args.replay_data:
+        configure_cassette(args.replay_data, "replay")
+    if args.price_panel:
+        configure_price_panel(args.price_panel)
+    if args.snapshot:
+        manifest = get_cache().load_snapshot(args.snapshot)
+        print(f"Loaded dataset snapshot of {len(manifest['tickers'])} tickers created {manifest['created_at']}")
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")] if args.tickers else []
 
@@ -774,3 +781,6 @@ if __name__ == "__main__":
 
     performance_metrics = backtester.run_backtest()
     performance_df = backtester.analyze_performance()
+    print_data_stats(get_cache().stats())
+    if args.export_snapshot:
+        get_cache().export_snapshot(args.export_snapshot, tickers)
@@ -1,65 +1,857 @@
+import bisect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+from src.data.cache_store import CacheStore, default_store
+from src.data.compressed_events import CompressedEvents
+from src.data.models import CompanyFacts, CompanyNews, FinancialMetrics, InsiderTrade, LineItem, Price
+from src.data.price_series import PriceSeries
+from src.data.snapshot import read_snapshot, write_snapshot
+from src.data.stats import DataStats
+
+# How long data covering today stays fresh, in seconds. Data for past dates never expires.
+LIVE_DATA_TTLS = {
+    "prices": 15 * 60,
+    "financial_metrics": 6 * 60 * 60,
+    "line_items": 6 * 60 * 60,
+    "insider_trades": 60 * 60,
+    "company_news": 15 * 60,
+    "company_facts": 15 * 60,
+}
+
+# How long past its TTL live data may still be served while a newer copy is fetched in the background.
+# Beyond this budget callers wait for a fresh fetch.
+STALE_WHILE_REVALIDATE = {
+    "prices": 60 * 60,
+    "insider_trades": 60 * 60,
+    "company_news": 60 * 60,
+    "company_facts": 60 * 60,
+}
+
+# How long an empty response for a ticker (an ETF without fundamentals, a company without news) is
+# trusted, in seconds, whatever dates it covers. Such tickers would otherwise be refetched on every call.
+EMPTY_RESULT_TTLS = {
+    "prices": 24 * 60 * 60,
+    "financial_metrics": 24 * 60 * 60,
+    "line_items": 24 * 60 * 60,
+    "insider_trades": 12 * 60 * 60,
+    "company_news": 6 * 60 * 60,
+}
+
+# Default in-memory budget per dataset, in bytes. Least recently used entries are evicted beyond it.
+DEFAULT_MAX_BYTES = {
+    "prices": 256 * 1024 * 1024,
+    "financial_metrics": 64 * 1024 * 1024,
+    "line_items": 64 * 1024 * 1024,
+    "insider_trades": 128 * 1024 * 1024,
+    "company_news": 128 * 1024 * 1024,
+    "company_facts": 16 * 1024 * 1024,
+    "market_cap": 4 * 1024 * 1024,
+}
+
+# Datasets market caps are resolved from; a ticker's resolved market caps are forgotten whenever
+# one of its entries in them changes or leaves memory
+_MARKET_CAP_SOURCES = ("prices", "line_items", "financial_metrics")
+
+# Entries that only make sense next to another dataset's entry with the same key, and are evicted with it
+_COMPANION_DATASETS = {
+    "prices": ("price_coverage",),
+    "insider_trades": ("insider_trades_coverage",),
+    "company_news": ("company_news_coverage",),
+}
+_COVERED_DATASETS = {companion: dataset for dataset, companions in _COMPANION_DATASETS.items() for companion in companions}
+
+# Date field that orders each event dataset
+EVENT_DATE_FIELDS = {"insider_trades": "filing_date", "company_news": "date"}
+
+# Start of a coverage range that reaches back to the first event the API has
+HISTORY_START = "1900-01-01"
+
+# Columns every line-item row carries regardless of which fields were requested
+LINE_ITEM_BASE_FIELDS = ("ticker", "report_period", "period", "currency")
+
+# Conditional writes tried before a merged entry is written regardless of concurrent writers
+MAX_WRITE_ATTEMPTS = 5
+
+# Model each dataset's rows are validated into when they enter the cache
+DATASET_MODELS: dict[str, type[BaseModel]] = {
+    "prices": Price,
+    "financial_metrics": FinancialMetrics,
+    "line_items": LineItem,
+    "insider_trades": InsiderTrade,
+    "company_news": CompanyNews,
+}
+
+
 class Cache:
-    """In-memory cache for API responses."""
-
-    def __init__(self):
-        self._prices_cache: dict[str, list[dict[str, any]]] = {}
-        self._financial_metrics_cache: dict[str, list[dict[str, any]]] = {}
-        self._line_items_cache: dict[str, list[dict[str, any]]] = {}
-        self._insider_trades_cache: dict[str, list[dict[str, any]]] = {}
-        self._company_news_cache: dict[str, list[dict[str, any]]] = {}
-
-    def _merge_data(self, existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
-        """Merge existing and new data, avoiding duplicates based on a key field."""
-        if not existing:
-            return new_data
-
-        # Create a set of existing keys for O(1) lookup
-        existing_keys = {item[key_field] for item in existing}
-
-        # Only add items that don't exist yet
-        merged = existing.copy()
-        merged.extend([item for item in new_data if item[key_field] not in existing_keys])
-        return merged
-
-    def get_prices(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached price data if available."""
-        return self._prices_cache.get(ticker)
-
-    def set_prices(self, ticker: str, data: list[dict[str, any]]):
-        """Append new price data to cache."""
-        self._prices_cache[ticker] = self._merge_data(self._prices_cache.get(ticker), data, key_field="time")
-
-    def get_financial_metrics(self, ticker: str) -> list[dict[str, any]]:
-        """Get cached financial metrics if available."""
-        return self._financial_metrics_cache.get(ticker)
-
-    def set_financial_metrics(self, ticker: str, data: list[dict[str, any]]):
-        """Append new financial metrics to cache."""
-        self._financial_metrics_cache[ticker] = self._merge_data(self._financial_metrics_cache.get(ticker), data, key_field="report_period")
-
-    def get_line_items(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached line items if available."""
-        return self._line_items_cache.get(ticker)
-
-    def set_line_items(self, ticker: str, data: list[dict[str, any]]):
-        """Append new line items to cache."""
-        self._line_items_cache[ticker] = self._merge_data(self._line_items_cache.get(ticker), data, key_field="report_period")
-
-    def get_insider_trades(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached insider trades if available."""
-        return self._insider_trades_cache.get(ticker)
-
-    def set_insider_trades(self, ticker: str, data: list[dict[str, any]]):
-        """Append new insider trades to cache."""
-        self._insider_trades_cache[ticker] = self._merge_data(self._insider_trades_cache.get(ticker), data, key_field="filing_date")  # Could also use transaction_date if preferred
-
-    def get_company_news(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached company news if available."""
-        return self._company_news_cache.get(ticker)
-
-    def set_company_news(self, ticker: str, data: list[dict[str, any]]):
-        """Append new company news to cache."""
-        self._company_news_cache[ticker] = self._merge_data(self._company_news_cache.get(ticker), data, key_field="date")
+    """In-memory cache for API responses, optionally backed by a persistent store.
+
+    Rows are held as validated model instances: dicts passed to the setters are
+    validated once on the way in, and getters return the cached instances
+    themselves, so callers must treat them as read-only.
+    """
+
+    def __init__(self, store: CacheStore | None = None, max_bytes: dict[str, int] | None = None):
+        self._prices_cache: OrderedDict[str, PriceSeries] = OrderedDict()
+        # Metric history per ticker/period as of a date: {"end_date": ..., "depth": rows fetched or None if all, "rows": [...]}
+        self._financial_metrics_cache: OrderedDict[str, dict[str, any]] = OrderedDict()
+        # Line items per ticker/period as of a date: {"end_date": ..., "fields": {field: depth fetched}, "rows": [...]}
+        self._line_items_cache: OrderedDict[str, dict[str, any]] = OrderedDict()
+        # Projections of cached line-item rows onto the fields of a request, reused across hits
+        self._line_item_views: dict[str, dict[tuple, list[LineItem]]] = {}
+        # Insider trades and news per ticker, sorted oldest first by filing/publication date and held compressed
+        self._insider_trades_cache: OrderedDict[str, CompressedEvents] = OrderedDict()
+        self._company_news_cache: OrderedDict[str, CompressedEvents] = OrderedDict()
+        # Date ranges already fetched per ticker, as [start_date, end_date, expires_at, fetched_at]
+        self._price_coverage_cache: OrderedDict[str, list[list]] = OrderedDict()
+        self._insider_trades_coverage_cache: OrderedDict[str, list[list]] = OrderedDict()
+        self._company_news_coverage_cache: OrderedDict[str, list[list]] = OrderedDict()
+        # Company facts per ticker with the time they were fetched: {"fetched_at": ..., "facts": CompanyFacts}
+        self._company_facts_cache: OrderedDict[str, dict[str, any]] = OrderedDict()
+        # Market caps already resolved per ticker and date, {end_date: market_cap}; memory only
+        self._market_cap_cache: OrderedDict[str, dict[str, float]] = OrderedDict()
+        self._caches = {
+            "prices": self._prices_cache,
+            "price_coverage": self._price_coverage_cache,
+            "financial_metrics": self._financial_metrics_cache,
+            "line_items": self._line_items_cache,
+            "insider_trades": self._insider_trades_cache,
+            "insider_trades_coverage": self._insider_trades_coverage_cache,
+            "company_news": self._company_news_cache,
+            "company_news_coverage": self._company_news_coverage_cache,
+            "company_facts": self._company_facts_cache,
+            "market_cap": self._market_cap_cache,
+        }
+        self._expires_at: dict[tuple[str, str], float] = {}
+        # Store version of each entry as last read or written, and the entries known to match it
+        self._versions: dict[tuple[str, str], int | None] = {}
+        self._verified: set[tuple[str, str]] = set()
+        # Entries loaded from a snapshot; served as loaded whatever the store holds for them
+        self._pinned: set[tuple[str, str]] = set()
+        self._store_generation: int | None = None
+        # Approximate memory held by each entry and each dataset, for LRU eviction
+        self._max_bytes = dict(DEFAULT_MAX_BYTES if max_bytes is None else max_bytes)
+        self._entry_bytes: dict[tuple[str, str], int] = {}
+        self._dataset_bytes: dict[str, int] = {dataset: 0 for dataset in self._caches}
+        # Data functions may be called from several threads at once (graph branches, prefetch workers)
+        self._lock = threading.RLock()
+        # Hit/miss and HTTP counters, recorded by src.tools.api
+        self.recorder = DataStats()
+        # The default store is resolved lazily so that .env files loaded after import are honoured
+        self._store = store
+        self._store_resolved = store is not None
+
+    @property
+    def store(self) -> CacheStore | None:
+        """The persistent tier, or None when the cache is memory-only."""
+        if not self._store_resolved:
+            self._store = default_store()
+            self._store_resolved = True
+        return self._store
+
+    def set_store(self, store: CacheStore | None):
+        """Replace the persistent tier. Entries already in memory are kept."""
+        self._store = store
+        self._store_resolved = True
+
+    def set_max_bytes(self, dataset: str, max_bytes: int | None):
+        """Set the in-memory budget for a dataset; None removes the limit."""
+        with self._lock:
+            if max_bytes is None:
+                self._max_bytes.pop(dataset, None)
+            else:
+                self._max_bytes[dataset] = max_bytes
+                self._evict(dataset)
+
+    def memory_usage(self) -> dict[str, int]:
+        """Approximate bytes held in memory per dataset."""
+        with self._lock:
+            return dict(self._dataset_bytes)
+
+    def stats(self) -> dict[str, any]:
+        """Hit/miss, HTTP latency, retry and 429 counters per dataset and per agent, plus memory usage."""
+        return {**self.recorder.snapshot(), "memory_bytes": self.memory_usage()}
+
+    def reset_stats(self):
+        """Zero every counter recorded so far."""
+        self.recorder.reset()
+
+    def export_snapshot(self, path: str, tickers: list[str] | None = None) -> dict[str, any]:
+        """Write the entries held in memory, or only those of `tickers`, to a snapshot bundle; returns its manifest.
+
+        What a run fetched stays in memory unless evicted, so exporting after a run
+        captures the data it touched.
+        """
+        with self._lock:
+            entries = {dataset: {key: value for key, value in values.items() if tickers is None or _entry_ticker(dataset, key) in tickers} for dataset, values in self._caches.items() if dataset != "market_cap"}
+        return write_snapshot(path, entries, sorted({_entry_ticker(dataset, key) for dataset, values in entries.items() for key in values}))
+
+    def load_snapshot(self, path: str, persist: bool = False) -> dict[str, any]:
+        """Load a snapshot bundle as a frozen dataset and return its manifest.
+
+        Its entries and fetched ranges never expire, so live data in it is served as
+        of the snapshot instead of being refetched, and they are pinned: a shared
+        store's copy never replaces them. With persist, entries are also written to
+        the persistent store.
+        """
+        manifest, entries = read_snapshot(path)
+        with self._lock:
+            for dataset, values in entries.items():
+                if dataset not in self._caches:
+                    continue
+                for key, value in values.items():
+                    value = value if dataset == "prices" else _revive(dataset, value)
+                    self._put(dataset, key, _frozen(dataset, value), persist=persist)
+                    self._pinned.add((dataset, key))
+        return manifest
+
+    def _get(self, dataset: str, key: str) -> any:
+        """Look up an entry in memory, falling back to the persistent store."""
+        with self._lock:
+            entries = self._caches[dataset]
+            expires_at = self._expires_at.get((dataset, key))
+            if expires_at is not None and expires_at <= time.time():
+                self._drop(dataset, key)
+
+            if key in entries:
+                if not self._is_stale(dataset, key):
+                    entries.move_to_end(key)
+                    return entries[key]
+                self._drop(dataset, key)
+
+            if self.store is None:
+                return None
+            loaded = self.store.load_versioned(dataset, key)
+            if loaded is None:
+                return None
+
+            data, expires_at, version = loaded
+            try:
+                data = _revive(dataset, data)
+            except ValidationError:
+                # Written by an older schema; treat as a miss so it is refetched and overwritten
+                return None
+            self._put(dataset, key, data, expires_at, persist=False)
+            self._versions[(dataset, key)] = version
+            self._verified.add((dataset, key))
+            return data
+
+    def _is_stale(self, dataset: str, key: str) -> bool:
+        """Whether another process has rewritten a shared store's copy of an in-memory entry.
+
+        Entries are checked against the store once per change the store reports,
+        so hits cost a single cheap query while no other process is writing.
+        """
+        store = self.store
+        if store is None or not store.shared or (dataset, key) in self._pinned:
+            return False
+        generation = store.generation()
+        if generation != self._store_generation:
+            self._store_generation = generation
+            self._verified.clear()
+        if (dataset, key) in self._verified:
+            return False
+        if store.version(dataset, key) != self._versions.get((dataset, key)):
+            return True
+        self._verified.add((dataset, key))
+        return False
+
+    def _put(self, dataset: str, key: str, value: any, expires_at: float | None = None, size: int | None = None, persist: bool = True, conditional: bool = False) -> bool:
+        """Replace an entry in memory (and, unless persist is False, in the persistent store).
+
+        A conditional write only happens if the stored entry still has the version
+        this cache last saw; returns False if another process changed it since.
+        """
+        with self._lock:
+            if persist and self.store is not None:
+                if conditional:
+                    version = self.store.compare_and_save(dataset, key, value, expires_at, self._versions.get((dataset, key)))
+                    if version is None:
+                        return False
+                else:
+                    version = self.store.save(dataset, key, value, expires_at)
+                self._versions[(dataset, key)] = version
+                self._verified.add((dataset, key))
+
+            entries = self._caches[dataset]
+            entries[key] = value
+            entries.move_to_end(key)
+            if expires_at is not None:
+                self._expires_at[(dataset, key)] = expires_at
+            else:
+                self._expires_at.pop((dataset, key), None)
+
+            size = _estimate_size(value) if size is None else size
+            self._dataset_bytes[dataset] += size - self._entry_bytes.get((dataset, key), 0)
+            self._entry_bytes[(dataset, key)] = size
+            if dataset in _MARKET_CAP_SOURCES:
+                self._drop("market_cap", _entry_ticker(dataset, key))
+            self._evict(dataset)
+            return True
+
+    def _update(self, dataset: str, key: str, merge: Callable[[any], tuple[any, int | None]], expires_at: float | None = None) -> any:
+        """Read, merge and write back an entry without losing concurrent writes.
+
+        `merge(current)` returns the new value and its size (None to estimate it).
+        On a shared store the write is conditional on the version that was read; if
+        another process wrote in between, its entry is reloaded and merged again.
+        Snapshot entries are merged in memory only, so the store's copy never replaces them.
+        """
+        with self._lock:
+            if (dataset, key) in self._pinned:
+                value, size = merge(self._caches[dataset][key])
+                self._put(dataset, key, value, expires_at, size=size, persist=False)
+                return value
+            for _ in range(MAX_WRITE_ATTEMPTS):
+                current = self._get(dataset, key)
+                value, size = merge(current)
+                if self._put(dataset, key, value, expires_at, size=size, conditional=True):
+                    return value
+                self._drop(dataset, key)
+            # Persistent contention; fall back to last writer wins rather than failing the fetch
+            current = self._get(dataset, key)
+            value, size = merge(current)
+            self._put(dataset, key, value, expires_at, size=size)
+            return value
+
+    def _drop(self, dataset: str, key: str):
+        """Remove an entry from memory only; the persistent store keeps its copy."""
+        self._caches[dataset].pop(key, None)
+        self._expires_at.pop((dataset, key), None)
+        self._versions.pop((dataset, key), None)
+        self._verified.discard((dataset, key))
+        self._pinned.discard((dataset, key))
+        self._dataset_bytes[dataset] -= self._entry_bytes.pop((dataset, key), 0)
+        if dataset == "line_items":
+            self._line_item_views.pop(key, None)
+        if dataset in _MARKET_CAP_SOURCES:
+            self._drop("market_cap", _entry_ticker(dataset, key))
+        for companion in _COMPANION_DATASETS.get(dataset, ()):
+            self._drop(companion, key)
+
+    def _evict(self, dataset: str):
+        """Evict least recently used entries until the dataset fits its budget.
+
+        The most recent entry is always kept, even if it alone exceeds the budget.
+        """
+        max_bytes = self._max_bytes.get(dataset)
+        if max_bytes is None:
+            return
+        entries = self._caches[dataset]
+        while self._dataset_bytes[dataset] > max_bytes and len(entries) > 1:
+            self._drop(dataset, next(iter(entries)))
+
+    def get_prices(self, ticker: str, start_date: str | None = None, end_date: str | None = None, max_stale: float = 0.0) -> PriceSeries | None:
+        """Get cached price data if available, as a PriceSeries view.
+
+        Without dates, every cached bar for the ticker is returned. With dates, the
+        bars in [start_date, end_date] are returned only if that whole range has been
+        fetched before; otherwise None. `max_stale` also accepts ranges that expired
+        up to that many seconds ago.
+        """
+        if start_date is None or end_date is None:
+            return self._get("prices", ticker)
+
+        with self._lock:
+            if _missing_ranges(self._live_coverage("price_coverage", ticker, max_stale), start_date, end_date):
+                return None
+
+            bars = self._get("prices", ticker)
+            if bars is None:
+                return PriceSeries.from_prices([])
+            return bars.slice(start_date, end_date)
+
+    def get_missing_price_ranges(self, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        """Return the sub-ranges of [start_date, end_date] that have not been fetched yet."""
+        return _missing_ranges(self._live_coverage("price_coverage", ticker), start_date, end_date)
+
+    def _live_coverage(self, dataset: str, key: str, max_stale: float = 0.0) -> list[list]:
+        coverage = self._get(dataset, key) or []
+        now = time.time() - max_stale
+        return [r for r in coverage if r[2] is None or r[2] > now]
+
+    def _record_coverage(self, dataset: str, key: str, start_date: str, end_date: str, ttl: float | None, page_floor: str | None = None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        # Expired ranges are kept while they may still be served stale
+        stale_for = STALE_WHILE_REVALIDATE.get(_COVERED_DATASETS[dataset], 0.0)
+        self._update(dataset, key, lambda coverage: (_add_range(coverage or [], start_date, end_date, expires_at, fetched_at=now, stale_for=stale_for, page_floor=page_floor), None))
+
+    def live_data_age(self, dataset: str, key: str, start_date: str, end_date: str) -> float | None:
+        """Seconds since the oldest fetch of live (expiring) data overlapping [start_date, end_date].
+
+        None when the range only holds historical data, or its fetch time is unknown.
+        """
+        coverage = self._get(_COMPANION_DATASETS[dataset][0], key) or []
+        fetched = [r[3] for r in coverage if r[2] is not None and len(r) > 3 and r[3] is not None and r[0] <= end_date and r[1] >= start_date]
+        return time.time() - min(fetched) if fetched else None
+
+    def set_prices(self, ticker: str, data: PriceSeries | list[Price | dict[str, any]], start_date: str | None = None, end_date: str | None = None, ttl: float | None = None):
+        """Add price bars to the cache and record [start_date, end_date] as fetched.
+
+        Bars are kept in one columnar PriceSeries per ticker, sorted by time, and a
+        newer bar replaces a cached bar with the same timestamp. The ttl applies to the recorded range, so a range reaching
+        today is refetched once it expires; None keeps it forever.
+        """
+        if not isinstance(data, PriceSeries):
+            data = PriceSeries.from_prices(_validate_rows("prices", data))
+        with self._lock:
+            self._update("prices", ticker, lambda bars: (data if bars is None else bars.merge(data), None))
+
+            if start_date is not None and end_date is not None:
+                self._record_coverage("price_coverage", ticker, start_date, end_date, ttl)
+
+    def latest_close(self, ticker: str, end_date: str) -> float | None:
+        """The close of the last cached bar on or before end_date.
+
+        None unless every day from that bar to end_date has been fetched, so that a
+        later bar cannot have been missed.
+        """
+        with self._lock:
+            bars = self._get("prices", ticker)
+            if not bars:
+                return None
+            index = int(np.searchsorted(bars.dates, np.datetime64(end_date[:10], "D"), side="right")) - 1
+            if index < 0 or self.get_missing_price_ranges(ticker, str(bars.dates[index]), end_date):
+                return None
+            return float(bars.close[index])
+
+    def latest_outstanding_shares(self, ticker: str, end_date: str) -> float | None:
+        """Outstanding shares from the newest cached line-item row reported on or before end_date, in any period."""
+        latest = None
+        for period in ("ttm", "quarterly", "annual"):
+            rows = self.get_line_items(f"{ticker}_{period}", ["outstanding_shares"], 1, end_date)
+            if rows and getattr(rows[0], "outstanding_shares", None) and (latest is None or rows[0].report_period > latest.report_period):
+                latest = rows[0]
+        return latest.outstanding_shares if latest is not None else None
+
+    def get_market_cap(self, ticker: str, end_date: str) -> float | None:
+        """A market cap resolved earlier for the ticker and date, while the data it came from is unchanged."""
+        with self._lock:
+            market_caps = self._market_cap_cache.get(ticker)
+            if market_caps is None or end_date not in market_caps:
+                return None
+            self._market_cap_cache.move_to_end(ticker)
+            return market_caps[end_date]
+
+    def set_market_cap(self, ticker: str, end_date: str, market_cap: float):
+        """Remember the market cap resolved for the ticker and date, in memory only."""
+        with self._lock:
+            self._put("market_cap", ticker, {**self._market_cap_cache.get(ticker, {}), end_date: market_cap}, persist=False)
+
+    def get_company_facts(self, ticker: str, max_stale: float = 0.0) -> tuple[CompanyFacts, float | None] | None:
+        """Cached company facts and their age in seconds (None if unknown), if younger than their TTL plus `max_stale`."""
+        with self._lock:
+            entry = self._get("company_facts", ticker)
+            if entry is None:
+                return None
+            if entry["fetched_at"] is None:
+                # Loaded from a snapshot; never expires
+                return entry["facts"], None
+            age = time.time() - entry["fetched_at"]
+            if age > LIVE_DATA_TTLS["company_facts"] + max_stale:
+                return None
+            return entry["facts"], age
+
+    def set_company_facts(self, ticker: str, facts: CompanyFacts | dict[str, any]):
+        """Cache company facts fetched just now."""
+        if not isinstance(facts, CompanyFacts):
+            facts = CompanyFacts(**facts)
+        self._put("company_facts", ticker, {"fetched_at": time.time(), "facts": facts})
+
+    def get_financial_metrics(self, key: str, end_date: str | None = None, limit: int | None = None) -> list[FinancialMetrics] | None:
+        """Answer a `report_period <= end_date, limit` query from a ticker's cached metric history.
+
+        `key` identifies the ticker and period. Rows are returned newest first, or None
+        if the cached history does not reach far enough back (or forward) to answer.
+        Without end_date, the whole cached history is returned.
+        """
+        with self._lock:
+            entry = self._get("financial_metrics", key)
+            if entry is None:
+                return None
+            if end_date is None:
+                return entry["rows"]
+            newer = self.count_newer_periods("financial_metrics", key, end_date)
+            if newer is None or not _deep_enough(entry["depth"], newer, limit):
+                return None
+            return entry["rows"][newer : newer + limit if limit else None]
+
+    def set_financial_metrics(self, key: str, data: list[FinancialMetrics | dict[str, any]], end_date: str, limit: int, ttl: float | None = None):
+        """Cache a metric history fetched as `report_period <= end_date` with `limit` rows.
+
+        Any date up to end_date can then be answered locally, as long as enough rows
+        were fetched; a response shorter than `limit` holds the whole history.
+        """
+        data = _validate_rows("financial_metrics", data)
+        entry = {"end_date": end_date, "depth": None if len(data) < limit else limit, "rows": sorted(data, key=lambda row: row.report_period, reverse=True)}
+        self._put("financial_metrics", key, entry, time.time() + ttl if ttl is not None else None)
+
+    def count_newer_periods(self, dataset: str, key: str, end_date: str) -> int | None:
+        """Number of cached financial_metrics or line_items rows reported after end_date.
+
+        None if nothing is cached for the key, or it was fetched as of an earlier date
+        and so cannot answer for end_date.
+        """
+        entry = self._get(dataset, key)
+        if entry is None or entry.get("end_date") is None or end_date > entry["end_date"]:
+            return None
+        # Rows are newest first, so "reported on or before end_date" flips from False to True once
+        return bisect.bisect_left(entry["rows"], True, key=lambda row: row.report_period <= end_date)
+
+    def get_line_items(self, key: str, line_items: list[str], limit: int, end_date: str | None = None) -> list[LineItem] | None:
+        """Get cached line items if every requested field has been fetched deep enough.
+
+        Rows are the `limit` newest reported on or before end_date (or the newest
+        cached, without end_date) and only carry the requested fields (plus the
+        ticker, report_period, period and currency columns). Each projection is built
+        once and reused until the entry changes.
+        """
+        with self._lock:
+            if self.get_missing_line_items(key, line_items, limit, end_date):
+                return None
+            newer = self.count_newer_periods("line_items", key, end_date) if end_date is not None else 0
+            views = self._line_item_views.setdefault(key, {})
+            view_key = (tuple(sorted(set(line_items))), newer, limit)
+            view = views.get(view_key)
+            if view is None:
+                rows = self._get("line_items", key)["rows"][newer : newer + limit]
+                wanted = set(LINE_ITEM_BASE_FIELDS).union(line_items)
+                view = views[view_key] = [LineItem.model_construct(**{field: value for field, value in _row_fields(row).items() if field in wanted}) for row in rows]
+            return view
+
+    def get_missing_line_items(self, key: str, line_items: list[str], limit: int, end_date: str | None = None) -> list[str]:
+        """Return the requested fields not cached deep enough to give `limit` periods up to end_date."""
+        with self._lock:
+            entry = self._get("line_items", key)
+            newer = 0
+            if entry is not None and end_date is not None:
+                newer = self.count_newer_periods("line_items", key, end_date)
+                if newer is None:
+                    return list(line_items)
+            fields = entry["fields"] if entry else {}
+            return [item for item in line_items if item not in fields or not _deep_enough(fields[item], newer, limit)]
+
+    def set_line_items(self, key: str, data: list[LineItem | dict[str, any]], line_items: list[str], limit: int, end_date: str | None = None, ttl: float | None = None):
+        """Merge fetched line-item rows into the cache, keyed per report period and field.
+
+        `line_items`, `limit` and `end_date` describe the request that produced the
+        rows. If it returned fewer than `limit` rows, the fields are marked as
+        complete so any deeper request is also served from the cache. Rows fetched as
+        of a different end_date replace the entry rather than merging into it.
+        """
+        data = _validate_rows("line_items", data)
+
+        def merge(entry):
+            if entry is None or entry.get("end_date") != end_date:
+                entry = {"end_date": end_date, "fields": {}, "rows": []}
+            rows = {row.report_period: row for row in entry["rows"]}
+            for row in data:
+                existing = rows.get(row.report_period)
+                rows[row.report_period] = row if existing is None else LineItem.model_construct(**{**_row_fields(existing), **_row_fields(row)})
+
+            fields = dict(entry["fields"])
+            depth = None if len(data) < limit else limit
+            for item in line_items:
+                if item not in fields or (fields[item] is not None and (depth is None or depth > fields[item])):
+                    fields[item] = depth
+
+            return {"end_date": end_date, "fields": fields, "rows": [rows[period] for period in sorted(rows, reverse=True)]}, None
+
+        with self._lock:
+            self._update("line_items", key, merge, time.time() + ttl if ttl is not None else None)
+            self._line_item_views.pop(key, None)
+
+    def get_events(self, dataset: str, ticker: str, end_date: str | None = None, start_date: str | None = None, limit: int | None = None, max_stale: float = 0.0) -> list[BaseModel] | CompressedEvents | None:
+        """Answer an insider trade or news query from the per-ticker event store.
+
+        Without end_date, every cached event is returned, oldest first, as the
+        compressed store itself; rows are decompressed as they are read. With a
+        start_date, the events in [start_date, end_date] are returned once that whole
+        window has been fetched. Without one, the `limit` newest events up to end_date
+        are returned once enough history before end_date has been fetched. Windowed
+        results are newest first, like the API's. Returns None when the store cannot
+        answer yet. `max_stale` also accepts ranges that expired up to that many
+        seconds ago.
+        """
+        with self._lock:
+            rows = self._get(dataset, ticker)
+            if end_date is None:
+                return rows
+
+            coverage = self._live_coverage(f"{dataset}_coverage", ticker, max_stale)
+            rows = rows if rows is not None else _empty_events(dataset)
+            hi = rows.bisect_right(end_date)
+            if start_date is not None:
+                if _missing_ranges(coverage, start_date, end_date):
+                    return None
+                lo = rows.bisect_left(start_date)
+                return rows[lo:hi][::-1]
+
+            covered_since = _covered_since(coverage, end_date)
+            if covered_since is None:
+                return None
+            lo = rows.bisect_left(covered_since)
+            if hi - lo < (limit or 0) and covered_since != HISTORY_START:
+                # A full page also holds the newest events of the day it was cut off on
+                page_floor = next((r[4] for r in coverage if r[0] == covered_since and len(r) > 4 and r[4] is not None), None)
+                if page_floor is None or hi - rows.bisect_left(page_floor) < limit:
+                    return None
+                lo = rows.bisect_left(page_floor)
+            return rows[max(lo, hi - limit) if limit else lo : hi][::-1]
+
+    def get_missing_event_ranges(self, dataset: str, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        """Return the sub-ranges of [start_date, end_date] whose events have not been fetched yet."""
+        return _missing_ranges(self._live_coverage(f"{dataset}_coverage", ticker), start_date, end_date)
+
+    def get_event_delta_range(self, dataset: str, ticker: str, end_date: str) -> tuple[str, str] | None:
+        """Return the range between the newest fetched date before end_date and end_date.
+
+        Fetching just this range lets a query that moved forward in time reuse the
+        history fetched for the earlier date. None when nothing earlier was fetched.
+        """
+        coverage = self._live_coverage(f"{dataset}_coverage", ticker)
+        high_water = max((end for _, end, *_ in coverage if end < end_date), default=None)
+        if high_water is None:
+            return None
+        return _shift_day(high_water, 1), end_date
+
+    def set_events(self, dataset: str, ticker: str, data: list[BaseModel | dict[str, any]], start_date: str | None = None, end_date: str | None = None, ttl: float | None = None):
+        """Merge events into the ticker's store and record [start_date, end_date] as fetched.
+
+        Events stay sorted by date and exact duplicates are dropped. The ttl applies
+        to the recorded range, so a range reaching today is refetched once it expires.
+        """
+        data = _validate_rows(dataset, data)
+
+        def merge(rows):
+            rows = rows if rows is not None else _empty_events(dataset)
+            return rows.merge(data)[0], None
+
+        with self._lock:
+            self._update(dataset, ticker, merge)
+
+            if start_date is not None and end_date is not None and start_date <= end_date:
+                self._record_coverage(f"{dataset}_coverage", ticker, start_date, end_date, ttl)
+
+    def set_event_page(self, dataset: str, ticker: str, data: list[BaseModel | dict[str, any]], end_date: str, start_date: str | None, limit: int, ttl: float | None = None):
+        """Cache one API page holding the newest `limit` events in [start_date, end_date].
+
+        A short page means nothing else exists in that window (back to the start of
+        history without a start_date). A full page only covers the days after its
+        oldest event, since that day may have been cut off; the oldest date is kept
+        with the range as its page floor, so the same page can be answered again.
+        """
+        data = _validate_rows(dataset, data)
+        if len(data) < limit:
+            self.set_events(dataset, ticker, data, start_date or HISTORY_START, end_date, ttl)
+            return
+        oldest = min(_event_date_key(dataset)(row) for row in data)
+        with self._lock:
+            self.set_events(dataset, ticker, data)
+            if oldest < end_date:
+                self._record_coverage(f"{dataset}_coverage", ticker, _shift_day(oldest, 1), end_date, ttl, page_floor=oldest)
+
+    def get_insider_trades(self, ticker: str, end_date: str | None = None, start_date: str | None = None, limit: int | None = None) -> list[InsiderTrade] | CompressedEvents | None:
+        """Get cached insider trades if available; the whole CompressedEvents store without end_date. See get_events."""
+        return self.get_events("insider_trades", ticker, end_date, start_date, limit)
+
+    def set_insider_trades(self, ticker: str, data: list[InsiderTrade | dict[str, any]], start_date: str | None = None, end_date: str | None = None, ttl: float | None = None):
+        """Add insider trades to the cache, ordered by filing date."""
+        self.set_events("insider_trades", ticker, data, start_date, end_date, ttl)
+
+    def get_company_news(self, ticker: str, end_date: str | None = None, start_date: str | None = None, limit: int | None = None) -> list[CompanyNews] | CompressedEvents | None:
+        """Get cached company news if available; the whole CompressedEvents store without end_date. See get_events."""
+        return self.get_events("company_news", ticker, end_date, start_date, limit)
+
+    def set_company_news(self, ticker: str, data: list[CompanyNews | dict[str, any]], start_date: str | None = None, end_date: str | None = None, ttl: float | None = None):
+        """Add company news to the cache, ordered by publication date."""
+        self.set_events("company_news", ticker, data, start_date, end_date, ttl)
+
+
+def _validate_rows(dataset: str, rows: list[BaseModel | dict[str, any]]) -> list[BaseModel]:
+    """Validate incoming rows into the dataset's model; rows that already are instances pass through."""
+    model = DATASET_MODELS[dataset]
+    return [row if isinstance(row, model) else model.model_validate(row) for row in rows]
+
+
+def _revive(dataset: str, data: any) -> any:
+    """Turn an entry loaded from the persistent store back into model instances."""
+    if dataset in ("financial_metrics", "line_items"):
+        return {**data, "rows": _validate_rows(dataset, data["rows"])}
+    if dataset == "prices":
+        return PriceSeries.from_prices(_validate_rows(dataset, data))
+    if dataset == "company_facts":
+        return {**data, "facts": CompanyFacts(**data["facts"])}
+    if dataset in EVENT_DATE_FIELDS:
+        if isinstance(data, dict):
+            return CompressedEvents.from_payload(DATASET_MODELS[dataset], EVENT_DATE_FIELDS[dataset], data)
+        # Stored as plain rows before events were compressed
+        return CompressedEvents.from_rows(DATASET_MODELS[dataset], EVENT_DATE_FIELDS[dataset], _validate_rows(dataset, data))
+    if dataset in DATASET_MODELS:
+        return _validate_rows(dataset, data)
+    return data
+
+
+def _row_fields(row: BaseModel) -> dict[str, any]:
+    """Every field set on a row, including the extra fields of line items, without copying values."""
+    return {**row.__dict__, **(row.__pydantic_extra__ or {})}
+
+
+def _deep_enough(depth: int | None, newer: int, limit: int | None) -> bool:
+    """Whether a history fetched `depth` rows deep (None: all of it) holds `limit` rows after skipping `newer`."""
+    return depth is None or depth >= newer + (limit or 0)
+
+
+def _event_date_key(dataset: str):
+    field = EVENT_DATE_FIELDS[dataset]
+    return lambda row: getattr(row, field)[:10]
+
+
+def _entry_ticker(dataset: str, key: str) -> str:
+    """The ticker an entry belongs to; fundamentals are keyed by ticker and period."""
+    return key.rsplit("_", 1)[0] if dataset in ("financial_metrics", "line_items") else key
+
+
+def _frozen(dataset: str, value: any) -> any:
+    """An entry with its expiry removed, as loaded from a snapshot."""
+    if dataset in _COVERED_DATASETS:
+        return [[start, end, None, *rest] for start, end, _, *rest in value]
+    if dataset == "company_facts":
+        return {**value, "fetched_at": None}
+    return value
+
+
+def _empty_events(dataset: str) -> CompressedEvents:
+    return CompressedEvents.from_rows(DATASET_MODELS[dataset], EVENT_DATE_FIELDS[dataset], [])
+
+
+def _estimate_size(value: any) -> int:
+    """Approximate the memory held by a cached value, following lists, dicts and models."""
+    if isinstance(value, (PriceSeries, CompressedEvents)):
+        return value.nbytes
+    if isinstance(value, BaseModel):
+        return sys.getsizeof(value) + _estimate_size(_row_fields(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(item) for item in value)
+    if value is None or isinstance(value, bool):
+        return 0
+    return sys.getsizeof(value)
+
+
+def _shift_day(day: str, days: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+def _add_range(coverage: list[list], start_date: str, end_date: str, expires_at: float | None, fetched_at: float | None = None, stale_for: float = 0.0, page_floor: str | None = None) -> list[list]:
+    """Add a date range to a coverage list, coalescing overlapping or adjacent ranges that expire together.
+
+    Ranges are [start, end, expires_at, fetched_at, page_floor]; a page floor is the
+    partly fetched day before a range cut from a full page, and stays with the range
+    starting there. Ranges that expired more than `stale_for` seconds ago, or expired
+    ones the new range refetched in full, are dropped.
+    """
+    now = time.time()
+
+    def kept(r: list) -> bool:
+        if r[2] is None or r[2] > now:
+            return True
+        return r[2] > now - stale_for and not (start_date <= r[0] and r[1] <= end_date)
+
+    ranges = sorted([list(r) for r in coverage if kept(r)] + [[start_date, end_date, expires_at, fetched_at, page_floor]], key=lambda r: (r[0], r[1]))
+    merged: list[list] = []
+    for start, end, expiry, *rest in ranges:
+        fetched, floor = (rest + [None, None])[:2]
+        for existing in reversed(merged):
+            if existing[2] == expiry and _shift_day(existing[1], 1) >= start:
+                existing[1] = max(existing[1], end)
+                existing[3] = max(existing[3], fetched) if existing[3] is not None and fetched is not None else existing[3] or fetched
+                if existing[0] == start:
+                    existing[4] = existing[4] or floor
+                break
+        else:
+            merged.append([start, end, expiry, fetched, floor])
+    return merged
+
+
+def _missing_ranges(coverage: list[list], start_date: str, end_date: str) -> list[tuple[str, str]]:
+    """Return the gaps in [start_date, end_date] not covered by any range."""
+    gaps = []
+    cursor = start_date
+    for start, end, *_ in sorted(coverage, key=lambda r: (r[0], r[1])):
+        if end < cursor:
+            continue
+        if start > end_date:
+            break
+        if start > cursor:
+            gaps.append((cursor, _shift_day(start, -1)))
+        cursor = max(cursor, _shift_day(end, 1))
+        if cursor > end_date:
+            return gaps
+    if cursor <= end_date:
+        gaps.append((cursor, end_date))
+    return gaps
+
+
+def _covered_since(coverage: list[list], day: str) -> str | None:
+    """Return the earliest date from which every day up to `day` is covered, or None if `day` is not."""
+    since = None
+    for start, end, *_ in sorted(coverage, key=lambda r: (r[1], r[0]), reverse=True):
+        if since is None:
+            if start <= day <= end:
+                since = start
+        elif end >= _shift_day(since, -1) and start < since:
+            since = start
+    return since
+
+
+def live_data_ttl(dataset: str, end_date: str, empty: bool = False) -> float | None:
+    """Return the TTL for a response ending on ``end_date``.
+
+    Anything ending before today is historical and never expires; responses that
+    reach today can still change and use the short per-dataset TTL. An ``empty``
+    response, meaning the ticker has no such data at all, is a negative entry and
+    expires after the dataset's EMPTY_RESULT_TTLS instead.
+    """
+    if empty:
+        return EMPTY_RESULT_TTLS[dataset]
+    if end_date < time.strftime("%Y-%m-%d"):
+        return None
+    return _live_ttl_overrides.get().get(dataset, LIVE_DATA_TTLS[dataset])
+
+
+# Per-dataset TTLs replacing LIVE_DATA_TTLS inside a live_ttls() block
+_live_ttl_overrides: ContextVar[dict[str, float]] = ContextVar("live_ttl_overrides", default={})
+
+
+@contextmanager
+def live_ttls(ttls: dict[str, float]):
+    """Give live data fetched inside the block these TTLs, in seconds, instead of LIVE_DATA_TTLS."""
+    token = _live_ttl_overrides.set({**_live_ttl_overrides.get(), **ttls})
+    try:
+        yield
+    finally:
+        _live_ttl_overrides.reset(token)
+
+
+def seconds_through_next_trading_day(now: float | None = None) -> float:
+    """Seconds from `now` until the local midnight ending the next weekday. Market holidays are not known."""
+    now = time.time() if now is None else now
+    day = date.fromtimestamp(now) + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp() - now
 
 
 # Global cache instance
@@ -0,0 +1,191 @@
+"""Persistent backing stores for the API response cache."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class CacheStore:
+    """Interface for a persistent tier behind :class:`src.data.cache.Cache`.
+
+    Stores deal in JSON-serializable values keyed by ``(dataset, key)`` and are
+    responsible for dropping entries whose ``expires_at`` has passed.
+
+    A ``shared`` store may be written by other processes at the same time (for
+    example several backend workers). Its entries then carry a version that is
+    bumped on every write, so a Cache can tell when its in-memory copy is stale
+    and write merged entries only if nobody changed them in between.
+    """
+
+    shared = False
+
+    def load(self, dataset: str, key: str) -> tuple[any, float | None] | None:
+        """Return ``(data, expires_at)`` for a live entry, or None."""
+        raise NotImplementedError
+
+    def load_versioned(self, dataset: str, key: str) -> tuple[any, float | None, int | None] | None:
+        """Return ``(data, expires_at, version)`` for a live entry, or None."""
+        loaded = self.load(dataset, key)
+        return None if loaded is None else (*loaded, None)
+
+    def save(self, dataset: str, key: str, data: any, expires_at: float | None = None) -> int | None:
+        """Insert or replace an entry and return its new version. ``expires_at`` of None means it never expires."""
+        raise NotImplementedError
+
+    def compare_and_save(self, dataset: str, key: str, data: any, expires_at: float | None, expected_version: int | None) -> int | None:
+        """Write an entry only if its stored version is still ``expected_version`` (None: absent).
+
+        Returns the new version, or None if another writer got there first.
+        Stores without versions always write.
+        """
+        return self.save(dataset, key, data, expires_at)
+
+    def version(self, dataset: str, key: str) -> int | None:
+        """The stored version of an entry, or None if absent."""
+        return None
+
+    def generation(self) -> int:
+        """A number that changes whenever another process has written to the store."""
+        return 0
+
+    def delete(self, dataset: str, key: str):
+        """Remove a single entry if present."""
+        raise NotImplementedError
+
+    def clear(self, dataset: str | None = None):
+        """Remove every entry, or only those belonging to ``dataset``."""
+        raise NotImplementedError
+
+
+class SQLiteCacheStore(CacheStore):
+    """Cache store backed by a single SQLite file.
+
+    The file is opened in WAL mode so that any number of processes on the host can
+    share it: readers never block and writers wait for each other instead of failing.
+    Every write is a single statement, so entries are replaced atomically.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, busy_timeout: float = 30.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache_entries (
+                        dataset TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        data TEXT NOT NULL,
+                        expires_at REAL,
+                        updated_at REAL NOT NULL,
+                        version INTEGER NOT NULL DEFAULT 1,
+                        PRIMARY KEY (dataset, key)
+                    )
+                    """
+                )
+                columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache_entries)")}
+                if "version" not in columns:
+                    # Files written before entries were versioned
+                    self._conn.execute("ALTER TABLE cache_entries ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+    def load(self, dataset: str, key: str) -> tuple[any, float | None] | None:
+        loaded = self.load_versioned(dataset, key)
+        return None if loaded is None else loaded[:2]
+
+    def load_versioned(self, dataset: str, key: str) -> tuple[any, float | None, int | None] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data, expires_at, version FROM cache_entries WHERE dataset = ? AND key = ?", (dataset, key)).fetchone()
+        if row is None:
+            return None
+
+        data, expires_at, version = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(dataset, key)
+            return None
+        return json.loads(data), expires_at, version
+
+    def save(self, dataset: str, key: str, data: any, expires_at: float | None = None) -> int | None:
+        payload = json.dumps(data, separators=(",", ":"), default=encode)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                INSERT INTO cache_entries (dataset, key, data, expires_at, updated_at, version) VALUES (?, ?, ?, ?, ?, 1)
+                ON CONFLICT (dataset, key) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at, updated_at = excluded.updated_at, version = cache_entries.version + 1
+                RETURNING version
+                """,
+                (dataset, key, payload, expires_at, time.time()),
+            ).fetchone()
+        return row[0]
+
+    def compare_and_save(self, dataset: str, key: str, data: any, expires_at: float | None, expected_version: int | None) -> int | None:
+        payload = json.dumps(data, separators=(",", ":"), default=encode)
+        with self._lock, self._conn:
+            if expected_version is None:
+                row = self._conn.execute(
+                    "INSERT INTO cache_entries (dataset, key, data, expires_at, updated_at, version) VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (dataset, key) DO NOTHING RETURNING version",
+                    (dataset, key, payload, expires_at, time.time()),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "UPDATE cache_entries SET data = ?, expires_at = ?, updated_at = ?, version = version + 1 WHERE dataset = ? AND key = ? AND version = ? RETURNING version",
+                    (payload, expires_at, time.time(), dataset, key, expected_version),
+                ).fetchone()
+        return None if row is None else row[0]
+
+    def version(self, dataset: str, key: str) -> int | None:
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM cache_entries WHERE dataset = ? AND key = ?", (dataset, key)).fetchone()
+        return None if row is None else row[0]
+
+    def generation(self) -> int:
+        # data_version changes only when another connection commits, which is exactly what matters here
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def delete(self, dataset: str, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE dataset = ? AND key = ?", (dataset, key))
+
+    def clear(self, dataset: str | None = None):
+        with self._lock, self._conn:
+            if dataset is None:
+                self._conn.execute("DELETE FROM cache_entries")
+            else:
+                self._conn.execute("DELETE FROM cache_entries WHERE dataset = ?", (dataset,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def encode(value: any) -> any:
+    """JSON fallback for cached model instances, price series and compressed events; used by the store and snapshots."""
+    if hasattr(value, "to_payload"):
+        return value.to_payload()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "to_records"):
+        return value.to_records()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def default_store() -> CacheStore | None:
+    """Build the store configured by the environment, if any.
+
+    Setting ``FINANCIAL_DATASETS_CACHE_DIR`` enables a SQLite store in that
+    directory; leaving it unset keeps the cache purely in memory.
+    """
+    cache_dir = os.environ.get("FINANCIAL_DATASETS_CACHE_DIR")
+    if not cache_dir:
+        return None
+    return SQLiteCacheStore(os.path.join(os.path.expanduser(cache_dir), "cache.sqlite3"))
@@ -0,0 +1,220 @@
+"""Compressed storage for insider trades and company news."""
+
+import base64
+import bisect
+import json
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterator
+
+import numpy as np
+from pydantic import BaseModel
+
+# Rows per compressed block; a lookup only decompresses the blocks its date window touches
+BLOCK_ROWS = 128
+
+# Decompressed blocks kept across every ticker and dataset, so repeated lookups skip zlib
+DECODED_BLOCKS = 64
+
+_decoded: OrderedDict[tuple[type, bytes], list[BaseModel]] = OrderedDict()
+_decoded_lock = threading.Lock()
+
+
+class CompressedEvents:
+    """Events of one ticker sorted oldest first, held as zlib-compressed blocks of rows.
+
+    Only the event dates stay uncompressed, as datetime64[D], for date lookups; rows
+    are rebuilt from their block on access. Within a block each field is stored as a
+    column, and string columns with repeated values (tickers, sources, insider names)
+    as a table of distinct values that are interned when decoded. Instances are
+    immutable: merge returns a new instance sharing every block before the first
+    changed row.
+    """
+
+    __slots__ = ("model", "date_field", "dates", "blocks", "counts", "starts")
+
+    def __init__(self, model: type[BaseModel], date_field: str, dates: np.ndarray, blocks: list[bytes], counts: list[int]):
+        self.model = model
+        self.date_field = date_field
+        self.dates = dates
+        self.blocks = blocks
+        self.counts = counts
+        self.starts = np.cumsum([0] + counts[:-1]) if counts else np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_rows(cls, model: type[BaseModel], date_field: str, rows: list[BaseModel]) -> "CompressedEvents":
+        """Compress validated rows, in any order."""
+        rows = sorted(rows, key=lambda row: getattr(row, date_field)[:10])
+        blocks, counts = _encode_blocks(model, rows)
+        return cls(model, date_field, _event_dates(rows, date_field), blocks, counts)
+
+    @classmethod
+    def from_payload(cls, model: type[BaseModel], date_field: str, payload: dict[str, any]) -> "CompressedEvents":
+        """Rebuild an instance from to_payload output without decompressing it.
+
+        Payloads written for other model fields are decoded and validated again,
+        raising ValidationError if they no longer fit the model.
+        """
+        blocks = [base64.b64decode(block) for block in payload["blocks"]]
+        if payload["fields"] != list(model.model_fields):
+            rows = [model.model_validate(row) for block in blocks for row in _decode_columns(block)]
+            return cls.from_rows(model, date_field, rows)
+        dates = np.frombuffer(base64.b64decode(payload["days"]), dtype=np.int32).astype("datetime64[D]")
+        return cls(model, date_field, dates, blocks, list(payload["counts"]))
+
+    def to_payload(self) -> dict[str, any]:
+        """A JSON-serializable form that keeps the blocks compressed."""
+        return {
+            "fields": list(self.model.model_fields),
+            "days": base64.b64encode(self.dates.astype(np.int32).tobytes()).decode("ascii"),
+            "counts": self.counts,
+            "blocks": [base64.b64encode(block).decode("ascii") for block in self.blocks],
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the compressed blocks and the date index."""
+        return sum(sys.getsizeof(block) for block in self.blocks) + self.dates.nbytes + self.starts.nbytes
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for block in self.blocks:
+            yield from _decode_block(self.model, block)
+
+    def __getitem__(self, index: int | slice) -> BaseModel | list[BaseModel]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self._rows(0, len(self))[index]
+            return self._rows(start, stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        block = self._block_of(index)
+        return _decode_block(self.model, self.blocks[block])[index - int(self.starts[block])]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (CompressedEvents, list, tuple)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def bisect_left(self, day: str) -> int:
+        """Index of the first event dated on or after `day`."""
+        return int(np.searchsorted(self.dates, np.datetime64(day[:10], "D"), side="left"))
+
+    def bisect_right(self, day: str) -> int:
+        """Index after the last event dated on or before `day`."""
+        return int(np.searchsorted(self.dates, np.datetime64(day[:10], "D"), side="right"))
+
+    def merge(self, rows: list[BaseModel]) -> tuple["CompressedEvents", list[BaseModel]]:
+        """Add rows, skipping exact duplicates. Returns the merged events and the rows added.
+
+        Only the blocks from the one holding the oldest new row onward are rebuilt;
+        new events usually land in the last block.
+        """
+        if not rows:
+            return self, []
+        date_key = lambda row: getattr(row, self.date_field)[:10]
+        first = self.bisect_left(min(date_key(row) for row in rows))
+        block = max(self._block_of(first), 0)
+        start = int(self.starts[block]) if self.blocks else 0
+
+        tail = self._rows(start, len(self))
+        added = _merge_events(tail, rows, date_key)
+        if not added:
+            return self, []
+        blocks, counts = _encode_blocks(self.model, tail)
+        dates = np.concatenate([self.dates[:start], _event_dates(tail, self.date_field)])
+        return CompressedEvents(self.model, self.date_field, dates, self.blocks[:block] + blocks, self.counts[:block] + counts), added
+
+    def _block_of(self, index: int) -> int:
+        return int(np.searchsorted(self.starts, index, side="right")) - 1
+
+    def _rows(self, start: int, stop: int) -> list[BaseModel]:
+        rows: list[BaseModel] = []
+        if start >= stop:
+            return rows
+        block = self._block_of(start)
+        while block < len(self.blocks) and self.starts[block] < stop:
+            offset = int(self.starts[block])
+            rows.extend(_decode_block(self.model, self.blocks[block])[max(start - offset, 0) : stop - offset])
+            block += 1
+        return rows
+
+
+def _event_dates(rows: list[BaseModel], date_field: str) -> np.ndarray:
+    return np.array([getattr(row, date_field)[:10] for row in rows], dtype="datetime64[D]")
+
+
+def _merge_events(rows: list[BaseModel], new_rows: list[BaseModel], date_key) -> list[BaseModel]:
+    """Insert events into a date-sorted list in place, skipping exact duplicates. Returns the ones added."""
+    added = []
+    for row in sorted(new_rows, key=date_key):
+        day = date_key(row)
+        if not rows or day > date_key(rows[-1]):
+            rows.append(row)
+            added.append(row)
+            continue
+        lo = bisect.bisect_left(rows, day, key=date_key)
+        hi = bisect.bisect_right(rows, day, key=date_key)
+        if row not in rows[lo:hi]:
+            rows.insert(hi, row)
+            added.append(row)
+    return added
+
+
+def _encode_blocks(model: type[BaseModel], rows: list[BaseModel]) -> tuple[list[bytes], list[int]]:
+    blocks, counts = [], []
+    for i in range(0, len(rows), BLOCK_ROWS):
+        chunk = rows[i : i + BLOCK_ROWS]
+        blocks.append(_encode_block(model, chunk))
+        counts.append(len(chunk))
+    return blocks, counts
+
+
+def _encode_block(model: type[BaseModel], rows: list[BaseModel]) -> bytes:
+    """Compress rows as columns; string columns with repeats become a table of distinct values plus codes."""
+    columns = {}
+    for field in model.model_fields:
+        values = [getattr(row, field) for row in rows]
+        distinct = list(dict.fromkeys(values))
+        if len(distinct) < len(values) and all(isinstance(value, str) or value is None for value in distinct):
+            codes = {value: code for code, value in enumerate(distinct)}
+            columns[field] = {"table": distinct, "codes": [codes[value] for value in values]}
+        else:
+            columns[field] = values
+    return zlib.compress(json.dumps(columns, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode_columns(block: bytes) -> list[dict[str, any]]:
+    columns = json.loads(zlib.decompress(block))
+    decoded = {}
+    for field, column in columns.items():
+        if isinstance(column, dict):
+            table = [sys.intern(value) if isinstance(value, str) else value for value in column["table"]]
+            column = [table[code] for code in column["codes"]]
+        decoded[field] = column
+    return [dict(zip(decoded, values)) for values in zip(*decoded.values())]
+
+
+def _decode_block(model: type[BaseModel], block: bytes) -> list[BaseModel]:
+    """Rows of a block, from the shared cache of decoded blocks when possible. The list must not be modified."""
+    key = (model, block)
+    with _decoded_lock:
+        rows = _decoded.get(key)
+        if rows is not None:
+            _decoded.move_to_end(key)
+            return rows
+
+    # Rows were validated before they were compressed
+    rows = [model.model_construct(**fields) for fields in _decode_columns(block)]
+    with _decoded_lock:
+        _decoded[key] = rows
+        while len(_decoded) > DECODED_BLOCKS:
+            _decoded.popitem(last=False)
+    return rows
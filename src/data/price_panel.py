@@ -0,0 +1,132 @@
+"""Price panel files: aligned price matrices that processes memory-map read-only.
+
+A panel holds the open/high/low/close/volume bars of many tickers over one date
+range as (tickers x dates) matrices. Every process that opens the same file maps
+the same pages, so backtests fanned out over a process pool share one copy of the
+prices and read them without deserializing anything.
+
+Layout: an 8-byte magic, an 8-byte little-endian header length, a JSON header
+describing the arrays, then each array's raw bytes at a 64-byte aligned offset.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+from src.data.price_series import PRICE_COLUMNS, PriceSeries
+
+PANEL_MAGIC = b"PRCPANL1"
+PANEL_ALIGNMENT = 64
+
+
+class PricePanel:
+    """A price panel file mapped into memory read-only.
+
+    ``dates`` (datetime64[D]) and ``time`` (the raw bar time of each date) index
+    the columns; ``open``, ``close``, ``high`` and ``low`` are float64 matrices with
+    NaN where a ticker has no bar, ``volume`` an int64 matrix with 0 there.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(PANEL_MAGIC)) != PANEL_MAGIC:
+                raise ValueError(f"{path} is not a price panel file")
+            (header_size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_size))
+        data_offset = _aligned(len(PANEL_MAGIC) + 8 + header_size)
+
+        self.tickers: list[str] = header["tickers"]
+        self.start_date: str = header["start_date"]
+        self.end_date: str = header["end_date"]
+        self.built_on: str = header["built_on"]
+        self._rows = {ticker: row for row, ticker in enumerate(self.tickers)}
+
+        arrays = {name: _map(path, data_offset + spec["offset"], spec["dtype"], tuple(spec["shape"])) for name, spec in header["arrays"].items()}
+        self.dates: np.ndarray = arrays["dates"]
+        self.time: np.ndarray = arrays["time"]
+        self.open: np.ndarray = arrays["open"]
+        self.close: np.ndarray = arrays["close"]
+        self.high: np.ndarray = arrays["high"]
+        self.low: np.ndarray = arrays["low"]
+        self.volume: np.ndarray = arrays["volume"]
+        self.index = pd.DatetimeIndex(pd.to_datetime(np.asarray(self.time)), name="Date")
+
+    def covers(self, ticker: str, start_date: str, end_date: str) -> bool:
+        """Whether the panel holds the ticker's final bars for all of [start_date, end_date].
+
+        Bars on or after the day the panel was built could still change, so ranges
+        reaching that day are left to the API.
+        """
+        return ticker in self._rows and self.start_date <= start_date[:10] and end_date[:10] <= self.end_date and end_date[:10] < self.built_on
+
+    def series(self, ticker: str, start_date: str, end_date: str) -> PriceSeries:
+        """The ticker's bars in [start_date, end_date]; views of the mapped file when it has no gaps there."""
+        row = self._rows[ticker]
+        lo = np.searchsorted(self.dates, np.datetime64(start_date[:10], "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end_date[:10], "D"), side="right")
+        present = ~np.isnan(self.close[row, lo:hi])
+        columns = slice(lo, hi) if present.all() else lo + np.flatnonzero(present)
+        return PriceSeries(
+            **{column: getattr(self, column)[row, columns] for column in PRICE_COLUMNS},
+            time=self.time[columns],
+            dates=self.dates[columns],
+            index=self.index[columns],
+        )
+
+    def frame(self, column: str) -> pd.DataFrame:
+        """One price column for every ticker as a (dates x tickers) DataFrame sharing the mapped memory."""
+        return pd.DataFrame(getattr(self, column).T, index=self.index, columns=self.tickers, copy=False)
+
+
+def write_price_panel(path: str, series: dict[str, PriceSeries], start_date: str, end_date: str, built_on: str):
+    """Write the bars of each ticker in [start_date, end_date] to a panel file at `path`.
+
+    The columns are the dates on which any ticker has a bar. The file is written
+    next to `path` and moved into place, so processes reading the old panel keep
+    a consistent view.
+    """
+    windows = {ticker: prices.slice(start_date, end_date) for ticker, prices in series.items()}
+    dates, first = np.unique(np.concatenate([window.dates for window in windows.values()] or [np.array([], dtype="datetime64[D]")]), return_index=True)
+    times = np.concatenate([window.time for window in windows.values()] or [np.array([], dtype=np.str_)])[first]
+
+    matrices = {column: np.full((len(windows), len(dates)), np.nan) for column in ("open", "close", "high", "low")}
+    matrices["volume"] = np.zeros((len(windows), len(dates)), dtype=np.int64)
+    for row, window in enumerate(windows.values()):
+        positions = np.searchsorted(dates, window.dates)
+        for column in PRICE_COLUMNS:
+            matrices[column][row, positions] = getattr(window, column)
+
+    arrays = {"dates": dates, "time": times, **matrices}
+    specs, offset = {}, 0
+    for name, array in arrays.items():
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"tickers": list(windows), "start_date": start_date[:10], "end_date": end_date[:10], "built_on": built_on, "arrays": specs}).encode("utf-8")
+    data_offset = _aligned(len(PANEL_MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PANEL_MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, array in arrays.items():
+            f.seek(data_offset + specs[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // PANEL_ALIGNMENT) * PANEL_ALIGNMENT
+
+
+def _map(path: str, offset: int, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+    if 0 in shape:
+        # mmap cannot map zero bytes
+        array = np.empty(shape, dtype=dtype)
+        array.flags.writeable = False
+        return array
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
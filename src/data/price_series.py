@@ -0,0 +1,111 @@
+"""Columnar storage for daily price bars."""
+
+import numpy as np
+import pandas as pd
+
+from src.data.models import Price
+
+PRICE_COLUMNS = ("open", "close", "high", "low", "volume")
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class PriceSeries:
+    """Price bars for one ticker as contiguous NumPy columns, sorted by time.
+
+    Columns are float64 (open, close, high, low) and int64 (volume) arrays next to
+    the raw ``time`` strings, their calendar ``dates`` as datetime64[D] and a
+    parsed DatetimeIndex. Arrays are read-only and shared: slicing and
+    :meth:`to_frame` return views, never copies.
+    """
+
+    __slots__ = ("open", "close", "high", "low", "volume", "time", "dates", "index")
+
+    def __init__(self, open: np.ndarray, close: np.ndarray, high: np.ndarray, low: np.ndarray, volume: np.ndarray, time: np.ndarray, index: pd.DatetimeIndex | None = None, dates: np.ndarray | None = None):
+        self.open = _readonly(np.asarray(open, dtype=np.float64))
+        self.close = _readonly(np.asarray(close, dtype=np.float64))
+        self.high = _readonly(np.asarray(high, dtype=np.float64))
+        self.low = _readonly(np.asarray(low, dtype=np.float64))
+        self.volume = _readonly(np.asarray(volume, dtype=np.int64))
+        self.time = _readonly(np.asarray(time, dtype=np.str_))
+        self.dates = _readonly(np.asarray(dates, dtype="datetime64[D]") if dates is not None else self.time.astype("U10").astype("datetime64[D]"))
+        self.index = index if index is not None else pd.DatetimeIndex(pd.to_datetime(self.time), name="Date")
+
+    @classmethod
+    def from_prices(cls, prices: list[Price]) -> "PriceSeries":
+        """Build a series from validated Price models, in any order."""
+        prices = sorted(prices, key=lambda price: price.time)
+        return cls(
+            open=[price.open for price in prices],
+            close=[price.close for price in prices],
+            high=[price.high for price in prices],
+            low=[price.low for price in prices],
+            volume=[price.volume for price in prices],
+            time=[price.time for price in prices],
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def _take(self, indexer: slice | np.ndarray) -> "PriceSeries":
+        series = object.__new__(PriceSeries)
+        for name in PriceSeries.__slots__:
+            setattr(series, name, getattr(self, name)[indexer])
+        return series
+
+    def slice(self, start_date: str, end_date: str) -> "PriceSeries":
+        """Bars whose date falls in [start_date, end_date], as a view."""
+        lo = np.searchsorted(self.dates, np.datetime64(start_date[:10], "D"), side="left")
+        hi = np.searchsorted(self.dates, np.datetime64(end_date[:10], "D"), side="right")
+        return self._take(slice(lo, hi))
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Combine two series; a bar in `other` replaces one in this series with the same time."""
+        if not len(self):
+            return other
+        if not len(other):
+            return self
+        if other.time[0] > self.time[-1]:
+            order = np.arange(len(self) + len(other))
+        else:
+            times = np.concatenate([self.time, other.time])
+            # A stable sort keeps the bar from `other` last among equal times; keep only that one
+            order = np.argsort(times, kind="stable")
+            sorted_times = times[order]
+            keep = np.append(sorted_times[1:] != sorted_times[:-1], True)
+            order = order[keep]
+        return PriceSeries(
+            **{column: np.concatenate([getattr(self, column), getattr(other, column)])[order] for column in PRICE_COLUMNS},
+            time=np.concatenate([self.time, other.time])[order],
+            index=self.index.append(other.index)[order],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns and index."""
+        return sum(getattr(self, name).nbytes for name in ("open", "close", "high", "low", "volume", "time", "dates")) + self.index.nbytes
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the bars as a DataFrame indexed by Date, sharing memory with this series.
+
+        The frame matches what prices_to_df builds from Price models. Its columns
+        are read-only views; call ``.copy()`` before modifying values in place
+        (adding new columns is fine).
+        """
+        columns = {column: getattr(self, column) for column in PRICE_COLUMNS}
+        columns["time"] = self.time
+        return pd.DataFrame(columns, index=self.index, copy=False)
+
+    def to_prices(self) -> list[Price]:
+        """Materialize the bars as Price models."""
+        return [
+            Price(open=open, close=close, high=high, low=low, volume=volume, time=time)
+            for open, close, high, low, volume, time in zip(self.open.tolist(), self.close.tolist(), self.high.tolist(), self.low.tolist(), self.volume.tolist(), self.time.tolist())
+        ]
+
+    def to_records(self) -> list[dict[str, any]]:
+        """The bars as plain dicts, in the shape of the prices API."""
+        return [price.model_dump() for price in self.to_prices()]
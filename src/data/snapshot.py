@@ -0,0 +1,91 @@
+"""Offline dataset snapshots: the cached data of a universe in one versioned zip bundle.
+
+A bundle holds a manifest, the price bars as NumPy columns (prices.npz) and every
+other dataset as JSON in the persistent store's format, keyed as in the cache.
+Export one with Cache.export_snapshot (or --export-snapshot after a run) and load
+it with Cache.load_snapshot (or --snapshot, or FINANCIAL_DATASETS_SNAPSHOT for
+the backend) to run without the API.
+"""
+
+import io
+import json
+import os
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.data.cache_store import encode
+from src.data.price_series import PRICE_COLUMNS, PriceSeries
+
+SNAPSHOT_FORMAT = "ai-hedge-fund-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(path: str, entries: dict[str, dict[str, any]], tickers: list[str]) -> dict[str, any]:
+    """Write cache entries ({dataset: {key: value}}) to a bundle at `path` and return its manifest."""
+    prices: dict[str, PriceSeries] = entries.get("prices", {})
+    dates = np.concatenate([series.dates for series in prices.values()] or [np.array([], dtype="datetime64[D]")])
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tickers": sorted(tickers),
+        "start_date": str(dates.min()) if len(dates) else None,
+        "end_date": str(dates.max()) if len(dates) else None,
+        "datasets": {dataset: len(values) for dataset, values in entries.items() if values},
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("manifest.json", json.dumps(manifest, indent=2))
+        if prices:
+            # Already compressed by savez_compressed, so stored as is
+            bundle.writestr("prices.npz", _price_arrays(prices), compress_type=zipfile.ZIP_STORED)
+        for dataset, values in entries.items():
+            if dataset != "prices" and values:
+                bundle.writestr(f"{dataset}.json", json.dumps(values, separators=(",", ":"), default=encode))
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def read_snapshot(path: str) -> tuple[dict[str, any], dict[str, dict[str, any]]]:
+    """Read a bundle into its manifest and entries; prices as PriceSeries, other datasets as stored JSON."""
+    with zipfile.ZipFile(path) as bundle:
+        names = set(bundle.namelist())
+        manifest = json.loads(bundle.read("manifest.json")) if "manifest.json" in names else {}
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a dataset snapshot")
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {manifest.get('version')} in {path}; expected {SNAPSHOT_VERSION}")
+
+        entries: dict[str, dict[str, any]] = {}
+        if "prices.npz" in names:
+            entries["prices"] = _price_series(bundle.read("prices.npz"))
+        for name in sorted(names - {"manifest.json", "prices.npz"}):
+            if name.endswith(".json"):
+                entries[name[: -len(".json")]] = json.loads(bundle.read(name))
+    return manifest, entries
+
+
+def _price_arrays(prices: dict[str, PriceSeries]) -> bytes:
+    """Every ticker's bars as concatenated columns plus per-ticker row counts, in NPZ format."""
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        tickers=np.array(list(prices), dtype=np.str_),
+        counts=np.array([len(series) for series in prices.values()], dtype=np.int64),
+        time=np.concatenate([series.time for series in prices.values()]),
+        **{column: np.concatenate([getattr(series, column) for series in prices.values()]) for column in PRICE_COLUMNS},
+    )
+    return buffer.getvalue()
+
+
+def _price_series(data: bytes) -> dict[str, PriceSeries]:
+    with np.load(io.BytesIO(data)) as arrays:
+        columns = {name: arrays[name] for name in ("time", *PRICE_COLUMNS)}
+        tickers, counts = arrays["tickers"].tolist(), arrays["counts"]
+    ends = np.cumsum(counts)
+    return {ticker: PriceSeries(**{name: column[end - count : end] for name, column in columns.items()}) for ticker, count, end in zip(tickers, counts, ends)}
@@ -0,0 +1,159 @@
+"""Counters for cache effectiveness and API traffic, broken down per dataset and per agent."""
+
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+# Upper bounds, in seconds, of the HTTP latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_agent: ContextVar[str | None] = ContextVar("current_agent", default=None)
+_data_ages: ContextVar[dict | None] = ContextVar("data_ages", default=None)
+_data_ages_lock = threading.Lock()
+
+
+def current_agent() -> str | None:
+    """The agent whose data calls are currently being recorded, if any."""
+    return _current_agent.get()
+
+
+@contextmanager
+def agent_context(agent_id: str):
+    """Attribute data calls made inside the block to `agent_id`."""
+    token = _current_agent.set(agent_id)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def with_agent_context(func: Callable, agent_id: str) -> Callable:
+    """Wrap a graph node so that its data calls are attributed to `agent_id`."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with agent_context(agent_id):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def track_data_age():
+    """Collect how old the live data served inside the block was.
+
+    Yields a dict filled as data is served: {dataset: {ticker: {"age_seconds", "stale"}}},
+    keeping the oldest data served per ticker. Only live data is tracked.
+    """
+    ages: dict[str, dict[str, dict]] = {}
+    token = _data_ages.set(ages)
+    try:
+        yield ages
+    finally:
+        _data_ages.reset(token)
+
+
+def record_data_age(dataset: str, ticker: str, age_seconds: float, stale: bool):
+    """Note the age of live data served to the surrounding track_data_age block, if any."""
+    ages = _data_ages.get()
+    if ages is None:
+        return
+    with _data_ages_lock:
+        current = ages.setdefault(dataset, {}).get(ticker)
+        if current is None or age_seconds > current["age_seconds"]:
+            ages[dataset][ticker] = {"age_seconds": round(age_seconds, 1), "stale": stale}
+
+
+def _new_dataset_stats() -> dict:
+    return {
+        "hits": 0,
+        "misses": 0,
+        "stale_hits": 0,
+        "refreshes": 0,
+        "requests": 0,
+        "retries": 0,
+        "rate_limited": 0,
+        "errors": 0,
+        "bytes": 0,
+        "latency_seconds": 0.0,
+        "latency_histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+    }
+
+
+def _new_agent_stats() -> dict:
+    return {"hits": 0, "misses": 0, "requests": 0}
+
+
+class DataStats:
+    """Thread-safe counters for cache lookups and HTTP requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._datasets: dict[str, dict] = {}
+            self._agents: dict[str, dict[str, dict]] = {}
+
+    def _dataset(self, dataset: str) -> dict:
+        return self._datasets.setdefault(dataset, _new_dataset_stats())
+
+    def _agent(self, dataset: str) -> dict | None:
+        agent = current_agent()
+        if agent is None:
+            return None
+        return self._agents.setdefault(agent, {}).setdefault(dataset, _new_agent_stats())
+
+    def record_lookup(self, dataset: str, hit: bool, stale: bool = False):
+        """Record whether a data call was answered from the cache, and whether with stale data."""
+        field = "hits" if hit else "misses"
+        with self._lock:
+            self._dataset(dataset)[field] += 1
+            if stale:
+                self._dataset(dataset)["stale_hits"] += 1
+            if (agent := self._agent(dataset)) is not None:
+                agent[field] += 1
+
+    def record_refresh(self, dataset: str):
+        """Record a background refresh of stale data."""
+        with self._lock:
+            self._dataset(dataset)["refreshes"] += 1
+
+    def record_request(self, dataset: str, seconds: float, status_code: int, nbytes: int = 0):
+        """Record one HTTP attempt with its latency, status code and response size."""
+        with self._lock:
+            stats = self._dataset(dataset)
+            stats["requests"] += 1
+            stats["bytes"] += nbytes
+            stats["latency_seconds"] += seconds
+            stats["latency_histogram"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if status_code == 429:
+                stats["rate_limited"] += 1
+            elif status_code >= 400:
+                stats["errors"] += 1
+            if (agent := self._agent(dataset)) is not None:
+                agent["requests"] += 1
+
+    def record_retry(self, dataset: str):
+        with self._lock:
+            self._dataset(dataset)["retries"] += 1
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serializable copy of every counter."""
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        with self._lock:
+            datasets = {}
+            for dataset, stats in self._datasets.items():
+                lookups = stats["hits"] + stats["misses"]
+                datasets[dataset] = {
+                    **{key: value for key, value in stats.items() if key != "latency_histogram"},
+                    "hit_rate": stats["hits"] / lookups if lookups else None,
+                    "mean_latency_seconds": stats["latency_seconds"] / stats["requests"] if stats["requests"] else None,
+                    "latency_histogram": dict(zip(labels, stats["latency_histogram"])),
+                }
+            agents = {agent: {dataset: dict(stats) for dataset, stats in by_dataset.items()} for agent, by_dataset in self._agents.items()}
+        return {"datasets": datasets, "agents": agents}
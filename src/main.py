@@ -11,6 +11,9 @@ from src.graph.state import AgentState
 from src.utils.display import print_trading_output
 from src.utils.analysts import ANALYST_ORDER, get_analyst_nodes
 from src.utils.progress import progress
+from src.data.cache import get_cache
+from src.data.stats import with_agent_context
+from src.tools.api import configure_base_url, configure_cassette, configure_price_panel
 from src.llm.models import LLM_ORDER, OLLAMA_LLM_ORDER, get_model_info, ModelProvider
 from src.utils.ollama import ensure_ollama_and_model
 
@@ -113,12 +116,12 @@ def create_workflow(selected_analysts=None):
     # Add selected analyst nodes
     for analyst_key in selected_analysts:
         node_name, node_func = analyst_nodes[analyst_key]
-        workflow.add_node(node_name, node_func)
+        workflow.add_node(node_name, with_agent_context(node_func, node_name))
         workflow.add_edge("start_node", node_name)
 
     # Always add risk and portfolio management
-    workflow.add_node("risk_management_agent", risk_management_agent)
-    workflow.add_node("portfolio_manager", portfolio_management_agent)
+    workflow.add_node("risk_management_agent", with_agent_context(risk_management_agent, "risk_management_agent"))
+    workflow.add_node("portfolio_manager", with_agent_context(portfolio_management_agent, "portfolio_manager"))
 
     # Connect selected analysts to risk management
     for analyst_key in selected_analysts:
@@ -146,9 +149,28 @@ if __name__ == "__main__":
     parser.add_argument("--show-reasoning", action="store_true", help="Show reasoning from each agent")
     parser.add_argument("--show-agent-graph", action="store_true", help="Show the agent graph")
     parser.add_argument("--ollama", action="store_true", help="Use Ollama for local LLM inference")
+    parser.add_argument("--data-base-url", type=str, help="Base URL of the financial data API, e.g. a local mock server. Defaults to FINANCIAL_DATASETS_BASE_URL or the public API")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record-data", type=str, metavar="PATH", help="Record every financial data API response to this cassette file")
+    cassette_group.add_argument("--replay-data", type=str, metavar="PATH", help="Serve financial data from this cassette file instead of the API")
+    parser.add_argument("--price-panel", type=str, metavar="PATH", help="Serve historical prices from this price panel file (see python -m src.tools.warm_cache --price-panel)")
+    parser.add_argument("--snapshot", type=str, metavar="PATH", help="Load this dataset snapshot bundle into the cache before running")
+    parser.add_argument("--export-snapshot", type=str, metavar="PATH", help="Write the data this run used to a dataset snapshot bundle")
 
     args = parser.parse_args()
 
+    if args.data_base_url:
+        configure_base_url(args.data_base_url)
+    if args.record_data:
+        configure_cassette(args.record_data, "record")
+    elif args.replay_data:
+        configure_cassette(args.replay_data, "replay")
+    if args.price_panel:
+        configure_price_panel(args.price_panel)
+    if args.snapshot:
+        manifest = get_cache().load_snapshot(args.snapshot)
+        print(f"Loaded dataset snapshot of {len(manifest['tickers'])} tickers created {manifest['created_at']}")
+
     # Parse tickers from comma-separated string
     tickers = [ticker.strip() for ticker in args.tickers.split(",")]
 
@@ -319,3 +341,5 @@ if __name__ == "__main__":
         model_provider=model_provider,
     )
     print_trading_output(result)
+    if args.export_snapshot:
+        get_cache().export_snapshot(args.export_snapshot, tickers)
@@ -1,11 +1,22 @@
 import datetime
+import functools
+import inspect
+import json
 import os
 import pandas as pd
+import random
 import requests
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from urllib.parse import parse_qsl, urlparse
 
-from src.data.cache import get_cache
+from src.data.cache import EVENT_DATE_FIELDS, STALE_WHILE_REVALIDATE, Cache, get_cache, live_data_ttl
+from src.data.price_panel import PricePanel, write_price_panel
+from src.data.price_series import PriceSeries
 from src.data.models import (
+    CompanyFacts,
     CompanyNews,
     CompanyNewsResponse,
     FinancialMetrics,
@@ -18,77 +29,439 @@ from src.data.models import (
     InsiderTradeResponse,
     CompanyFactsResponse,
 )
+from src.data.stats import record_data_age
+from src.tools.cassette import Cassette, default_cassette
+from src.tools.rate_limiter import RateLimiter, retry_after_delay
+from src.tools.single_flight import SingleFlight
 
 # Global cache instance
 _cache = get_cache()
 
+# Where requests are sent; overridable so runs can target a local mock server (src/tools/mock_server.py)
+DEFAULT_BASE_URL = "https://api.financialdatasets.ai"
+_base_url: str | None = None
+
+
+def configure_base_url(base_url: str | None = None) -> str:
+    """Send every request to `base_url`, falling back to FINANCIAL_DATASETS_BASE_URL, then the public API."""
+    global _base_url
+    _base_url = (base_url or os.environ.get("FINANCIAL_DATASETS_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+    return _base_url
+
+
+def _get_base_url() -> str:
+    return _base_url if _base_url is not None else configure_base_url()
+
+
+# Shared HTTP session, created on first use so that settings from .env files are picked up
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+_timeout: tuple[float, float] = (10.0, 60.0)
+
+
+def configure_http_client(pool_size: int | None = None, connect_timeout: float | None = None, read_timeout: float | None = None) -> requests.Session:
+    """
+    (Re)create the pooled HTTP session used for every financialdatasets.ai request.
+
+    Unset arguments fall back to FINANCIAL_DATASETS_POOL_SIZE, FINANCIAL_DATASETS_CONNECT_TIMEOUT
+    and FINANCIAL_DATASETS_READ_TIMEOUT, then to 20 connections, 10s and 60s.
+    """
+    global _session, _timeout
+    pool_size = pool_size or int(os.environ.get("FINANCIAL_DATASETS_POOL_SIZE", "20"))
+    connect_timeout = connect_timeout or float(os.environ.get("FINANCIAL_DATASETS_CONNECT_TIMEOUT", "10"))
+    read_timeout = read_timeout or float(os.environ.get("FINANCIAL_DATASETS_READ_TIMEOUT", "60"))
+
+    session = requests.Session()
+    # Keep-alive is on by default for a Session; the adapter controls how many connections are reused
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    with _session_lock:
+        _session = session
+        _timeout = (connect_timeout, read_timeout)
+    return session
+
+
+def _get_session() -> requests.Session:
+    """Return the shared HTTP session, creating it on first use."""
+    session = _session
+    if session is None:
+        session = configure_http_client()
+    return session
+
+
+# Identical data requests made concurrently (parallel graph branches, several backend runs) share one fetch
+_in_flight = SingleFlight()
+
+
+def _single_flight(func):
+    """Let concurrent calls with the same arguments wait on one in-flight call and share its result."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, repr(sorted(bound.arguments.items())))
+        return _in_flight.do(key, func, *args, **kwargs)
+
+    return wrapper
+
+
+# Live data past its TTL but within its STALE_WHILE_REVALIDATE budget is served right away and
+# refreshed by this pool instead, at most one refresh per query at a time
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="data-refresh")
+_refreshing: dict[tuple, Future] = {}
+_refreshing_lock = threading.Lock()
+
+
+def _refresh_in_background(dataset: str, key: tuple, refresh):
+    """Run `refresh()` on the refresh pool unless a refresh for `key` is already queued or running."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _cache.recorder.record_refresh(dataset)
+        _refreshing[key] = _refresh_executor.submit(_run_refresh, key, refresh)
+
+
+def _run_refresh(key: tuple, refresh):
+    try:
+        refresh()
+    except Exception as e:
+        print(f"Background refresh failed: {' '.join(map(str, key))} - {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.pop(key, None)
+
+
+def wait_for_background_refreshes(timeout: float | None = None):
+    """Block until the background refreshes started so far have finished."""
+    with _refreshing_lock:
+        pending = list(_refreshing.values())
+    wait(pending, timeout=timeout)
+
+
+def _record_live_data_age(dataset: str, ticker: str, start_date: str, end_date: str, stale: bool = False):
+    age = _cache.live_data_age(dataset, ticker, start_date, end_date)
+    if age is not None:
+        record_data_age(dataset, ticker, age, stale)
+
+
+# Client-side limiter shared by every request, with one token bucket per API key
+_rate_limiter = RateLimiter()
+
+# Backoff for 429s without a Retry-After header: exponential from BACKOFF_BASE, capped at BACKOFF_CAP, with jitter
+BACKOFF_BASE = 10.0
+BACKOFF_CAP = 120.0
+
+
+def configure_rate_limit(api_key: str | None, requests_per_minute: float | None, burst: int | None = None):
+    """Pace requests made with `api_key` to `requests_per_minute`, allowing bursts of `burst`."""
+    _rate_limiter.configure(api_key, requests_per_minute, burst)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with equal jitter: half the step is fixed, half is random."""
+    step = min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt)
+    return step / 2 + random.uniform(0, step / 2)
+
+
+# API path prefixes and the dataset their traffic is recorded under
+_ENDPOINT_DATASETS = {
+    "/prices/": "prices",
+    "/financial-metrics/": "financial_metrics",
+    "/financials/search/line-items": "line_items",
+    "/insider-trades/": "insider_trades",
+    "/news/": "company_news",
+    "/company/facts/": "company_facts",
+}
+
+
+# Optional record/replay of every request, resolved from FINANCIAL_DATASETS_CASSETTE on first use
+_cassette: Cassette | None = None
+_cassette_resolved = False
+
+
+def configure_cassette(path: str | None, mode: str = "replay") -> Cassette | None:
+    """
+    Record every request to, or replay every request from, the cassette file at `path`.
+
+    In "record" mode requests go to the API and their responses are appended to the file.
+    In "replay" mode responses are served from the file without any network access, and a
+    request whose data no recorded response holds raises CassetteMiss. The cache works as
+    usual either way. Pass None to turn recording off.
+    """
+    global _cassette, _cassette_resolved
+    _cassette = Cassette(path, mode) if path else None
+    _cassette_resolved = True
+    return _cassette
+
+
+def _get_cassette() -> Cassette | None:
+    global _cassette, _cassette_resolved
+    if not _cassette_resolved:
+        _cassette = default_cassette()
+        _cassette_resolved = True
+    return _cassette
+
+
+def _today() -> str:
+    """Today's date, or the day the cassette was recorded on when replaying one."""
+    cassette = _get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return cassette.recorded_on
+    return datetime.datetime.now().strftime("%Y-%m-%d")
+
+
+# Optional memory-mapped price panel answering historical price requests, resolved from FINANCIAL_DATASETS_PRICE_PANEL on first use
+_price_panel: PricePanel | None = None
+_price_panel_resolved = False
+
+
+def configure_price_panel(path: str | None) -> PricePanel | None:
+    """
+    Serve price requests from the panel file at `path` (see build_price_panel) where it covers them.
+
+    Processes that configure the same file share its pages, so a pool of backtest
+    workers holds one copy of the prices. Pass None to stop using a panel.
+    """
+    global _price_panel, _price_panel_resolved
+    _price_panel = PricePanel(path) if path else None
+    _price_panel_resolved = True
+    return _price_panel
+
+
+def _get_price_panel() -> PricePanel | None:
+    global _price_panel, _price_panel_resolved
+    if not _price_panel_resolved:
+        path = os.environ.get("FINANCIAL_DATASETS_PRICE_PANEL")
+        _price_panel = PricePanel(os.path.expanduser(path)) if path else None
+        _price_panel_resolved = True
+    return _price_panel
+
+
+def _endpoint_dataset(url: str) -> str:
+    path = urlparse(url).path
+    for prefix, dataset in _ENDPOINT_DATASETS.items():
+        if path.startswith(prefix):
+            return dataset
+    return path
+
+
+def _covering_payload(cassette: Cassette, url: str, json_data: dict | None) -> dict | None:
+    """
+    Answer a request that was not recorded as such from the recorded responses holding its data.
+
+    Most calls fetch only what earlier calls left missing (price and event gaps, event
+    deltas, line items coalesced with the fields other agents asked for), so agents
+    finishing in another order than during recording make requests that differ from the
+    recorded ones. The recordings of the same endpoint and ticker are loaded into a
+    scratch cache the way the client caches them, and the request is answered from it
+    when the cache can answer it. Returns None otherwise, and always for company facts,
+    whose requests never vary.
+    """
+    dataset = _endpoint_dataset(url)
+    if dataset == "company_facts":
+        return None
+    params = dict(parse_qsl(urlparse(url).query))
+    tickers = json_data["tickers"] if dataset == "line_items" else [params["ticker"]]
+
+    # Successful responses of the endpoint for any of the request's tickers
+    recordings = []
+    for entry in cassette.recordings():
+        if entry["status_code"] != 200 or _endpoint_dataset(entry["url"]) != dataset:
+            continue
+        query = dict(parse_qsl(urlparse(entry["url"]).query))
+        if set(tickers) & set(entry["body"]["tickers"] if dataset == "line_items" else [query.get("ticker")]):
+            recordings.append((query, entry["body"], entry["content"]))
+
+    tape = Cache(store=None, max_bytes={})
+    tape.set_store(None)
+
+    if dataset == "prices":
+        ticker = params["ticker"]
+        for query, _, content in recordings:
+            tape.set_prices(ticker, PriceResponse(**json.loads(content)).prices, query["start_date"], query["end_date"])
+        series = tape.get_prices(ticker, params["start_date"], params["end_date"])
+        return {"ticker": ticker, "prices": series.to_records()} if series is not None else None
+
+    if dataset == "financial_metrics":
+        key, as_of = f"{params['ticker']}_{params['period']}", params["report_period_lte"]
+        # Deeper histories replace shallower ones
+        for query, _, content in sorted(recordings, key=lambda recording: int(recording[0]["limit"])):
+            if (query["period"], query["report_period_lte"]) == (params["period"], as_of):
+                tape.set_financial_metrics(key, FinancialMetricsResponse(**json.loads(content)).financial_metrics, as_of, int(query["limit"]))
+        rows = tape.get_financial_metrics(key, as_of, int(params["limit"]))
+        return {"financial_metrics": [row.model_dump() for row in rows]} if rows is not None else None
+
+    if dataset == "line_items":
+        as_of, period = json_data["end_date"], json_data["period"]
+        for _, body, content in recordings:
+            if (body["end_date"], body["period"]) != (as_of, period):
+                continue
+            search_results = LineItemResponse(**json.loads(content)).search_results
+            ticker_limit = body["limit"] // len(body["tickers"])
+            for ticker in body["tickers"]:
+                rows = sorted((row for row in search_results if row.ticker == ticker), key=lambda row: row.report_period, reverse=True)[:ticker_limit]
+                # As in search_line_items_batch, a short ticker on a full page may have been truncated
+                if len(search_results) >= body["limit"] and len(rows) < ticker_limit:
+                    continue
+                tape.set_line_items(f"{ticker}_{period}", rows, body["line_items"], ticker_limit, as_of)
+        ticker_limit = json_data["limit"] // len(tickers)
+        answers = [tape.get_line_items(f"{ticker}_{period}", json_data["line_items"], ticker_limit, as_of) for ticker in tickers]
+        return {"search_results": [row.model_dump() for rows in answers for row in rows]} if all(rows is not None for rows in answers) else None
+
+    if dataset in EVENT_DATE_FIELDS:
+        response_model, field, end_param, start_param = (InsiderTradeResponse, "insider_trades", "filing_date_lte", "filing_date_gte") if dataset == "insider_trades" else (CompanyNewsResponse, "news", "end_date", "start_date")
+        ticker, end_date, start_date, limit = params["ticker"], params[end_param], params.get(start_param), int(params["limit"])
+        for query, _, content in recordings:
+            tape.set_event_page(dataset, ticker, getattr(response_model(**json.loads(content)), field), query[end_param], query.get(start_param), int(query["limit"]))
+        rows = tape.get_events(dataset, ticker, end_date, start_date) if start_date else None
+        if rows is None:
+            # The newest `limit` events up to end_date hold those of any window ending there
+            rows = tape.get_events(dataset, ticker, end_date, limit=limit)
+        if rows is None:
+            return None
+        date_field = EVENT_DATE_FIELDS[dataset]
+        return {field: [row.model_dump() for row in rows if not start_date or getattr(row, date_field)[:10] >= start_date][:limit]}
+
+    return None
+
 
 def _make_api_request(url: str, headers: dict, method: str = "GET", json_data: dict = None, max_retries: int = 3) -> requests.Response:
     """
-    Make an API request with rate limiting handling and moderate backoff.
-    
+    Make an API request paced by the client-side rate limiter, retrying on 429.
+
+    Before each attempt the request waits for a token from its API key's bucket.
+    A 429 pauses that bucket for the Retry-After period if the server sends one,
+    or for a jittered exponential backoff otherwise, so concurrent callers back off
+    together. X-RateLimit-Remaining/X-RateLimit-Reset pause the bucket before a 429 happens.
+
     Args:
         url: The URL to request
         headers: Headers to include in the request
         method: HTTP method (GET or POST)
         json_data: JSON data for POST requests
         max_retries: Maximum number of retries (default: 3)
-    
+
     Returns:
         requests.Response: The response object
-    
+
     Raises:
         Exception: If the request fails with a non-429 error
+        CassetteMiss: If a cassette is being replayed and holds no response for the request
     """
+    dataset = _endpoint_dataset(url)
+    cassette = _get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        payload = None if cassette.has(method, url, json_data) else _covering_payload(cassette, url, json_data)
+        response = cassette.replay(method, url, json_data) if payload is None else cassette.response(url, json.dumps(payload))
+        _cache.recorder.record_request(dataset, 0.0, response.status_code, len(response.content))
+        return response
+
+    session = _get_session()
+    api_key = headers.get("X-API-KEY")
     for attempt in range(max_retries + 1):  # +1 for initial attempt
+        pacing = _rate_limiter.acquire(api_key)
+        if pacing > 0:
+            time.sleep(pacing)
+
+        started = time.perf_counter()
         if method.upper() == "POST":
-            response = requests.post(url, headers=headers, json=json_data)
+            response = session.post(url, headers=headers, json=json_data, timeout=_timeout)
         else:
-            response = requests.get(url, headers=headers)
-        
+            response = session.get(url, headers=headers, timeout=_timeout)
+        content = getattr(response, "content", b"")
+        _cache.recorder.record_request(dataset, time.perf_counter() - started, response.status_code, len(content) if isinstance(content, bytes) else 0)
+
+        _rate_limiter.update_from_headers(api_key, response.headers)
+
         if response.status_code == 429 and attempt < max_retries:
-            # Linear backoff: 60s, 90s, 120s, 150s...
-            delay = 60 + (30 * attempt)
-            print(f"Rate limited (429). Attempt {attempt + 1}/{max_retries + 1}. Waiting {delay}s before retrying...")
-            time.sleep(delay)
+            delay = retry_after_delay(response.headers)
+            if delay is None:
+                delay = _backoff_delay(attempt)
+            print(f"Rate limited (429). Attempt {attempt + 1}/{max_retries + 1}. Waiting {delay:.1f}s before retrying...")
+            _rate_limiter.pause(api_key, delay)
+            _cache.recorder.record_retry(dataset)
             continue
-        
+
         # Return the response (whether success, other errors, or final 429)
+        if cassette is not None:
+            cassette.record(method, url, json_data, response)
         return response
 
 
 def get_prices(ticker: str, start_date: str, end_date: str, api_key: str = None) -> list[Price]:
-    """Fetch price data from cache or API."""
-    # Create a cache key that includes all parameters to ensure exact matches
-    cache_key = f"{ticker}_{start_date}_{end_date}"
-    
-    # Check cache first - simple exact match
-    if cached_data := _cache.get_prices(cache_key):
-        return [Price(**price) for price in cached_data]
-
-    # If not in cache, fetch from API
+    """Fetch price data from cache or API as Price models."""
+    return get_price_series(ticker, start_date, end_date, api_key=api_key).to_prices()
+
+
+@_single_flight
+def get_price_series(ticker: str, start_date: str, end_date: str, api_key: str = None) -> PriceSeries:
+    """Fetch price data from cache or API, requesting only the date ranges not cached yet.
+
+    Returns a columnar view of the cached bars; prefer this over get_prices when only
+    the price columns or a DataFrame are needed.
+    """
+    # A configured price panel answers historical ranges without touching the cache
+    panel = _get_price_panel()
+    if panel is not None and panel.covers(ticker, start_date, end_date):
+        _cache.recorder.record_lookup("prices", hit=True)
+        return panel.series(ticker, start_date, end_date)
+
+    # Serve the range from cached bars if it has been fully fetched before
+    cached_data = _cache.get_prices(ticker, start_date, end_date)
+    stale = False
+    if cached_data is None:
+        # Recently expired live bars are served as they are while newer ones are fetched
+        cached_data = _cache.get_prices(ticker, start_date, end_date, max_stale=STALE_WHILE_REVALIDATE["prices"])
+        stale = cached_data is not None
+    _cache.recorder.record_lookup("prices", hit=cached_data is not None, stale=stale)
+    if cached_data is None:
+        # Otherwise fetch just the missing gaps
+        _fetch_price_gaps(ticker, start_date, end_date, api_key)
+        cached_data = _cache.get_prices(ticker, start_date, end_date)
+
+    _record_live_data_age("prices", ticker, start_date, end_date, stale)
+    if stale:
+        _refresh_in_background("prices", ("prices", ticker, start_date, end_date), lambda: _fetch_price_gaps(ticker, start_date, end_date, api_key))
+    return cached_data if cached_data is not None else PriceSeries.from_prices([])
+
+
+def _fetch_price_gaps(ticker: str, start_date: str, end_date: str, api_key: str = None):
+    """Fetch and cache the bars of every part of [start_date, end_date] not cached or expired."""
     headers = {}
     financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
     if financial_api_key:
         headers["X-API-KEY"] = financial_api_key
 
-    url = f"https://api.financialdatasets.ai/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={start_date}&end_date={end_date}"
-    response = _make_api_request(url, headers)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+    for gap_start, gap_end in _cache.get_missing_price_ranges(ticker, start_date, end_date):
+        url = f"{_get_base_url()}/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={gap_start}&end_date={gap_end}"
+        response = _make_api_request(url, headers)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+
+        # Parse response with Pydantic model
+        price_response = PriceResponse(**response.json())
+
+        # Cache the bars and record the gap as fetched, even if it held no trading days;
+        # a ticker without any bars is remembered as empty for a limited time
+        empty = not price_response.prices and not _cache.get_prices(ticker)
+        _cache.set_prices(ticker, price_response.prices, start_date=gap_start, end_date=gap_end, ttl=live_data_ttl("prices", gap_end, empty=empty))
 
-    # Parse response with Pydantic model
-    price_response = PriceResponse(**response.json())
-    prices = price_response.prices
 
-    if not prices:
-        return []
+# Fundamentals are fetched as of today and this many periods deep, so a single fetch per ticker
+# answers the `report_period <= end_date` queries of every day in a backtest
+FUNDAMENTALS_HISTORY_LIMIT = 40
 
-    # Cache the results using the comprehensive cache key
-    _cache.set_prices(cache_key, [p.model_dump() for p in prices])
-    return prices
 
+def _fundamentals_as_of(end_date: str) -> str:
+    """The report_period_lte date to fetch fundamentals at: today, or end_date if it is later."""
+    return max(end_date, _today())
 
+
+@_single_flight
 def get_financial_metrics(
     ticker: str,
     end_date: str,
@@ -96,37 +469,44 @@ def get_financial_metrics(
     limit: int = 10,
     api_key: str = None,
 ) -> list[FinancialMetrics]:
-    """Fetch financial metrics from cache or API."""
-    # Create a cache key that includes all parameters to ensure exact matches
-    cache_key = f"{ticker}_{period}_{end_date}_{limit}"
-    
-    # Check cache first - simple exact match
-    if cached_data := _cache.get_financial_metrics(cache_key):
-        return [FinancialMetrics(**metric) for metric in cached_data]
-
-    # If not in cache, fetch from API
+    """Fetch financial metrics from the ticker's point-in-time history, fetching it once from the API."""
+    cache_key = f"{ticker}_{period}"
+
+    # Answer from the cached history when it reaches back far enough
+    cached_data = _cache.get_financial_metrics(cache_key, end_date, limit)
+    _cache.recorder.record_lookup("financial_metrics", hit=cached_data is not None)
+    if cached_data is not None:
+        return list(cached_data)
+
+    # If not in cache, fetch the history from the API
     headers = {}
     financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
     if financial_api_key:
         headers["X-API-KEY"] = financial_api_key
 
-    url = f"https://api.financialdatasets.ai/financial-metrics/?ticker={ticker}&report_period_lte={end_date}&limit={limit}&period={period}"
-    response = _make_api_request(url, headers)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+    as_of = _fundamentals_as_of(end_date)
+    fetch_limit = max(FUNDAMENTALS_HISTORY_LIMIT, (_cache.count_newer_periods("financial_metrics", cache_key, end_date) or 0) + limit)
+    while True:
+        url = f"{_get_base_url()}/financial-metrics/?ticker={ticker}&report_period_lte={as_of}&limit={fetch_limit}&period={period}"
+        response = _make_api_request(url, headers)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
 
-    # Parse response with Pydantic model
-    metrics_response = FinancialMetricsResponse(**response.json())
-    financial_metrics = metrics_response.financial_metrics
+        # Parse response with Pydantic model
+        metrics_response = FinancialMetricsResponse(**response.json())
+        financial_metrics = metrics_response.financial_metrics
 
-    if not financial_metrics:
-        return []
+        # An empty history is cached too, so tickers without fundamentals are not refetched on every call
+        _cache.set_financial_metrics(cache_key, financial_metrics, as_of, fetch_limit, ttl=live_data_ttl("financial_metrics", as_of, empty=not financial_metrics))
+        cached_data = _cache.get_financial_metrics(cache_key, end_date, limit)
+        if cached_data is not None:
+            return list(cached_data)
 
-    # Cache the results as dicts using the comprehensive cache key
-    _cache.set_financial_metrics(cache_key, [m.model_dump() for m in financial_metrics])
-    return financial_metrics
+        # More periods were reported after end_date than fetched; go deeper
+        fetch_limit = max(fetch_limit * 2, _cache.count_newer_periods("financial_metrics", cache_key, end_date) + limit)
 
 
+@_single_flight
 def search_line_items(
     ticker: str,
     line_items: list[str],
@@ -135,35 +515,213 @@ def search_line_items(
     limit: int = 10,
     api_key: str = None,
 ) -> list[LineItem]:
-    """Fetch line items from API."""
-    # If not in cache or insufficient data, fetch from API
+    """Fetch line items from the ticker's point-in-time history, requesting only the fields not cached yet."""
+    cache_key = f"{ticker}_{period}"
+
+    # Check cache first - every requested field must already be cached deep enough
+    missing_items = _cache.get_missing_line_items(cache_key, line_items, limit, end_date)
+    _cache.recorder.record_lookup("line_items", hit=not missing_items)
+    if missing_items:
+        # Fetch the missing fields together with those other agents have asked for, so later requests hit the cache
+        demanded_items, demanded_limit = _line_item_demand(period, line_items, limit)
+
+        headers = {}
+        financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
+        if financial_api_key:
+            headers["X-API-KEY"] = financial_api_key
+
+        url = f"{_get_base_url()}/financials/search/line-items"
+
+        as_of = _fundamentals_as_of(end_date)
+        fetch_limit = max(FUNDAMENTALS_HISTORY_LIMIT, (_cache.count_newer_periods("line_items", cache_key, end_date) or 0) + demanded_limit)
+        while True:
+            fetch_items = _cache.get_missing_line_items(cache_key, demanded_items, fetch_limit, as_of)
+            if not fetch_items:
+                break
+
+            body = {
+                "tickers": [ticker],
+                "line_items": fetch_items,
+                "end_date": as_of,
+                "period": period,
+                "limit": fetch_limit,
+            }
+            response = _make_api_request(url, headers, method="POST", json_data=body)
+            if response.status_code != 200:
+                raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+            data = response.json()
+            response_model = LineItemResponse(**data)
+            search_results = response_model.search_results[:fetch_limit]
+
+            # Cache the results per report period and field
+            _cache.set_line_items(cache_key, search_results, fetch_items, fetch_limit, as_of, ttl=live_data_ttl("line_items", as_of, empty=not search_results))
+            if not _cache.get_missing_line_items(cache_key, line_items, limit, end_date):
+                break
+
+            # More periods were reported after end_date than fetched; go deeper
+            fetch_limit = max(fetch_limit * 2, _cache.count_newer_periods("line_items", cache_key, end_date) + demanded_limit)
+
+    return list(_cache.get_line_items(cache_key, line_items, limit, end_date) or [])
+
+
+def search_line_items_batch(
+    tickers: list[str],
+    line_items: list[str],
+    end_date: str,
+    period: str = "ttm",
+    limit: int = 10,
+    api_key: str = None,
+    batch_size: int = 50,
+) -> dict[str, list[LineItem]]:
+    """
+    Fetch line items for many tickers with one request per batch of tickers.
+
+    Results are split back per ticker and cached exactly as search_line_items would,
+    so later single-ticker calls for the same fields are served from the cache.
+
+    Returns:
+        dict mapping each ticker to its line items, newest first.
+    """
+    demanded_items, demanded_limit = _line_item_demand(period, line_items, limit)
+    pending = [ticker for ticker in dict.fromkeys(tickers) if _cache.get_missing_line_items(f"{ticker}_{period}", line_items, limit, end_date)]
+    as_of = _fundamentals_as_of(end_date)
+
     headers = {}
     financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
     if financial_api_key:
         headers["X-API-KEY"] = financial_api_key
 
-    url = "https://api.financialdatasets.ai/financials/search/line-items"
+    url = f"{_get_base_url()}/financials/search/line-items"
+
+    for i in range(0, len(pending), batch_size):
+        batch = pending[i : i + batch_size]
+        fetch_limit = max(FUNDAMENTALS_HISTORY_LIMIT, max((_cache.count_newer_periods("line_items", f"{ticker}_{period}", end_date) or 0) for ticker in batch) + demanded_limit)
+        fetch_items = sorted({item for ticker in batch for item in _cache.get_missing_line_items(f"{ticker}_{period}", demanded_items, fetch_limit, as_of)})
+
+        # The limit may apply to the whole response rather than per ticker, so ask for enough rows for every ticker
+        body_limit = fetch_limit * len(batch)
+        body = {
+            "tickers": batch,
+            "line_items": fetch_items,
+            "end_date": as_of,
+            "period": period,
+            "limit": body_limit,
+        }
+        response = _make_api_request(url, headers, method="POST", json_data=body)
+        if response.status_code != 200:
+            raise Exception(f"Error fetching data: {', '.join(batch)} - {response.status_code} - {response.text}")
+        search_results = LineItemResponse(**response.json()).search_results
 
-    body = {
-        "tickers": [ticker],
-        "line_items": line_items,
-        "end_date": end_date,
-        "period": period,
-        "limit": limit,
-    }
-    response = _make_api_request(url, headers, method="POST", json_data=body)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
-    data = response.json()
-    response_model = LineItemResponse(**data)
-    search_results = response_model.search_results
-    if not search_results:
-        return []
+        rows_by_ticker: dict[str, list[LineItem]] = {ticker: [] for ticker in batch}
+        for item in search_results:
+            if item.ticker in rows_by_ticker:
+                rows_by_ticker[item.ticker].append(item)
 
-    # Cache the results
-    return search_results[:limit]
+        page_full = len(search_results) >= body_limit
+        for ticker, rows in rows_by_ticker.items():
+            rows = sorted(rows, key=lambda row: row.report_period, reverse=True)[:fetch_limit]
+            # On a full page a short ticker may have been truncated; leave it to a single-ticker fetch
+            if page_full and len(rows) < fetch_limit:
+                continue
+            _cache.set_line_items(f"{ticker}_{period}", rows, fetch_items, fetch_limit, as_of, ttl=live_data_ttl("line_items", as_of, empty=not rows))
 
+    return {ticker: search_line_items(ticker, line_items, end_date, period=period, limit=limit, api_key=api_key) for ticker in tickers}
 
+
+# Line-item fields requested so far and the deepest history asked for, per period
+_line_item_fields: dict[str, set[str]] = {}
+_line_item_limits: dict[str, int] = {}
+_line_item_lock = threading.Lock()
+
+
+def _line_item_demand(period: str, line_items: list[str], limit: int) -> tuple[list[str], int]:
+    """
+    Record a line-item request and return what to actually fetch for it.
+
+    Agents ask for overlapping field lists for the same ticker, so a fetch also
+    includes every field seen for this period and the deepest limit seen. The first
+    ticker teaches the vocabulary; the rest then need a single request per period.
+    """
+    with _line_item_lock:
+        fields = _line_item_fields.setdefault(period, set())
+        fields.update(line_items)
+        _line_item_limits[period] = max(_line_item_limits.get(period, 0), limit)
+        return sorted(fields), _line_item_limits[period]
+
+
+def _fetch_event_range(fetch_page, dataset: str, start_date: str, end_date: str, limit: int) -> list:
+    """Fetch every event in [start_date, end_date], paging backwards from end_date."""
+    date_field = EVENT_DATE_FIELDS[dataset]
+    all_events = []
+    current_end_date = end_date
+
+    while True:
+        events = fetch_page(current_end_date, start_date, limit)
+        if not events:
+            break
+
+        all_events.extend(events)
+
+        # Only continue pagination if we got a full page
+        if len(events) < limit:
+            break
+
+        # Update end_date to the oldest date from current batch for next iteration
+        oldest_date = min(getattr(event, date_field) for event in events).split("T")[0]
+
+        # If we've reached or passed the start_date, or the page did not move back in time, we can stop
+        if oldest_date <= start_date or oldest_date == current_end_date:
+            break
+        current_end_date = oldest_date
+
+    return all_events
+
+
+def _get_events(dataset: str, ticker: str, end_date: str, start_date: str | None, limit: int, fetch_page) -> list:
+    """Answer an insider trade or news query from the per-ticker event store, fetching only what it lacks.
+
+    `fetch_page(end_date, start_date, limit)` requests one page from the API, newest first.
+    """
+    cached_data = _cache.get_events(dataset, ticker, end_date, start_date, limit)
+    stale = False
+    if cached_data is None:
+        # Recently expired live events are served as they are while newer ones are fetched
+        cached_data = _cache.get_events(dataset, ticker, end_date, start_date, limit, max_stale=STALE_WHILE_REVALIDATE[dataset])
+        stale = cached_data is not None
+    _cache.recorder.record_lookup(dataset, hit=cached_data is not None, stale=stale)
+    if cached_data is None:
+        cached_data = _fetch_events(dataset, ticker, end_date, start_date, limit, fetch_page)
+
+    _record_live_data_age(dataset, ticker, start_date or end_date, end_date, stale)
+    if stale:
+        _refresh_in_background(dataset, (dataset, ticker, end_date, start_date, limit), lambda: _fetch_events(dataset, ticker, end_date, start_date, limit, fetch_page))
+    return cached_data
+
+
+def _fetch_events(dataset: str, ticker: str, end_date: str, start_date: str | None, limit: int, fetch_page) -> list:
+    """Fetch and cache the events a query lacks, then answer it from the event store."""
+    if start_date:
+        # Fetch only the parts of the window not seen before
+        for gap_start, gap_end in _cache.get_missing_event_ranges(dataset, ticker, start_date, end_date):
+            events = _fetch_event_range(fetch_page, dataset, gap_start, gap_end, limit)
+            empty = not events and not _cache.get_events(dataset, ticker)
+            _cache.set_events(dataset, ticker, events, gap_start, gap_end, ttl=live_data_ttl(dataset, gap_end, empty=empty))
+        return _cache.get_events(dataset, ticker, end_date, start_date, limit) or []
+
+    # Roll forward from the newest date fetched before end_date, so only newer events are requested;
+    # if the history before it is too short to fill the limit, fall back to a full page
+    delta = _cache.get_event_delta_range(dataset, ticker, end_date)
+    for page_start in (delta[0], None) if delta else (None,):
+        events = fetch_page(end_date, page_start, limit)
+        empty = not events and not _cache.get_events(dataset, ticker)
+        _cache.set_event_page(dataset, ticker, events, end_date, page_start, limit, ttl=live_data_ttl(dataset, end_date, empty=empty))
+        cached_data = _cache.get_events(dataset, ticker, end_date, limit=limit)
+        if cached_data is not None:
+            return cached_data
+    return events
+
+
+@_single_flight
 def get_insider_trades(
     ticker: str,
     end_date: str,
@@ -171,28 +729,17 @@ def get_insider_trades(
     limit: int = 1000,
     api_key: str = None,
 ) -> list[InsiderTrade]:
-    """Fetch insider trades from cache or API."""
-    # Create a cache key that includes all parameters to ensure exact matches
-    cache_key = f"{ticker}_{start_date or 'none'}_{end_date}_{limit}"
-    
-    # Check cache first - simple exact match
-    if cached_data := _cache.get_insider_trades(cache_key):
-        return [InsiderTrade(**trade) for trade in cached_data]
-
-    # If not in cache, fetch from API
+    """Fetch insider trades from cache or API, newest first."""
     headers = {}
     financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
     if financial_api_key:
         headers["X-API-KEY"] = financial_api_key
 
-    all_trades = []
-    current_end_date = end_date
-
-    while True:
-        url = f"https://api.financialdatasets.ai/insider-trades/?ticker={ticker}&filing_date_lte={current_end_date}"
-        if start_date:
-            url += f"&filing_date_gte={start_date}"
-        url += f"&limit={limit}"
+    def fetch_page(page_end_date: str, page_start_date: str | None, page_limit: int) -> list[InsiderTrade]:
+        url = f"{_get_base_url()}/insider-trades/?ticker={ticker}&filing_date_lte={page_end_date}"
+        if page_start_date:
+            url += f"&filing_date_gte={page_start_date}"
+        url += f"&limit={page_limit}"
 
         response = _make_api_request(url, headers)
         if response.status_code != 200:
@@ -200,32 +747,12 @@ def get_insider_trades(
 
         data = response.json()
         response_model = InsiderTradeResponse(**data)
-        insider_trades = response_model.insider_trades
+        return response_model.insider_trades
 
-        if not insider_trades:
-            break
-
-        all_trades.extend(insider_trades)
-
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(insider_trades) < limit:
-            break
-
-        # Update end_date to the oldest filing date from current batch for next iteration
-        current_end_date = min(trade.filing_date for trade in insider_trades).split("T")[0]
-
-        # If we've reached or passed the start_date, we can stop
-        if current_end_date <= start_date:
-            break
-
-    if not all_trades:
-        return []
-
-    # Cache the results using the comprehensive cache key
-    _cache.set_insider_trades(cache_key, [trade.model_dump() for trade in all_trades])
-    return all_trades
+    return _get_events("insider_trades", ticker, end_date, start_date, limit, fetch_page)
 
 
+@_single_flight
 def get_company_news(
     ticker: str,
     end_date: str,
@@ -233,28 +760,17 @@ def get_company_news(
     limit: int = 1000,
     api_key: str = None,
 ) -> list[CompanyNews]:
-    """Fetch company news from cache or API."""
-    # Create a cache key that includes all parameters to ensure exact matches
-    cache_key = f"{ticker}_{start_date or 'none'}_{end_date}_{limit}"
-    
-    # Check cache first - simple exact match
-    if cached_data := _cache.get_company_news(cache_key):
-        return [CompanyNews(**news) for news in cached_data]
-
-    # If not in cache, fetch from API
+    """Fetch company news from cache or API, newest first."""
     headers = {}
     financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
     if financial_api_key:
         headers["X-API-KEY"] = financial_api_key
 
-    all_news = []
-    current_end_date = end_date
-
-    while True:
-        url = f"https://api.financialdatasets.ai/news/?ticker={ticker}&end_date={current_end_date}"
-        if start_date:
-            url += f"&start_date={start_date}"
-        url += f"&limit={limit}"
+    def fetch_page(page_end_date: str, page_start_date: str | None, page_limit: int) -> list[CompanyNews]:
+        url = f"{_get_base_url()}/news/?ticker={ticker}&end_date={page_end_date}"
+        if page_start_date:
+            url += f"&start_date={page_start_date}"
+        url += f"&limit={page_limit}"
 
         response = _make_api_request(url, headers)
         if response.status_code != 200:
@@ -262,70 +778,96 @@ def get_company_news(
 
         data = response.json()
         response_model = CompanyNewsResponse(**data)
-        company_news = response_model.news
-
-        if not company_news:
-            break
-
-        all_news.extend(company_news)
-
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(company_news) < limit:
-            break
+        return response_model.news
 
-        # Update end_date to the oldest date from current batch for next iteration
-        current_end_date = min(news.date for news in company_news).split("T")[0]
-
-        # If we've reached or passed the start_date, we can stop
-        if current_end_date <= start_date:
-            break
-
-    if not all_news:
-        return []
-
-    # Cache the results using the comprehensive cache key
-    _cache.set_company_news(cache_key, [news.model_dump() for news in all_news])
-    return all_news
+    return _get_events("company_news", ticker, end_date, start_date, limit, fetch_page)
 
 
+@_single_flight
 def get_market_cap(
     ticker: str,
     end_date: str,
     api_key: str = None,
 ) -> float | None:
-    """Fetch market cap from the API."""
+    """Fetch market cap: live from company facts for today, otherwise resolved locally and remembered per (ticker, date)."""
     # Check if end_date is today
-    if end_date == datetime.datetime.now().strftime("%Y-%m-%d"):
-        # Get the market cap from company facts API
-        headers = {}
-        financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
-        if financial_api_key:
-            headers["X-API-KEY"] = financial_api_key
+    if end_date == _today():
+        company_facts = get_company_facts(ticker, api_key=api_key)
+        return company_facts.market_cap if company_facts else None
+
+    market_cap = _cache.get_market_cap(ticker, end_date)
+    _cache.recorder.record_lookup("market_cap", hit=market_cap is not None)
+    if market_cap is None:
+        market_cap = _resolve_market_cap(ticker, end_date, api_key)
+        if market_cap:
+            _cache.set_market_cap(ticker, end_date, market_cap)
+    return market_cap or None
+
+
+@_single_flight
+def get_company_facts(ticker: str, api_key: str = None) -> CompanyFacts | None:
+    """Fetch the company's current facts from cache or API."""
+    cached_data = _cache.get_company_facts(ticker)
+    stale = False
+    if cached_data is None:
+        cached_data = _cache.get_company_facts(ticker, max_stale=STALE_WHILE_REVALIDATE["company_facts"])
+        stale = cached_data is not None
+    _cache.recorder.record_lookup("company_facts", hit=cached_data is not None, stale=stale)
+    if cached_data is not None:
+        company_facts, age = cached_data
+        if age is not None:
+            record_data_age("company_facts", ticker, age, stale)
+        if stale:
+            _refresh_in_background("company_facts", ("company_facts", ticker), lambda: _fetch_company_facts(ticker, api_key))
+        return company_facts
+
+    company_facts = _fetch_company_facts(ticker, api_key)
+    if company_facts is not None:
+        record_data_age("company_facts", ticker, 0.0, False)
+    return company_facts
+
+
+def _fetch_company_facts(ticker: str, api_key: str = None) -> CompanyFacts | None:
+    headers = {}
+    financial_api_key = api_key or os.environ.get("FINANCIAL_DATASETS_API_KEY")
+    if financial_api_key:
+        headers["X-API-KEY"] = financial_api_key
 
-        url = f"https://api.financialdatasets.ai/company/facts/?ticker={ticker}"
-        response = _make_api_request(url, headers)
-        if response.status_code != 200:
-            print(f"Error fetching company facts: {ticker} - {response.status_code}")
-            return None
+    url = f"{_get_base_url()}/company/facts/?ticker={ticker}"
+    response = _make_api_request(url, headers)
+    if response.status_code != 200:
+        print(f"Error fetching company facts: {ticker} - {response.status_code}")
+        return None
 
-        data = response.json()
-        response_model = CompanyFactsResponse(**data)
-        return response_model.company_facts.market_cap
+    data = response.json()
+    company_facts = CompanyFactsResponse(**data).company_facts
+    _cache.set_company_facts(ticker, company_facts)
+    return company_facts
 
-    financial_metrics = get_financial_metrics(ticker, end_date, api_key=api_key)
-    if not financial_metrics:
-        return None
 
-    market_cap = financial_metrics[0].market_cap
+def _resolve_market_cap(ticker: str, end_date: str, api_key: str = None) -> float | None:
+    """
+    Market cap as of a past date, computed locally where possible.
+
+    Uses the cached close on end_date times the latest cached outstanding shares (which
+    the analysts fetch with their line items), then the latest cached metrics row, and
+    only fetches metrics when neither is cached.
+    """
+    close = _cache.latest_close(ticker, end_date)
+    shares = _cache.latest_outstanding_shares(ticker, end_date) if close is not None else None
+    if close is not None and shares:
+        return close * shares
 
-    if not market_cap:
+    financial_metrics = _cache.get_financial_metrics(f"{ticker}_ttm", end_date, limit=1) or get_financial_metrics(ticker, end_date, limit=1, api_key=api_key)
+    if not financial_metrics:
         return None
+    return financial_metrics[0].market_cap
 
-    return market_cap
 
-
-def prices_to_df(prices: list[Price]) -> pd.DataFrame:
+def prices_to_df(prices: PriceSeries | list[Price]) -> pd.DataFrame:
     """Convert prices to a DataFrame."""
+    if isinstance(prices, PriceSeries):
+        return prices.to_frame()
     df = pd.DataFrame([p.model_dump() for p in prices])
     df["Date"] = pd.to_datetime(df["time"])
     df.set_index("Date", inplace=True)
@@ -336,7 +878,14 @@ def prices_to_df(prices: list[Price]) -> pd.DataFrame:
     return df
 
 
+def build_price_panel(path: str, tickers: list[str], start_date: str, end_date: str, api_key: str = None) -> PricePanel:
+    """Fetch the tickers' bars in [start_date, end_date] through the cache and write them to a price panel file."""
+    series = {ticker: get_price_series(ticker, start_date, end_date, api_key=api_key) for ticker in dict.fromkeys(tickers)}
+    write_price_panel(path, series, start_date, end_date, built_on=_today())
+    return PricePanel(path)
+
+
 # Update the get_price_data function to use the new functions
 def get_price_data(ticker: str, start_date: str, end_date: str, api_key: str = None) -> pd.DataFrame:
-    prices = get_prices(ticker, start_date, end_date, api_key=api_key)
+    prices = get_price_series(ticker, start_date, end_date, api_key=api_key)
     return prices_to_df(prices)
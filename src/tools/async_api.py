@@ -0,0 +1,119 @@
+"""Asyncio variants of the data functions in src.tools.api.
+
+Each coroutine runs its synchronous counterpart on a bounded worker pool, so it
+shares the cache, the pooled HTTP session and the retry handling of the sync API,
+while at most ``concurrency`` requests are in flight at any time.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable
+
+import pandas as pd
+
+from src.data.models import CompanyNews, FinancialMetrics, InsiderTrade, LineItem, Price
+from src.data.price_series import PriceSeries
+from src.tools import api
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def set_concurrency(limit: int | None = None) -> int:
+    """
+    Set how many data requests may run at once.
+
+    Defaults to FINANCIAL_DATASETS_CONCURRENCY, or 8 when unset.
+    """
+    global _executor
+    limit = limit or int(os.environ.get("FINANCIAL_DATASETS_CONCURRENCY", "8"))
+    with _executor_lock:
+        previous, _executor = _executor, ThreadPoolExecutor(max_workers=limit, thread_name_prefix="data-api")
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return limit
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    if _executor is None:
+        set_concurrency()
+    return _executor
+
+
+async def _run(func: Callable, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    # Carry context variables (such as the agent being recorded in the cache stats) into the worker
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), partial(context.run, func, *args, **kwargs))
+
+
+async def aget_prices(ticker: str, start_date: str, end_date: str, api_key: str = None) -> list[Price]:
+    """Async version of :func:`src.tools.api.get_prices`."""
+    return await _run(api.get_prices, ticker, start_date, end_date, api_key=api_key)
+
+
+async def aget_price_series(ticker: str, start_date: str, end_date: str, api_key: str = None) -> PriceSeries:
+    """Async version of :func:`src.tools.api.get_price_series`."""
+    return await _run(api.get_price_series, ticker, start_date, end_date, api_key=api_key)
+
+
+async def aget_price_data(ticker: str, start_date: str, end_date: str, api_key: str = None) -> pd.DataFrame:
+    """Async version of :func:`src.tools.api.get_price_data`."""
+    return await _run(api.get_price_data, ticker, start_date, end_date, api_key=api_key)
+
+
+async def aget_financial_metrics(ticker: str, end_date: str, period: str = "ttm", limit: int = 10, api_key: str = None) -> list[FinancialMetrics]:
+    """Async version of :func:`src.tools.api.get_financial_metrics`."""
+    return await _run(api.get_financial_metrics, ticker, end_date, period=period, limit=limit, api_key=api_key)
+
+
+async def asearch_line_items(ticker: str, line_items: list[str], end_date: str, period: str = "ttm", limit: int = 10, api_key: str = None) -> list[LineItem]:
+    """Async version of :func:`src.tools.api.search_line_items`."""
+    return await _run(api.search_line_items, ticker, line_items, end_date, period=period, limit=limit, api_key=api_key)
+
+
+async def aget_insider_trades(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000, api_key: str = None) -> list[InsiderTrade]:
+    """Async version of :func:`src.tools.api.get_insider_trades`."""
+    return await _run(api.get_insider_trades, ticker, end_date, start_date=start_date, limit=limit, api_key=api_key)
+
+
+async def aget_company_news(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000, api_key: str = None) -> list[CompanyNews]:
+    """Async version of :func:`src.tools.api.get_company_news`."""
+    return await _run(api.get_company_news, ticker, end_date, start_date=start_date, limit=limit, api_key=api_key)
+
+
+async def aget_market_cap(ticker: str, end_date: str, api_key: str = None) -> float | None:
+    """Async version of :func:`src.tools.api.get_market_cap`."""
+    return await _run(api.get_market_cap, ticker, end_date, api_key=api_key)
+
+
+async def fetch_many(tickers: list[str], fetch: Callable[..., Awaitable], *args, **kwargs) -> dict[str, any]:
+    """
+    Call an async data function for every ticker concurrently.
+
+    Example:
+        prices = await fetch_many(["AAPL", "MSFT"], aget_prices, "2024-01-01", "2024-12-31")
+
+    Returns:
+        dict mapping each ticker to its result.
+    """
+    results = await asyncio.gather(*(fetch(ticker, *args, **kwargs) for ticker in tickers))
+    return dict(zip(tickers, results))
+
+
+async def prefetch_tickers(tickers: list[str], start_date: str, end_date: str, news_start_date: str | None = None, api_key: str = None):
+    """
+    Warm the cache with prices, metrics, insider trades and news for many tickers at once.
+
+    Prices cover [start_date, end_date]; insider trades and news start at news_start_date.
+    """
+    await asyncio.gather(
+        fetch_many(tickers, aget_price_series, start_date, end_date, api_key=api_key),
+        fetch_many(tickers, aget_financial_metrics, end_date, limit=10, api_key=api_key),
+        fetch_many(tickers, aget_insider_trades, end_date, start_date=news_start_date, limit=1000, api_key=api_key),
+        fetch_many(tickers, aget_company_news, end_date, start_date=news_start_date, limit=1000, api_key=api_key),
+    )
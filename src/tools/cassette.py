@@ -0,0 +1,129 @@
+"""Record and replay financialdatasets.ai HTTP traffic.
+
+In record mode every request made through src.tools.api is written to a cassette
+file together with its final response. In replay mode responses are served from
+that file and the network is never touched, which makes benchmark and regression
+runs deterministic and usable offline. The client caches and fetches exactly as it
+does without a cassette, so a replay makes the requests the shipped code makes.
+Requests are matched by URL and body, in any order; a request that was not recorded
+as such can still be answered from the recorded responses holding its data (see
+api._covering_payload). Only requests for data no recorded response holds, such as
+a date range outside the recording, raise CassetteMiss.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Response headers worth keeping; the rest (dates, cookies, tracing ids) would only add noise
+_KEPT_HEADERS = ("Content-Type", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset")
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def request_key(method: str, url: str, json_data: dict | None = None) -> str:
+    """Identify a request by method, URL and body. Headers (and so API keys) are not part of it."""
+    body = json.dumps(json_data, sort_keys=True, separators=(",", ":")) if json_data is not None else ""
+    return hashlib.sha256(f"{method.upper()} {url}\n{body}".encode()).hexdigest()
+
+
+class Cassette:
+    """A JSON-lines file of request/response pairs.
+
+    The first line holds the date the cassette was recorded on, so that code picking
+    dates relative to today (e.g. fundamentals fetched as of today) makes the same
+    requests on replay. Recording starts the file over.
+    """
+
+    def __init__(self, path: str, mode: str):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self.recorded_on = datetime.now().strftime("%Y-%m-%d")
+        self._responses: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+        if mode == REPLAY:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f"No cassette to replay at {self.path}")
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"recorded_on": self.recorded_on}) + "\n")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "recorded_on" in entry:
+                    self.recorded_on = entry["recorded_on"]
+                else:
+                    self._responses[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def record(self, method: str, url: str, json_data: dict | None, response: requests.Response):
+        """Append a response; a later recording of the same request replaces the earlier one."""
+        entry = {
+            "key": request_key(method, url, json_data),
+            "method": method.upper(),
+            "url": url,
+            "body": json_data,
+            "status_code": response.status_code,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "content": response.text,
+        }
+        with self._lock:
+            self._responses[entry["key"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def recordings(self) -> list[dict]:
+        """The recorded request/response entries, in recording order."""
+        with self._lock:
+            return list(self._responses.values())
+
+    def has(self, method: str, url: str, json_data: dict | None = None) -> bool:
+        """Whether a response to the request is recorded."""
+        return request_key(method, url, json_data) in self._responses
+
+    def replay(self, method: str, url: str, json_data: dict | None = None) -> requests.Response:
+        """Return the recorded response for a request, or raise CassetteMiss."""
+        entry = self._responses.get(request_key(method, url, json_data))
+        if entry is None:
+            raise CassetteMiss(f"No recorded response for {method.upper()} {url} in {self.path}")
+        return self.response(url, entry["content"], entry["status_code"], entry["headers"])
+
+    @staticmethod
+    def response(url: str, content: str, status_code: int = 200, headers: dict | None = None) -> requests.Response:
+        """Build a response served without the network."""
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers if headers is not None else {"Content-Type": "application/json"})
+        response._content = content.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+
+def default_cassette() -> Cassette | None:
+    """Open the cassette named by FINANCIAL_DATASETS_CASSETTE in FINANCIAL_DATASETS_CASSETTE_MODE, if set."""
+    path = os.environ.get("FINANCIAL_DATASETS_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.environ.get("FINANCIAL_DATASETS_CASSETTE_MODE", REPLAY))
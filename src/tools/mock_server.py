@@ -0,0 +1,367 @@
+"""A local stand-in for the financialdatasets.ai API, for load and throughput testing.
+
+Serves the endpoints used by src.tools.api with synthetic but schema-correct data.
+The data is a pure function of the ticker and the dates asked for, so overlapping
+requests agree with each other and repeated runs see the same numbers. Latency,
+server errors and 429s can be injected to exercise the client's retry and pacing.
+
+Run it with:
+    python -m src.tools.mock_server --port 8765 --latency-ms 80 --rate-limit-rate 0.05
+
+and point the client at it with FINANCIAL_DATASETS_BASE_URL=http://127.0.0.1:8765
+(or --data-base-url on the hedge fund and backtester CLIs).
+"""
+
+import argparse
+import calendar
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.data.models import FinancialMetrics, InsiderTrade
+
+# Most report periods served per ticker and request, whatever limit is asked for
+MAX_PERIODS = 200
+# Insider trades and news are generated this far back at most when no start date is given
+MAX_EVENT_LOOKBACK_DAYS = 3650
+
+_SOURCES = ("Reuters", "Bloomberg", "The Wall Street Journal", "Financial Times", "MarketWatch")
+_SENTIMENTS = ("positive", "negative", "neutral")
+_TITLES = ("CEO", "CFO", "Director", "COO", "General Counsel")
+
+
+def _seed(*parts) -> int:
+    return zlib.crc32("|".join(str(part) for part in parts).encode())
+
+
+def _rng(*parts) -> random.Random:
+    return random.Random(_seed(*parts))
+
+
+def _days(start: date, end: date):
+    """Days from end back to start, newest first."""
+    day = end
+    while day >= start:
+        yield day
+        day -= timedelta(days=1)
+
+
+def _period_ends(end: date, period: str, limit: int) -> list[date]:
+    """The last `limit` fiscal period ends (calendar quarters or years) on or before `end`, newest first."""
+    step = 12 if period == "annual" else 3
+    year, month = end.year, 12 if period == "annual" else (end.month + 2) // 3 * 3
+    ends = []
+    while len(ends) < limit:
+        period_end = date(year, month, calendar.monthrange(year, month)[1])
+        if period_end <= end:
+            ends.append(period_end)
+        month -= step
+        if month <= 0:
+            month += 12
+            year -= 1
+    return ends
+
+
+def synthetic_close(ticker: str, day: date) -> float:
+    """A smooth, ticker-specific price path with daily noise."""
+    rng = _rng(ticker)
+    base, phase = rng.uniform(20, 500), rng.uniform(0, 2 * math.pi)
+    ordinal = day.toordinal()
+    noise = _rng(ticker, ordinal).uniform(-0.01, 0.01)
+    return round(base * (1 + 0.25 * math.sin(ordinal / 90 + phase) + 0.05 * math.sin(ordinal / 9 + phase) + noise), 2)
+
+
+def synthetic_prices(ticker: str, start: date, end: date) -> list[dict]:
+    """Daily bars for the weekdays in [start, end], oldest first."""
+    prices = []
+    for day in reversed(list(_days(start, end))):
+        if day.weekday() >= 5:
+            continue
+        rng = _rng(ticker, "bar", day)
+        close = synthetic_close(ticker, day)
+        open_ = round(close * rng.uniform(0.98, 1.02), 2)
+        prices.append(
+            {
+                "open": open_,
+                "close": close,
+                "high": round(max(open_, close) * rng.uniform(1.0, 1.02), 2),
+                "low": round(min(open_, close) * rng.uniform(0.98, 1.0), 2),
+                "volume": rng.randint(100_000, 50_000_000),
+                "time": f"{day.isoformat()}T05:00:00Z",
+            }
+        )
+    return prices
+
+
+def _shares_outstanding(ticker: str) -> int:
+    return _rng(ticker, "shares").randint(50_000_000, 5_000_000_000)
+
+
+def synthetic_financial_metrics(ticker: str, end: date, period: str, limit: int) -> list[dict]:
+    """One metrics row per report period, newest first."""
+    rows = []
+    for period_end in _period_ends(end, period, limit):
+        rng = _rng(ticker, period, period_end)
+        row = {field: round(rng.uniform(-0.2, 2.0), 4) for field in FinancialMetrics.model_fields}
+        row.update(
+            ticker=ticker,
+            report_period=period_end.isoformat(),
+            period=period,
+            currency="USD",
+            market_cap=round(synthetic_close(ticker, period_end) * _shares_outstanding(ticker), 2),
+            enterprise_value=round(synthetic_close(ticker, period_end) * _shares_outstanding(ticker) * rng.uniform(0.9, 1.3), 2),
+            price_to_earnings_ratio=round(rng.uniform(5, 60), 2),
+            earnings_per_share=round(rng.uniform(-2, 15), 2),
+        )
+        rows.append(row)
+    return rows
+
+
+def synthetic_line_items(ticker: str, line_items: list[str], end: date, period: str, limit: int) -> list[dict]:
+    """Requested line items per report period, newest first."""
+    rows = []
+    for period_end in _period_ends(end, period, limit):
+        row = {"ticker": ticker, "report_period": period_end.isoformat(), "period": period, "currency": "USD"}
+        for item in line_items:
+            value = _rng(ticker, period, period_end, item).uniform(-1e9, 1e10)
+            # Ratios and per-share figures live on a much smaller scale than statement totals
+            row[item] = round(value / 1e9 if item.endswith(("_ratio", "_margin", "per_share")) else value, 4)
+        if "outstanding_shares" in line_items:
+            row["outstanding_shares"] = float(_shares_outstanding(ticker))
+        rows.append(row)
+    return rows
+
+
+def synthetic_insider_trades(ticker: str, start: date, end: date, limit: int) -> list[dict]:
+    """Roughly one filing a week, newest first."""
+    trades = []
+    for day in _days(start, end):
+        rng = _rng(ticker, "insider", day)
+        if rng.random() > 0.15:
+            continue
+        shares = rng.uniform(-50_000, 50_000)
+        price = synthetic_close(ticker, day)
+        before = rng.uniform(10_000, 1_000_000)
+        trade = dict.fromkeys(InsiderTrade.model_fields)
+        trade.update(
+            ticker=ticker,
+            issuer=f"{ticker} Inc.",
+            name=f"Insider {rng.randint(1, 20)}",
+            title=rng.choice(_TITLES),
+            is_board_director=rng.random() < 0.3,
+            transaction_date=(day - timedelta(days=rng.randint(0, 3))).isoformat(),
+            transaction_shares=round(shares, 0),
+            transaction_price_per_share=price,
+            transaction_value=round(shares * price, 2),
+            shares_owned_before_transaction=round(before, 0),
+            shares_owned_after_transaction=round(before + shares, 0),
+            security_title="Common Stock",
+            filing_date=day.isoformat(),
+        )
+        trades.append(trade)
+        if len(trades) >= limit:
+            break
+    return trades
+
+
+def synthetic_news(ticker: str, start: date, end: date, limit: int) -> list[dict]:
+    """Zero to three articles a day, newest first."""
+    news = []
+    for day in _days(start, end):
+        rng = _rng(ticker, "news", day)
+        for n in range(rng.choice((0, 0, 1, 1, 2, 3))):
+            news.append(
+                {
+                    "ticker": ticker,
+                    "title": f"{ticker} headline {day.isoformat()} #{n}",
+                    "author": f"Reporter {rng.randint(1, 50)}",
+                    "source": rng.choice(_SOURCES),
+                    "date": f"{day.isoformat()}T{rng.randint(0, 23):02d}:00:00Z",
+                    "url": f"https://news.example.com/{ticker.lower()}/{day.isoformat()}/{n}",
+                    "sentiment": rng.choice(_SENTIMENTS),
+                }
+            )
+            if len(news) >= limit:
+                return news
+    return news
+
+
+def synthetic_company_facts(ticker: str) -> dict:
+    shares = _shares_outstanding(ticker)
+    return {
+        "ticker": ticker,
+        "name": f"{ticker} Inc.",
+        "cik": f"{_seed(ticker) % 10_000_000:010d}",
+        "industry": "Software",
+        "sector": "Technology",
+        "category": "Common Stock",
+        "exchange": "NASDAQ",
+        "is_active": True,
+        "listing_date": "2000-01-03",
+        "location": "New York, NY",
+        "market_cap": round(synthetic_close(ticker, date.today()) * shares, 2),
+        "number_of_employees": _rng(ticker, "employees").randint(100, 200_000),
+        "sec_filings_url": f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={ticker}",
+        "sic_code": "7372",
+        "sic_industry": "Services-Prepackaged Software",
+        "sic_sector": "Services",
+        "website_url": f"https://www.{ticker.lower()}.example.com",
+        "weighted_average_shares": shares,
+    }
+
+
+class MockDataServer(ThreadingHTTPServer):
+    """HTTP server with fault injection settings shared by its request handlers.
+
+    Args:
+        address: (host, port) to listen on; port 0 picks a free port
+        latency_ms: Delay added to every response
+        jitter_ms: Uniform random extra delay on top of latency_ms
+        error_rate: Fraction of requests answered with a 500
+        rate_limit_rate: Fraction of requests answered with a 429
+        retry_after: Retry-After seconds sent with injected 429s (None to omit the header)
+        seed: Seed for the fault injection draws
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float | None = 1.0, seed: int | None = None):
+        super().__init__(address, MockDataHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self) -> tuple[float, float]:
+        """A fault draw in [0, 1) and the jitter for one request."""
+        with self._lock:
+            self.requests_served += 1
+            return self._random.random(), self._random.uniform(0, self.jitter_ms)
+
+
+class MockDataHandler(BaseHTTPRequestHandler):
+    server: MockDataServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._send(400, {"error": "Invalid JSON body"})
+        self._respond(body)
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _respond(self, body: dict | None = None):
+        server = self.server
+        draw, jitter = server.draw()
+        delay = (server.latency_ms + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if draw < server.rate_limit_rate:
+            headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {}
+            return self._send(429, {"error": "Rate limit exceeded"}, headers)
+        if draw < server.rate_limit_rate + server.error_rate:
+            return self._send(500, {"error": "Injected server error"})
+
+        parsed = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        try:
+            payload = self._route(parsed.path, query, body)
+        except (KeyError, ValueError) as e:
+            return self._send(400, {"error": f"Bad request: {e}"})
+        if payload is None:
+            return self._send(404, {"error": f"Unknown endpoint {parsed.path}"})
+        self._send(200, payload)
+
+    def _route(self, path: str, query: dict[str, str], body: dict | None) -> dict | None:
+        today = date.today()
+        if path == "/prices/":
+            return {"ticker": query["ticker"], "prices": synthetic_prices(query["ticker"], date.fromisoformat(query["start_date"]), date.fromisoformat(query["end_date"]))}
+        if path == "/financial-metrics/":
+            end = date.fromisoformat(query.get("report_period_lte", today.isoformat()))
+            limit = min(int(query.get("limit", 10)), MAX_PERIODS)
+            return {"financial_metrics": synthetic_financial_metrics(query["ticker"], end, query.get("period", "ttm"), limit)}
+        if path == "/financials/search/line-items" and body is not None:
+            end = date.fromisoformat(body.get("end_date") or today.isoformat())
+            limit = min(int(body.get("limit", 10)), MAX_PERIODS)
+            period = body.get("period", "ttm")
+            return {"search_results": [row for ticker in body["tickers"] for row in synthetic_line_items(ticker, body["line_items"], end, period, limit)]}
+        if path == "/insider-trades/":
+            end = date.fromisoformat(query.get("filing_date_lte", today.isoformat()))
+            start = date.fromisoformat(query["filing_date_gte"]) if "filing_date_gte" in query else end - timedelta(days=MAX_EVENT_LOOKBACK_DAYS)
+            return {"insider_trades": synthetic_insider_trades(query["ticker"], start, end, int(query.get("limit", 1000)))}
+        if path == "/news/":
+            end = date.fromisoformat(query.get("end_date", today.isoformat()))
+            start = date.fromisoformat(query["start_date"]) if "start_date" in query else end - timedelta(days=MAX_EVENT_LOOKBACK_DAYS)
+            return {"news": synthetic_news(query["ticker"], start, end, int(query.get("limit", 1000)))}
+        if path == "/company/facts/":
+            return {"company_facts": synthetic_company_facts(query["ticker"])}
+        return None
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **settings) -> MockDataServer:
+    """Start a mock server on a background thread; see MockDataServer for the settings."""
+    server = MockDataServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, name="mock-data-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic financialdatasets.ai data locally")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on. Defaults to 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on. Defaults to 8765")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response, in milliseconds")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra delay of up to this many milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--seed", type=int, help="Seed for fault injection, for reproducible runs")
+    args = parser.parse_args()
+
+    server = MockDataServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Serving synthetic financial data on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,125 @@
+"""Client-side rate limiting for the financialdatasets.ai API."""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping
+
+
+class TokenBucket:
+    """Token bucket that paces requests to `rate` per second with bursts of up to `capacity`.
+
+    A rate of None disables pacing, so the bucket only enforces pauses set from
+    server rate-limit responses.
+    """
+
+    def __init__(self, rate: float | None, capacity: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or 1.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            if not self.rate:
+                return max(0.0, self._paused_until - now)
+            self._tokens = min(self.capacity, self._tokens + max(0.0, now - self._updated) * self.rate)
+            self._updated = max(self._updated, now)
+            # Tokens may go negative so that waiting callers queue up behind each other. A pause
+            # moves _updated to its end, so callers queued during it leave from then on, one token apart
+            self._tokens -= 1
+            return max(0.0, self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def pause(self, seconds: float):
+        """Hold back every request on this bucket for `seconds`, then restart with a single token."""
+        with self._lock:
+            paused_until = self._clock() + seconds
+            if paused_until > self._paused_until:
+                self._paused_until = paused_until
+                self._tokens = min(self._tokens, 1.0)
+                self._updated = max(self._updated, paused_until)
+
+
+class RateLimiter:
+    """Token buckets keyed by API key.
+
+    Buckets use the rate set with `configure` for their key, falling back to
+    FINANCIAL_DATASETS_RATE_LIMIT (requests per minute) and FINANCIAL_DATASETS_RATE_BURST.
+    Without either, requests are not paced but server rate-limit headers are still honoured.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, api_key: str | None, requests_per_minute: float | None, burst: int | None = None):
+        """Set the request rate for one API key."""
+        with self._lock:
+            self._buckets[api_key or ""] = TokenBucket(requests_per_minute / 60 if requests_per_minute else None, burst, clock=self._clock)
+
+    def _bucket(self, api_key: str | None) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(api_key or "")
+            if bucket is None:
+                requests_per_minute = float(os.environ.get("FINANCIAL_DATASETS_RATE_LIMIT", "0"))
+                burst = int(os.environ.get("FINANCIAL_DATASETS_RATE_BURST", "0"))
+                bucket = self._buckets[api_key or ""] = TokenBucket(requests_per_minute / 60 if requests_per_minute else None, burst or None, clock=self._clock)
+            return bucket
+
+    def acquire(self, api_key: str | None) -> float:
+        """Reserve a request slot and return the seconds to wait before sending it."""
+        return self._bucket(api_key).reserve()
+
+    def pause(self, api_key: str | None, seconds: float):
+        """Hold back every request for this key, e.g. after a 429."""
+        self._bucket(api_key).pause(seconds)
+
+    def update_from_headers(self, api_key: str | None, headers: Mapping[str, str]):
+        """Pause the key until the window resets once the server reports no requests remaining."""
+        remaining = _parse_number(headers.get("X-RateLimit-Remaining"))
+        if remaining is None or remaining > 0:
+            return
+        reset = reset_delay(headers)
+        if reset:
+            self.pause(api_key, reset)
+
+
+def _parse_number(value) -> float | None:
+    if not isinstance(value, (str, int, float)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def retry_after_delay(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait from a Retry-After header, given either as seconds or as an HTTP date."""
+    value = headers.get("Retry-After")
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    if isinstance(value, str):
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def reset_delay(headers: Mapping[str, str]) -> float | None:
+    """Seconds until X-RateLimit-Reset, which may be an epoch timestamp or a number of seconds."""
+    reset = _parse_number(headers.get("X-RateLimit-Reset"))
+    if reset is None:
+        return None
+    if reset > 1_000_000_000:
+        return max(0.0, reset - time.time())
+    return reset
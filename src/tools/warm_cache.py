@@ -0,0 +1,217 @@
+"""Fill the persistent cache for a whole universe of tickers ahead of time.
+
+    python -m src.tools.warm_cache --tickers-file universe.txt --start 2024-01-01 --end 2024-12-31
+
+Prices, point-in-time fundamentals, line items, insider trades and news are fetched
+for every ticker by a pool of workers that share the client-side rate limiter.
+Fundamentals fetched as of today stay fresh through the next trading day (or for
+--fundamentals-ttl hours) rather than the few hours of a live fetch, so an
+off-hours warm-up still serves the morning's runs.
+Finished (ticker, dataset) pairs are appended to a state file, so an interrupted
+run picks up where it stopped when started again with the same arguments.
+With --price-panel the warmed prices are also written to a memory-mapped price
+panel file that backtest workers can share (see src/data/price_panel.py).
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable
+
+from src.data.cache import get_cache, live_ttls, seconds_through_next_trading_day
+from src.data.cache_store import default_store
+from src.tools import api
+from src.utils.data_requirements import deepest_limit, line_item_fields
+
+# Line items the analysts ask for, per period; fetched together so every agent's request is a hit
+WARM_LINE_ITEMS = line_item_fields()
+
+# Deepest history the analysts ask for, in periods and events
+WARM_FUNDAMENTALS_LIMIT = max(deepest_limit("financial_metrics"), deepest_limit("line_items"))
+WARM_EVENTS_LIMIT = 1000
+
+# Datasets whose live TTL a warm-up extends; they only change when a company files
+WARM_FUNDAMENTALS = ("financial_metrics", "line_items")
+
+# What is warmed per ticker: task name -> fetch(ticker, start_date, end_date, api_key)
+WARM_TASKS: dict[str, Callable[[str, str, str, str | None], any]] = {
+    "prices": lambda ticker, start, end, key: api.get_price_series(ticker, start, end, api_key=key),
+    "financial_metrics_ttm": lambda ticker, start, end, key: api.get_financial_metrics(ticker, end, period="ttm", limit=WARM_FUNDAMENTALS_LIMIT, api_key=key),
+    "financial_metrics_annual": lambda ticker, start, end, key: api.get_financial_metrics(ticker, end, period="annual", limit=WARM_FUNDAMENTALS_LIMIT, api_key=key),
+    "line_items_ttm": lambda ticker, start, end, key: api.search_line_items(ticker, WARM_LINE_ITEMS["ttm"], end, period="ttm", limit=WARM_FUNDAMENTALS_LIMIT, api_key=key),
+    "line_items_annual": lambda ticker, start, end, key: api.search_line_items(ticker, WARM_LINE_ITEMS["annual"], end, period="annual", limit=WARM_FUNDAMENTALS_LIMIT, api_key=key),
+    "insider_trades": lambda ticker, start, end, key: api.get_insider_trades(ticker, end, start_date=start, limit=WARM_EVENTS_LIMIT, api_key=key),
+    "company_news": lambda ticker, start, end, key: api.get_company_news(ticker, end, start_date=start, limit=WARM_EVENTS_LIMIT, api_key=key),
+}
+
+
+def read_tickers(path: str) -> list[str]:
+    """Tickers from a file, one per line or comma-separated; blank lines and # comments are ignored."""
+    tickers = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(ticker.strip().upper() for ticker in line.split(",") if ticker.strip())
+    return list(dict.fromkeys(tickers))
+
+
+class WarmState:
+    """Append-only record of the (ticker, task) pairs finished by a run.
+
+    The first line holds the run's parameters; a state file written for other
+    parameters is started over rather than resumed.
+    """
+
+    def __init__(self, path: str, params: dict[str, any]):
+        self.path = path
+        self.done: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0] == {"params": params}:
+                self.done = {(entry["ticker"], entry["task"]) for entry in lines[1:]}
+                return
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"params": params}) + "\n")
+
+    def mark_done(self, ticker: str, task: str):
+        with self._lock:
+            self.done.add((ticker, task))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"ticker": ticker, "task": task}) + "\n")
+
+
+def warm_cache(tickers: list[str], start_date: str, end_date: str, workers: int = 8, state_file: str | None = None, api_key: str | None = None, fundamentals_ttl: float | None = None, log: Callable[[str], None] = print) -> dict[str, any]:
+    """
+    Fetch every dataset in WARM_TASKS for every ticker into the cache.
+
+    Args:
+        tickers: Universe to warm
+        start_date: First day of prices, insider trades and news
+        end_date: Last day of every dataset; fundamentals are fetched as of it
+        workers: Number of fetches in flight at once
+        state_file: Where finished work is recorded, to resume an interrupted run
+        api_key: financialdatasets.ai key, defaulting to FINANCIAL_DATASETS_API_KEY
+        fundamentals_ttl: Seconds fundamentals fetched as of today stay fresh; by default until the next trading day ends
+        log: Receives one progress line per finished ticker
+
+    Returns:
+        dict with the number of tickers and tasks done, skipped as already done, and failed,
+        plus the failures as (ticker, task, error) triples.
+    """
+    state = WarmState(state_file, {"start_date": start_date, "end_date": end_date, "tasks": sorted(WARM_TASKS)}) if state_file else None
+    done = state.done if state else set()
+    jobs = [(ticker, task) for ticker in tickers for task in WARM_TASKS if (ticker, task) not in done]
+    remaining = {ticker: sum(1 for job in jobs if job[0] == ticker) for ticker in tickers}
+    failures: list[tuple[str, str, str]] = []
+    started = time.perf_counter()
+
+    def run(ticker: str, task: str):
+        ttl = fundamentals_ttl if fundamentals_ttl is not None else seconds_through_next_trading_day()
+        with live_ttls({dataset: ttl for dataset in WARM_FUNDAMENTALS}):
+            WARM_TASKS[task](ticker, start_date, end_date, api_key)
+
+    finished_tickers = len(tickers) - sum(1 for count in remaining.values() if count)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm-cache")
+    try:
+        futures = {executor.submit(run, ticker, task): (ticker, task) for ticker, task in jobs}
+        for future in as_completed(futures):
+            ticker, task = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failures.append((ticker, task, str(e)))
+            else:
+                if state:
+                    state.mark_done(ticker, task)
+
+            remaining[ticker] -= 1
+            if not remaining[ticker]:
+                finished_tickers += 1
+                failed = [failure[1] for failure in failures if failure[0] == ticker]
+                status = f"failed: {', '.join(failed)}" if failed else "ok"
+                log(f"[{finished_tickers}/{len(tickers)}] {ticker} {status} ({time.perf_counter() - started:.0f}s elapsed)")
+    finally:
+        # On interruption, drop queued fetches instead of waiting for them; finished ones are already recorded
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return {
+        "tickers": len(tickers),
+        "tasks": len(tickers) * len(WARM_TASKS),
+        "skipped": len(tickers) * len(WARM_TASKS) - len(jobs),
+        "fetched": len(jobs) - len(failures),
+        "failed": len(failures),
+        "failures": failures,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def print_summary(summary: dict[str, any], stats: dict[str, any]):
+    """Print what a warm-up run did and the API traffic it took."""
+    print(f"\nWarmed {summary['tickers']} tickers in {summary['seconds']:.1f}s: {summary['fetched']} tasks fetched, {summary['skipped']} already done, {summary['failed']} failed")
+    for dataset, counters in sorted(stats["datasets"].items()):
+        print(f"  {dataset:<20} requests={counters['requests']:<6} rate_limited={counters['rate_limited']:<4} retries={counters['retries']:<4} hits={counters['hits']:<6} misses={counters['misses']}")
+    for ticker, task, error in summary["failures"]:
+        print(f"  FAILED {ticker} {task}: {error}")
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Fill the persistent financial data cache for a universe of tickers")
+    parser.add_argument("--tickers-file", type=str, help="File with one ticker per line (or comma-separated)")
+    parser.add_argument("--tickers", type=str, help="Comma-separated list of stock ticker symbols")
+    parser.add_argument("--start", type=str, required=True, help="Start date (YYYY-MM-DD) of prices, insider trades and news")
+    parser.add_argument("--end", type=str, required=True, help="End date (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("FINANCIAL_DATASETS_CONCURRENCY", "8")), help="Parallel fetches. Defaults to FINANCIAL_DATASETS_CONCURRENCY or 8")
+    parser.add_argument("--rate-limit", type=float, help="Requests per minute. Defaults to FINANCIAL_DATASETS_RATE_LIMIT")
+    parser.add_argument("--burst", type=int, help="Requests allowed in a burst. Defaults to FINANCIAL_DATASETS_RATE_BURST")
+    parser.add_argument("--cache-dir", type=str, help="Persistent cache directory. Defaults to FINANCIAL_DATASETS_CACHE_DIR")
+    parser.add_argument("--state-file", type=str, help="Progress file used to resume. Defaults to warm_cache_state.jsonl in the cache directory")
+    parser.add_argument("--restart", action="store_true", help="Ignore the progress of earlier runs")
+    parser.add_argument("--fundamentals-ttl", type=float, metavar="HOURS", help="How long fundamentals fetched as of today stay fresh. Defaults to until the next trading day ends")
+    parser.add_argument("--price-panel", type=str, metavar="PATH", help="Also write the warmed prices to this price panel file")
+    args = parser.parse_args()
+
+    tickers = read_tickers(args.tickers_file) if args.tickers_file else []
+    if args.tickers:
+        tickers = list(dict.fromkeys(tickers + [ticker.strip().upper() for ticker in args.tickers.split(",") if ticker.strip()]))
+    if not tickers:
+        parser.error("no tickers given; use --tickers-file or --tickers")
+
+    if args.cache_dir:
+        os.environ["FINANCIAL_DATASETS_CACHE_DIR"] = args.cache_dir
+    cache_dir = os.environ.get("FINANCIAL_DATASETS_CACHE_DIR")
+    if not cache_dir:
+        parser.error("warming needs a persistent cache; set FINANCIAL_DATASETS_CACHE_DIR or pass --cache-dir")
+    get_cache().set_store(default_store())
+
+    api_key = os.environ.get("FINANCIAL_DATASETS_API_KEY")
+    if args.rate_limit:
+        api.configure_rate_limit(api_key, args.rate_limit, args.burst)
+
+    state_file = args.state_file or os.path.join(os.path.expanduser(cache_dir), "warm_cache_state.jsonl")
+    if args.restart and os.path.exists(state_file):
+        os.remove(state_file)
+
+    print(f"Warming {len(tickers)} tickers from {args.start} to {args.end} with {args.workers} workers")
+    try:
+        summary = warm_cache(tickers, args.start, args.end, workers=args.workers, state_file=state_file, api_key=api_key, fundamentals_ttl=args.fundamentals_ttl * 60 * 60 if args.fundamentals_ttl else None)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run the same command again to resume from {state_file}")
+        sys.exit(130)
+    print_summary(summary, get_cache().stats())
+    if args.price_panel and not summary["failed"]:
+        panel = api.build_price_panel(args.price_panel, tickers, args.start, args.end, api_key=api_key)
+        print(f"Wrote a price panel of {len(panel.tickers)} tickers x {len(panel.dates)} days to {args.price_panel}")
+    sys.exit(1 if summary["failed"] else 0)
@@ -17,6 +17,7 @@ from src.agents.valuation import valuation_analyst_agent
 from src.agents.warren_buffett import warren_buffett_agent
 from src.agents.rakesh_jhunjhunwala import rakesh_jhunjhunwala_agent
 from src.agents.mohnish_pabrai import mohnish_pabrai_agent
+from src.utils.data_requirements import DATA_REQUIREMENTS
 
 # Define analyst configuration - single source of truth
 ANALYST_CONFIG = {
@@ -27,6 +28,7 @@ ANALYST_CONFIG = {
         "agent_func": aswath_damodaran_agent,
         "type": "analyst",
         "order": 0,
+        "data_requirements": DATA_REQUIREMENTS["aswath_damodaran"],
     },
     "ben_graham": {
         "display_name": "Ben Graham",
@@ -35,6 +37,7 @@ ANALYST_CONFIG = {
         "agent_func": ben_graham_agent,
         "type": "analyst",
         "order": 1,
+        "data_requirements": DATA_REQUIREMENTS["ben_graham"],
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
@@ -43,6 +46,7 @@ ANALYST_CONFIG = {
         "agent_func": bill_ackman_agent,
         "type": "analyst",
         "order": 2,
+        "data_requirements": DATA_REQUIREMENTS["bill_ackman"],
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
@@ -51,6 +55,7 @@ ANALYST_CONFIG = {
         "agent_func": cathie_wood_agent,
         "type": "analyst",
         "order": 3,
+        "data_requirements": DATA_REQUIREMENTS["cathie_wood"],
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
@@ -59,6 +64,7 @@ ANALYST_CONFIG = {
         "agent_func": charlie_munger_agent,
         "type": "analyst",
         "order": 4,
+        "data_requirements": DATA_REQUIREMENTS["charlie_munger"],
     },
     "michael_burry": {
         "display_name": "Michael Burry",
@@ -67,6 +73,7 @@ ANALYST_CONFIG = {
         "agent_func": michael_burry_agent,
         "type": "analyst",
         "order": 5,
+        "data_requirements": DATA_REQUIREMENTS["michael_burry"],
     },
     "mohnish_pabrai": {
         "display_name": "Mohnish Pabrai",
@@ -75,6 +82,7 @@ ANALYST_CONFIG = {
         "agent_func": mohnish_pabrai_agent,
         "type": "analyst",
         "order": 6,
+        "data_requirements": DATA_REQUIREMENTS["mohnish_pabrai"],
     },
     "peter_lynch": {
         "display_name": "Peter Lynch",
@@ -83,6 +91,7 @@ ANALYST_CONFIG = {
         "agent_func": peter_lynch_agent,
         "type": "analyst",
         "order": 6,
+        "data_requirements": DATA_REQUIREMENTS["peter_lynch"],
     },
     "phil_fisher": {
         "display_name": "Phil Fisher",
@@ -91,6 +100,7 @@ ANALYST_CONFIG = {
         "agent_func": phil_fisher_agent,
         "type": "analyst",
         "order": 7,
+        "data_requirements": DATA_REQUIREMENTS["phil_fisher"],
     },
     "rakesh_jhunjhunwala": {
         "display_name": "Rakesh Jhunjhunwala",
@@ -99,6 +109,7 @@ ANALYST_CONFIG = {
         "agent_func": rakesh_jhunjhunwala_agent,
         "type": "analyst",
         "order": 8,
+        "data_requirements": DATA_REQUIREMENTS["rakesh_jhunjhunwala"],
     },
     "stanley_druckenmiller": {
         "display_name": "Stanley Druckenmiller",
@@ -107,6 +118,7 @@ ANALYST_CONFIG = {
         "agent_func": stanley_druckenmiller_agent,
         "type": "analyst",
         "order": 9,
+        "data_requirements": DATA_REQUIREMENTS["stanley_druckenmiller"],
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
@@ -115,6 +127,7 @@ ANALYST_CONFIG = {
         "agent_func": warren_buffett_agent,
         "type": "analyst",
         "order": 10,
+        "data_requirements": DATA_REQUIREMENTS["warren_buffett"],
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
@@ -123,6 +136,7 @@ ANALYST_CONFIG = {
         "agent_func": technical_analyst_agent,
         "type": "analyst",
         "order": 11,
+        "data_requirements": DATA_REQUIREMENTS["technical_analyst"],
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
@@ -131,6 +145,7 @@ ANALYST_CONFIG = {
         "agent_func": fundamentals_analyst_agent,
         "type": "analyst",
         "order": 12,
+        "data_requirements": DATA_REQUIREMENTS["fundamentals_analyst"],
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
@@ -139,6 +154,7 @@ ANALYST_CONFIG = {
         "agent_func": sentiment_analyst_agent,
         "type": "analyst",
         "order": 13,
+        "data_requirements": DATA_REQUIREMENTS["sentiment_analyst"],
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
@@ -147,6 +163,7 @@ ANALYST_CONFIG = {
         "agent_func": valuation_analyst_agent,
         "type": "analyst",
         "order": 14,
+        "data_requirements": DATA_REQUIREMENTS["valuation_analyst"],
     },
 }
 
@@ -167,7 +184,8 @@ def get_agents_list():
             "display_name": config["display_name"],
             "description": config["description"],
             "investing_style": config["investing_style"],
-            "order": config["order"]
+            "order": config["order"],
+            "data_requirements": config["data_requirements"],
         }
         for key, config in sorted(ANALYST_CONFIG.items(), key=lambda x: x[1]["order"])
     ]
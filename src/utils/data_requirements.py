@@ -0,0 +1,198 @@
+"""The data each agent fetches per ticker, declared so it can be planned before a run.
+
+Every requirement is a dict naming the dataset and the arguments the agent passes:
+
+- ``financial_metrics``: ``period`` and ``limit`` (periods of history)
+- ``line_items``: ``period``, ``limit`` and the line-item ``fields``
+- ``insider_trades`` / ``company_news``: ``limit`` and ``lookback``
+- ``prices``: ``lookback``
+- ``market_cap``: nothing; resolved from prices and line items for past dates
+
+``lookback`` is where an event or price window starts: ``"run"`` for the run's
+start_date, a number of days before end_date, or None when only ``limit`` bounds it.
+
+Kept free of agent imports so tools like the cache warm-up can read it; ANALYST_CONFIG
+attaches each analyst's list as ``data_requirements``. tests/test_data_requirements.py
+checks every list against the calls in the agent's source.
+"""
+
+DATA_REQUIREMENTS: dict[str, list[dict[str, any]]] = {
+    "aswath_damodaran": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 5},
+        {"dataset": "line_items", "period": "ttm", "limit": 10, "fields": ["free_cash_flow", "ebit", "interest_expense", "capital_expenditure", "depreciation_and_amortization", "outstanding_shares", "net_income", "total_debt"]},
+        {"dataset": "market_cap"},
+    ],
+    "ben_graham": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 10},
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 10,
+            "fields": ["earnings_per_share", "revenue", "net_income", "book_value_per_share", "total_assets", "total_liabilities", "current_assets", "current_liabilities", "dividends_and_other_cash_distributions", "outstanding_shares"],
+        },
+        {"dataset": "market_cap"},
+    ],
+    "bill_ackman": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 5},
+        {"dataset": "line_items", "period": "annual", "limit": 5, "fields": ["revenue", "operating_margin", "debt_to_equity", "free_cash_flow", "total_assets", "total_liabilities", "dividends_and_other_cash_distributions", "outstanding_shares"]},
+        {"dataset": "market_cap"},
+    ],
+    "cathie_wood": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 5},
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 5,
+            "fields": ["revenue", "gross_margin", "operating_margin", "debt_to_equity", "free_cash_flow", "total_assets", "total_liabilities", "dividends_and_other_cash_distributions", "outstanding_shares", "research_and_development", "capital_expenditure", "operating_expense"],
+        },
+        {"dataset": "market_cap"},
+    ],
+    "charlie_munger": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 10},
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 10,
+            "fields": ["revenue", "net_income", "operating_income", "return_on_invested_capital", "gross_margin", "operating_margin", "free_cash_flow", "capital_expenditure", "cash_and_equivalents", "total_debt", "shareholders_equity", "outstanding_shares", "research_and_development", "goodwill_and_intangible_assets"],
+        },
+        {"dataset": "market_cap"},
+        {"dataset": "insider_trades", "limit": 100, "lookback": None},
+        {"dataset": "company_news", "limit": 100, "lookback": None},
+    ],
+    "michael_burry": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 5},
+        {"dataset": "line_items", "period": "ttm", "limit": 10, "fields": ["free_cash_flow", "net_income", "total_debt", "cash_and_equivalents", "total_assets", "total_liabilities", "outstanding_shares", "issuance_or_purchase_of_equity_shares"]},
+        {"dataset": "insider_trades", "limit": 1000, "lookback": 365},
+        {"dataset": "company_news", "limit": 250, "lookback": 365},
+        {"dataset": "market_cap"},
+    ],
+    "mohnish_pabrai": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 8},
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 8,
+            "fields": ["revenue", "gross_profit", "gross_margin", "operating_income", "operating_margin", "net_income", "free_cash_flow", "total_debt", "cash_and_equivalents", "current_assets", "current_liabilities", "shareholders_equity", "capital_expenditure", "depreciation_and_amortization", "outstanding_shares"],
+        },
+        {"dataset": "market_cap"},
+    ],
+    "peter_lynch": [
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 5,
+            "fields": ["revenue", "earnings_per_share", "net_income", "operating_income", "gross_margin", "operating_margin", "free_cash_flow", "capital_expenditure", "cash_and_equivalents", "total_debt", "shareholders_equity", "outstanding_shares"],
+        },
+        {"dataset": "market_cap"},
+        {"dataset": "insider_trades", "limit": 50, "lookback": None},
+        {"dataset": "company_news", "limit": 50, "lookback": None},
+    ],
+    "phil_fisher": [
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 5,
+            "fields": ["revenue", "net_income", "earnings_per_share", "free_cash_flow", "research_and_development", "operating_income", "operating_margin", "gross_margin", "total_debt", "shareholders_equity", "cash_and_equivalents", "ebit", "ebitda"],
+        },
+        {"dataset": "market_cap"},
+        {"dataset": "insider_trades", "limit": 50, "lookback": None},
+        {"dataset": "company_news", "limit": 50, "lookback": None},
+    ],
+    "rakesh_jhunjhunwala": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 5},
+        {
+            "dataset": "line_items",
+            "period": "ttm",
+            "limit": 10,
+            "fields": ["net_income", "earnings_per_share", "ebit", "operating_income", "revenue", "operating_margin", "total_assets", "total_liabilities", "current_assets", "current_liabilities", "free_cash_flow", "dividends_and_other_cash_distributions", "issuance_or_purchase_of_equity_shares"],
+        },
+        {"dataset": "market_cap"},
+    ],
+    "stanley_druckenmiller": [
+        {"dataset": "financial_metrics", "period": "annual", "limit": 5},
+        {
+            "dataset": "line_items",
+            "period": "annual",
+            "limit": 5,
+            "fields": ["revenue", "earnings_per_share", "net_income", "operating_income", "gross_margin", "operating_margin", "free_cash_flow", "capital_expenditure", "cash_and_equivalents", "total_debt", "shareholders_equity", "outstanding_shares", "ebit", "ebitda"],
+        },
+        {"dataset": "market_cap"},
+        {"dataset": "insider_trades", "limit": 50, "lookback": None},
+        {"dataset": "company_news", "limit": 50, "lookback": None},
+        {"dataset": "prices", "lookback": "run"},
+    ],
+    "warren_buffett": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 10},
+        {
+            "dataset": "line_items",
+            "period": "ttm",
+            "limit": 10,
+            "fields": ["capital_expenditure", "depreciation_and_amortization", "net_income", "outstanding_shares", "total_assets", "total_liabilities", "shareholders_equity", "dividends_and_other_cash_distributions", "issuance_or_purchase_of_equity_shares", "gross_profit", "revenue", "free_cash_flow"],
+        },
+        {"dataset": "market_cap"},
+    ],
+    "technical_analyst": [
+        {"dataset": "prices", "lookback": "run"},
+    ],
+    "fundamentals_analyst": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 10},
+    ],
+    "sentiment_analyst": [
+        {"dataset": "insider_trades", "limit": 1000, "lookback": None},
+        {"dataset": "company_news", "limit": 100, "lookback": None},
+    ],
+    "valuation_analyst": [
+        {"dataset": "financial_metrics", "period": "ttm", "limit": 8},
+        {
+            "dataset": "line_items",
+            "period": "ttm",
+            "limit": 8,
+            "fields": ["free_cash_flow", "net_income", "depreciation_and_amortization", "capital_expenditure", "working_capital", "total_debt", "cash_and_equivalents", "interest_expense", "revenue", "operating_income", "ebit", "ebitda"],
+        },
+        {"dataset": "market_cap"},
+    ],
+}
+
+# The risk manager is not a selectable analyst but runs on every ticker of every run
+RISK_MANAGER_REQUIREMENTS: list[dict[str, any]] = [
+    {"dataset": "prices", "lookback": "run"},
+]
+
+
+def combined_requirements(analysts: list[str] | None = None, include_risk_manager: bool = True) -> list[dict[str, any]]:
+    """
+    Deduplicate the requirements of a set of analysts into what to fetch per ticker.
+
+    Requirements for the same dataset, period and lookback are served by one fetch:
+    the deepest limit and the union of the line-item fields.
+
+    Args:
+        analysts: Analyst keys, defaulting to every analyst
+        include_risk_manager: Whether to add the risk manager's requirements
+
+    Returns:
+        list of requirement dicts in first-seen order, fields sorted
+    """
+    requirements = [requirement for key in (analysts if analysts is not None else DATA_REQUIREMENTS) for requirement in DATA_REQUIREMENTS[key]]
+    if include_risk_manager:
+        requirements += RISK_MANAGER_REQUIREMENTS
+
+    combined: dict[tuple, dict[str, any]] = {}
+    for requirement in requirements:
+        group = (requirement["dataset"], requirement.get("period"), requirement.get("lookback"))
+        merged = combined.setdefault(group, {key: value for key, value in requirement.items() if key not in ("limit", "fields")})
+        if "limit" in requirement:
+            merged["limit"] = max(merged.get("limit", 0), requirement["limit"])
+        if "fields" in requirement:
+            merged["fields"] = sorted(set(merged.get("fields", [])) | set(requirement["fields"]))
+    return list(combined.values())
+
+
+def line_item_fields(analysts: list[str] | None = None) -> dict[str, list[str]]:
+    """The line-item fields a set of analysts asks for, per period."""
+    return {requirement["period"]: requirement["fields"] for requirement in combined_requirements(analysts) if requirement["dataset"] == "line_items"}
+
+
+def deepest_limit(dataset: str, analysts: list[str] | None = None) -> int:
+    """The most periods or events any of a set of analysts asks for from a dataset, or 0."""
+    return max((requirement["limit"] for requirement in combined_requirements(analysts) if requirement["dataset"] == dataset), default=0)
@@ -364,3 +364,54 @@ def format_backtest_row(
             f"{Fore.RED}{bearish_count}{Style.RESET_ALL}",
             f"{Fore.BLUE}{neutral_count}{Style.RESET_ALL}",
         ]
+
+
+def print_data_stats(stats: dict) -> None:
+    """
+    Print cache and API usage counters collected by the data layer.
+
+    Args:
+        stats (dict): Output of get_cache().stats()
+    """
+    datasets = stats.get("datasets", {})
+    if not datasets:
+        return
+
+    rows = []
+    for dataset, counters in sorted(datasets.items()):
+        hit_rate = counters["hit_rate"]
+        mean_latency = counters["mean_latency_seconds"]
+        rows.append(
+            [
+                f"{Fore.CYAN}{dataset}{Style.RESET_ALL}",
+                f"{Fore.GREEN}{counters['hits']}{Style.RESET_ALL}",
+                f"{Fore.RED}{counters['misses']}{Style.RESET_ALL}",
+                f"{hit_rate:.1%}" if hit_rate is not None else "",
+                counters["requests"],
+                f"{mean_latency * 1000:,.0f} ms" if mean_latency is not None else "",
+                counters["retries"],
+                f"{Fore.YELLOW}{counters['rate_limited']}{Style.RESET_ALL}",
+                f"{counters['bytes'] / 1024:,.0f} KB",
+                f"{stats.get('memory_bytes', {}).get(dataset, 0) / 1024:,.0f} KB",
+            ]
+        )
+
+    print(f"\n{Fore.WHITE}{Style.BRIGHT}DATA LAYER STATISTICS:{Style.RESET_ALL}")
+    print(
+        tabulate(
+            rows,
+            headers=["Dataset", "Hits", "Misses", "Hit Rate", "Requests", "Mean Latency", "Retries", "429s", "Downloaded", "In Memory"],
+            tablefmt="grid",
+            colalign=("left", "right", "right", "right", "right", "right", "right", "right", "right", "right"),
+        )
+    )
+
+    agents = stats.get("agents", {})
+    if agents:
+        agent_rows = []
+        for agent, by_dataset in sorted(agents.items()):
+            hits = sum(counters["hits"] for counters in by_dataset.values())
+            misses = sum(counters["misses"] for counters in by_dataset.values())
+            requests = sum(counters["requests"] for counters in by_dataset.values())
+            agent_rows.append([f"{Fore.CYAN}{agent}{Style.RESET_ALL}", hits, misses, requests])
+        print(tabulate(agent_rows, headers=["Agent", "Hits", "Misses", "Requests"], tablefmt="grid", colalign=("left", "right", "right", "right")))
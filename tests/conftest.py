@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.data.cache import Cache
+from src.data.cache_store import SQLiteCacheStore
+from src.tools import api
+from src.tools.mock_server import start_mock_server
+
+
+@pytest.fixture
+def mock_server():
+    """A local mock of the financial data API that the client is pointed at for the test."""
+    server = start_mock_server()
+    api.configure_base_url(server.base_url)
+    yield server
+    api.configure_base_url(api.DEFAULT_BASE_URL)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_cache():
+    """A fresh memory-only cache used by the API client for the test."""
+    with patch.object(api, "_cache", Cache(store=None)) as cache:
+        yield cache
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A persistent SQLite store in the test's temporary directory."""
+    store = SQLiteCacheStore(str(tmp_path / "cache.sqlite3"))
+    yield store
+    store.close()
@@ -0,0 +1,28 @@
+"""Builders for API rows and responses shared by the tests."""
+
+from unittest.mock import Mock
+
+
+def api_response(payload: dict, status_code: int = 200) -> Mock:
+    """A stand-in for the response _make_api_request returns, carrying `payload` as JSON."""
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = payload
+    return response
+
+
+def price_row(day: str, close: float = 1.0) -> dict:
+    return {"time": day, "open": close, "close": close, "high": close, "low": close, "volume": 1}
+
+
+def news_row(day: str, title: str = "a", ticker: str = "AAPL") -> dict:
+    return {"ticker": ticker, "title": title, "author": "author", "source": "source", "date": day, "url": "https://example.com"}
+
+
+def trade_row(filing_date: str) -> dict:
+    fields = ("issuer", "name", "title", "is_board_director", "transaction_date", "transaction_shares", "transaction_price_per_share", "transaction_value", "shares_owned_before_transaction", "shares_owned_after_transaction", "security_title")
+    return {"ticker": "AAPL", "filing_date": filing_date, **{field: None for field in fields}}
+
+
+def line_item_rows(fields: list[str], periods: tuple[str, ...] = ("2023-12-31", "2022-12-31"), ticker: str = "AAPL") -> list[dict]:
+    return [{"ticker": ticker, "report_period": period, "period": "annual", "currency": "USD", **{field: 1.0 for field in fields}} for period in periods]
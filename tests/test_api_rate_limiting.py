@@ -2,14 +2,29 @@ import os
 import pytest
 from unittest.mock import Mock, patch, call
 
-from src.tools.api import _make_api_request, get_prices
+from src.data.cache import Cache
+from src.tools.api import _make_api_request, _timeout, get_prices
+from src.tools.rate_limiter import RateLimiter, TokenBucket, retry_after_delay
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter():
+    """Give each test its own limiter and make the backoff jitter deterministic (no random part)."""
+    with patch('src.tools.api._rate_limiter', RateLimiter()), patch('src.tools.api.random.uniform', return_value=0.0):
+        yield
+
+
+def slept(mock_sleep):
+    """Return the durations passed to a mocked time.sleep."""
+    return [c.args[0] for c in mock_sleep.call_args_list]
+
 
 class TestRateLimiting:
     """Test suite for API rate limiting functionality."""
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_handles_single_rate_limit(self, mock_get, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_handles_single_rate_limit(self, mock_session, mock_sleep):
         """Test that API retries once after a 429 and succeeds."""
         # Setup mock responses: first 429, then 200
         mock_429_response = Mock()
@@ -19,7 +34,7 @@ class TestRateLimiting:
         mock_200_response.status_code = 200
         mock_200_response.text = "Success"
         
-        mock_get.side_effect = [mock_429_response, mock_200_response]
+        mock_session.get.side_effect = [mock_429_response, mock_200_response]
         
         # Call the function
         headers = {"X-API-KEY": "test-key"}
@@ -31,19 +46,19 @@ class TestRateLimiting:
         assert result.status_code == 200
         assert result.text == "Success"
         
-        # Verify requests.get was called twice
-        assert mock_get.call_count == 2
-        mock_get.assert_has_calls([
-            call(url, headers=headers),
-            call(url, headers=headers)
+        # Verify session.get was called twice
+        assert mock_session.get.call_count == 2
+        mock_session.get.assert_has_calls([
+            call(url, headers=headers, timeout=_timeout),
+            call(url, headers=headers, timeout=_timeout)
         ])
         
-        # Verify sleep was called once with 60 seconds (first retry)
-        mock_sleep.assert_called_once_with(60)
+        # Verify sleep was called once with the first backoff step (10s, minus jitter)
+        assert slept(mock_sleep) == pytest.approx([5], abs=0.1)
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_handles_multiple_rate_limits(self, mock_get, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_handles_multiple_rate_limits(self, mock_session, mock_sleep):
         """Test that API retries multiple times after 429s."""
         # Setup mock responses: three 429s, then 200
         mock_429_response = Mock()
@@ -53,7 +68,7 @@ class TestRateLimiting:
         mock_200_response.status_code = 200
         mock_200_response.text = "Success"
         
-        mock_get.side_effect = [
+        mock_session.get.side_effect = [
             mock_429_response, 
             mock_429_response, 
             mock_429_response, 
@@ -70,17 +85,16 @@ class TestRateLimiting:
         assert result.status_code == 200
         assert result.text == "Success"
         
-        # Verify requests.get was called 4 times
-        assert mock_get.call_count == 4
+        # Verify session.get was called 4 times
+        assert mock_session.get.call_count == 4
         
-        # Verify sleep was called 3 times with linear backoff: 60s, 90s, 120s
+        # Verify sleep was called 3 times with exponential backoff: 10s, 20s, 40s steps, minus jitter
         assert mock_sleep.call_count == 3
-        expected_calls = [call(60), call(90), call(120)]
-        mock_sleep.assert_has_calls(expected_calls)
+        assert slept(mock_sleep) == pytest.approx([5, 10, 20], abs=0.1)
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.post')
-    def test_handles_post_rate_limiting(self, mock_post, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_handles_post_rate_limiting(self, mock_session, mock_sleep):
         """Test that POST requests handle rate limiting."""
         # Setup mock responses: first 429, then 200
         mock_429_response = Mock()
@@ -90,7 +104,7 @@ class TestRateLimiting:
         mock_200_response.status_code = 200
         mock_200_response.text = "Success"
         
-        mock_post.side_effect = [mock_429_response, mock_200_response]
+        mock_session.post.side_effect = [mock_429_response, mock_200_response]
         
         # Call the function with POST method
         headers = {"X-API-KEY": "test-key"}
@@ -103,26 +117,26 @@ class TestRateLimiting:
         assert result.status_code == 200
         assert result.text == "Success"
         
-        # Verify requests.post was called twice
-        assert mock_post.call_count == 2
-        mock_post.assert_has_calls([
-            call(url, headers=headers, json=json_data),
-            call(url, headers=headers, json=json_data)
+        # Verify session.post was called twice
+        assert mock_session.post.call_count == 2
+        mock_session.post.assert_has_calls([
+            call(url, headers=headers, json=json_data, timeout=_timeout),
+            call(url, headers=headers, json=json_data, timeout=_timeout)
         ])
         
-        # Verify sleep was called once with 60 seconds (first retry)
-        mock_sleep.assert_called_once_with(60)
+        # Verify sleep was called once with the first backoff step (10s, minus jitter)
+        assert slept(mock_sleep) == pytest.approx([5], abs=0.1)
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_ignores_other_errors(self, mock_get, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_ignores_other_errors(self, mock_session, mock_sleep):
         """Test that non-429 errors are returned without retrying."""
         # Setup mock response: 500 error
         mock_500_response = Mock()
         mock_500_response.status_code = 500
         mock_500_response.text = "Internal Server Error"
         
-        mock_get.return_value = mock_500_response
+        mock_session.get.return_value = mock_500_response
         
         # Call the function
         headers = {"X-API-KEY": "test-key"}
@@ -134,22 +148,22 @@ class TestRateLimiting:
         assert result.status_code == 500
         assert result.text == "Internal Server Error"
         
-        # Verify requests.get was called only once
-        assert mock_get.call_count == 1
+        # Verify session.get was called only once
+        assert mock_session.get.call_count == 1
         
         # Verify sleep was never called
         mock_sleep.assert_not_called()
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_normal_success_requests(self, mock_get, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_normal_success_requests(self, mock_session, mock_sleep):
         """Test that successful requests return immediately without retry."""
         # Setup mock response: 200 success
         mock_200_response = Mock()
         mock_200_response.status_code = 200
         mock_200_response.text = "Success"
         
-        mock_get.return_value = mock_200_response
+        mock_session.get.return_value = mock_200_response
         
         # Call the function
         headers = {"X-API-KEY": "test-key"}
@@ -161,19 +175,18 @@ class TestRateLimiting:
         assert result.status_code == 200
         assert result.text == "Success"
         
-        # Verify requests.get was called only once
-        assert mock_get.call_count == 1
+        # Verify session.get was called only once
+        assert mock_session.get.call_count == 1
         
         # Verify sleep was never called
         mock_sleep.assert_not_called()
 
-    @patch('src.tools.api._cache')
+    @patch('src.tools.api._cache', new_callable=lambda: Cache(store=None))
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_full_integration(self, mock_get, mock_sleep, mock_cache):
+    @patch('src.tools.api._session')
+    def test_full_integration(self, mock_session, mock_sleep, mock_cache):
         """Test that get_prices function properly handles rate limiting."""
-        # Mock cache to return None (cache miss)
-        mock_cache.get_prices.return_value = None
+        # Start from an empty cache (cache miss)
         
         # Setup mock responses: first 429, then 200 with valid data
         mock_429_response = Mock()
@@ -195,7 +208,7 @@ class TestRateLimiting:
             ]
         }
         
-        mock_get.side_effect = [mock_429_response, mock_200_response]
+        mock_session.get.side_effect = [mock_429_response, mock_200_response]
         
         # Set environment variable for API key
         with patch.dict(os.environ, {"FINANCIAL_DATASETS_API_KEY": "test-key"}):
@@ -208,23 +221,23 @@ class TestRateLimiting:
         assert result[0].close == 101.0
         
         # Verify rate limiting behavior
-        assert mock_get.call_count == 2
-        mock_sleep.assert_called_once_with(60)
+        assert mock_session.get.call_count == 2
+        assert slept(mock_sleep) == pytest.approx([5], abs=0.1)
         
-        # Verify cache operations
-        mock_cache.get_prices.assert_called_once()
-        mock_cache.set_prices.assert_called_once()
+        # Verify the fetched range was cached
+        assert mock_cache.get_missing_price_ranges("AAPL", "2024-01-01", "2024-01-02") == []
+        assert len(mock_cache.get_prices("AAPL", "2024-01-01", "2024-01-02")) == 1
 
     @patch('src.tools.api.time.sleep')
-    @patch('src.tools.api.requests.get')
-    def test_max_retries_exceeded(self, mock_get, mock_sleep):
+    @patch('src.tools.api._session')
+    def test_max_retries_exceeded(self, mock_session, mock_sleep):
         """Test that function stops retrying after max_retries and returns final 429."""
         # Setup mock responses: all 429s (exceeds max retries)
         mock_429_response = Mock()
         mock_429_response.status_code = 429
         mock_429_response.text = "Too Many Requests"
         
-        mock_get.return_value = mock_429_response
+        mock_session.get.return_value = mock_429_response
         
         # Call the function with max_retries=2
         headers = {"X-API-KEY": "test-key"}
@@ -236,13 +249,107 @@ class TestRateLimiting:
         assert result.status_code == 429
         assert result.text == "Too Many Requests"
         
-        # Verify requests.get was called 3 times (1 initial + 2 retries)
-        assert mock_get.call_count == 3
+        # Verify session.get was called 3 times (1 initial + 2 retries)
+        assert mock_session.get.call_count == 3
         
-        # Verify sleep was called 2 times with linear backoff: 60s, 90s
+        # Verify sleep was called 2 times with exponential backoff: 10s, 20s steps, minus jitter
         assert mock_sleep.call_count == 2
-        expected_calls = [call(60), call(90)]
-        mock_sleep.assert_has_calls(expected_calls)
+        assert slept(mock_sleep) == pytest.approx([5, 10], abs=0.1)
+
+    @patch('src.tools.api.time.sleep')
+    @patch('src.tools.api._session')
+    def test_honours_retry_after_header(self, mock_session, mock_sleep):
+        """Test that a Retry-After header replaces the backoff delay."""
+        mock_429_response = Mock(status_code=429, headers={"Retry-After": "7"})
+        mock_200_response = Mock(status_code=200, headers={})
+        mock_session.get.side_effect = [mock_429_response, mock_200_response]
+
+        result = _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "test-key"})
+
+        assert result.status_code == 200
+        assert slept(mock_sleep) == pytest.approx([7], abs=0.1)
+
+    @patch('src.tools.api.time.sleep')
+    @patch('src.tools.api._session')
+    def test_exhausted_quota_pauses_next_request(self, mock_session, mock_sleep):
+        """Test that X-RateLimit-Remaining: 0 delays the next request until the reset."""
+        mock_session.get.return_value = Mock(status_code=200, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "30"})
+
+        _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "test-key"})
+        mock_sleep.assert_not_called()
+
+        _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "test-key"})
+        assert slept(mock_sleep) == pytest.approx([30], abs=0.1)
+
+    @patch('src.tools.api.time.sleep')
+    @patch('src.tools.api._session')
+    def test_rate_limit_is_per_api_key(self, mock_session, mock_sleep):
+        """Test that a 429 on one API key does not hold back another key."""
+        mock_session.get.side_effect = [Mock(status_code=429, headers={"Retry-After": "60"}), Mock(status_code=200, headers={})]
+        _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "key-a"}, max_retries=0)
+
+        mock_session.get.side_effect = None
+        mock_session.get.return_value = Mock(status_code=200, headers={})
+        _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "key-b"})
+
+        mock_sleep.assert_not_called()
+
+    @patch('src.tools.api.time.sleep')
+    @patch('src.tools.api._session')
+    def test_configured_rate_paces_requests(self, mock_session, mock_sleep):
+        """Test that requests beyond the burst wait for the token bucket to refill."""
+        from src.tools.api import configure_rate_limit
+
+        mock_session.get.return_value = Mock(status_code=200, headers={})
+        configure_rate_limit("test-key", requests_per_minute=60, burst=2)
+
+        for _ in range(4):
+            _make_api_request("https://api.financialdatasets.ai/test", {"X-API-KEY": "test-key"})
+
+        # Two requests fit the burst; the next ones queue one second apart
+        assert slept(mock_sleep) == pytest.approx([1, 2], abs=0.1)
+
+
+class TestTokenBucket:
+    """Test suite for the token bucket and header parsing."""
+
+    def test_bucket_refills_over_time(self):
+        """Test that tokens refill at the configured rate up to the capacity."""
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+        assert [bucket.reserve(), bucket.reserve()] == [0.0, 0.0]
+        assert bucket.reserve() == pytest.approx(0.5)
+
+        now[0] = 10.0
+        assert bucket.reserve() == 0.0
+
+    def test_pause_holds_back_unpaced_bucket(self):
+        """Test that a pause applies even when no rate is configured."""
+        now = [0.0]
+        bucket = TokenBucket(rate=None, clock=lambda: now[0])
+        bucket.pause(5)
+
+        assert bucket.reserve() == pytest.approx(5)
+        now[0] = 6.0
+        assert bucket.reserve() == 0.0
+
+    def test_callers_after_a_pause_are_spaced_by_the_rate(self):
+        """Test that requests queued during a pause are released one token apart rather than in a burst."""
+        now = [0.0]
+        bucket = TokenBucket(rate=1.0, capacity=2, clock=lambda: now[0])
+        bucket.pause(30)
+
+        assert [bucket.reserve() for _ in range(4)] == pytest.approx([30, 31, 32, 33])
+        now[0] = 10.0
+        assert bucket.reserve() == pytest.approx(24)
+
+    def test_retry_after_formats(self):
+        """Test that Retry-After is parsed as seconds or an HTTP date, and ignored otherwise."""
+        assert retry_after_delay({"Retry-After": "12"}) == 12
+        assert retry_after_delay({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+        assert retry_after_delay({"Retry-After": "soon"}) is None
+        assert retry_after_delay({}) is None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from src.tools import async_api
+
+
+class TestAsyncApi:
+    """Test suite for the async data API."""
+
+    def test_fetch_many_returns_results_by_ticker(self):
+        """Test that fetch_many maps each ticker to its own result."""
+        with patch("src.tools.api.get_market_cap", side_effect=lambda ticker, end_date, api_key=None: len(ticker)):
+            results = asyncio.run(async_api.fetch_many(["AAPL", "MSFT", "GOOGL"], async_api.aget_market_cap, "2024-01-02"))
+
+        assert results == {"AAPL": 4, "MSFT": 4, "GOOGL": 5}
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than the configured number of requests run at once."""
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def slow_market_cap(ticker, end_date, api_key=None):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return 1.0
+
+        async_api.set_concurrency(3)
+        try:
+            with patch("src.tools.api.get_market_cap", side_effect=slow_market_cap):
+                asyncio.run(async_api.fetch_many([f"T{i}" for i in range(12)], async_api.aget_market_cap, "2024-01-02"))
+        finally:
+            async_api.set_concurrency()
+
+        assert peak == 3
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.data.cache import Cache
+from src.data.compressed_events import BLOCK_ROWS
+from src.data.models import CompanyNews, Price
+from src.data.stats import agent_context
+from src.tools import api
+from tests.helpers import api_response, news_row, price_row, trade_row
+
+
+class TestCacheEviction:
+    """Test suite for memory-bounded LRU eviction."""
+
+    def _news(self, ticker, count=20):
+        return [news_row(f"2024-01-{i + 1:02d}", "x" * 100, ticker) for i in range(count)]
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the dataset stays within budget by dropping the LRU entry."""
+        cache = Cache(store=None)
+        cache.set_company_news("AAPL", self._news("AAPL"))
+        entry_bytes = cache.memory_usage()["company_news"]
+        cache.set_max_bytes("company_news", int(entry_bytes * 2.5))
+
+        cache.set_company_news("MSFT", self._news("MSFT"))
+        cache.get_company_news("AAPL")
+        cache.set_company_news("GOOGL", self._news("GOOGL"))
+
+        assert cache.get_company_news("MSFT") is None
+        assert cache.get_company_news("AAPL") is not None
+        assert cache.memory_usage()["company_news"] <= entry_bytes * 2.5
+
+    def test_evicted_entries_reload_from_store(self, store):
+        """Test that eviction only bounds memory; the persistent tier still answers."""
+        cache = Cache(store=store, max_bytes={"prices": 1})
+        cache.set_prices("AAPL", [price_row("2024-01-02", 1.0)], start_date="2024-01-01", end_date="2024-01-05")
+        cache.set_prices("MSFT", [price_row("2024-01-02", 2.0)], start_date="2024-01-01", end_date="2024-01-05")
+
+        assert "AAPL" not in cache._prices_cache and "AAPL" not in cache._price_coverage_cache
+        assert cache.get_prices("AAPL", "2024-01-01", "2024-01-05").to_prices() == [Price(**price_row("2024-01-02", 1.0))]
+
+    def test_market_caps_are_budgeted_and_dropped_with_their_sources(self):
+        """Test that resolved market caps count against a budget and leave with the ticker's prices."""
+        cache = Cache(store=None)
+        cache.set_prices("AAPL", [price_row("2024-01-02", 1.0)], start_date="2024-01-01", end_date="2024-01-05")
+        cache.set_market_cap("AAPL", "2024-01-02", 100.0)
+        entry_bytes = cache.memory_usage()["market_cap"]
+        assert entry_bytes > 0
+        cache.set_max_bytes("market_cap", int(entry_bytes * 1.5))
+
+        cache.set_market_cap("MSFT", "2024-01-02", 200.0)
+        assert cache.get_market_cap("AAPL", "2024-01-02") is None
+        assert cache.get_market_cap("MSFT", "2024-01-02") == 200.0
+
+        cache.set_market_cap("AAPL", "2024-01-02", 100.0)
+        cache._drop("prices", "AAPL")
+        assert cache.get_market_cap("AAPL", "2024-01-02") is None
+
+    def test_merges_only_rebuild_the_last_block(self):
+        """Test that appending events recompresses the newest block and shares the older ones."""
+        days = [f"2023-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+        cache = Cache(store=None)
+        cache.set_insider_trades("AAPL", [trade_row(day) for day in days[:BLOCK_ROWS + 10]])
+        entry = cache.get_insider_trades("AAPL")
+        size = cache.memory_usage()["insider_trades"]
+
+        cache.set_insider_trades("AAPL", [trade_row(days[BLOCK_ROWS + 9]), trade_row("2024-01-02")])
+
+        merged = cache.get_insider_trades("AAPL")
+        assert merged.blocks[0] is entry.blocks[0]
+        assert len(merged) == BLOCK_ROWS + 11
+        assert cache.memory_usage()["insider_trades"] > size
+
+
+class TestCacheStats:
+    """Test suite for cache hit/miss and API latency counters."""
+
+    @patch("src.tools.api._make_api_request", return_value=api_response({"news": [news_row("2024-01-02")]}))
+    def test_hits_and_misses_are_counted_per_dataset_and_agent(self, mock_request, api_cache):
+        """Test that a repeated call records one miss and one hit, attributed to the running agent."""
+        with agent_context("warren_buffett_agent"):
+            api.get_company_news("AAPL", "2024-01-02", limit=5)
+            api.get_company_news("AAPL", "2024-01-02", limit=5)
+
+        stats = api_cache.stats()
+        assert mock_request.call_count == 1
+        assert stats["datasets"]["company_news"]["hits"] == 1
+        assert stats["datasets"]["company_news"]["misses"] == 1
+        assert stats["datasets"]["company_news"]["hit_rate"] == 0.5
+        assert stats["agents"]["warren_buffett_agent"]["company_news"] == {"hits": 1, "misses": 1, "requests": 0}
+
+    def test_requests_record_latency_and_status(self):
+        """Test that HTTP attempts feed the latency histogram and the 429/error counters."""
+        cache = Cache(store=None)
+        cache.recorder.record_request("prices", 0.2, 200, nbytes=1024)
+        cache.recorder.record_request("prices", 3.0, 429)
+        cache.recorder.record_retry("prices")
+
+        prices = cache.stats()["datasets"]["prices"]
+        assert prices["requests"] == 2
+        assert prices["rate_limited"] == 1
+        assert prices["retries"] == 1
+        assert prices["bytes"] == 1024
+        assert prices["mean_latency_seconds"] == pytest.approx(1.6)
+        assert prices["latency_histogram"]["<=0.25s"] == 1
+        assert prices["latency_histogram"]["<=5.0s"] == 1
+
+        cache.reset_stats()
+        assert cache.stats()["datasets"] == {}
+
+
+class TestValidatedRows:
+    """Test suite for keeping validated model instances in the cache."""
+
+    @patch("src.tools.api._make_api_request", return_value=api_response({"news": [news_row("2024-01-02")]}))
+    def test_cache_hits_return_validated_instances(self, mock_request, api_cache):
+        """Test that a hit hands back the models validated at ingestion instead of rebuilding them."""
+        first = api.get_company_news("AAPL", "2024-01-02")
+        second = api.get_company_news("AAPL", "2024-01-02")
+
+        assert mock_request.call_count == 1
+        assert isinstance(second[0], CompanyNews)
+        assert second[0] is first[0]
@@ -0,0 +1,107 @@
+import multiprocessing
+from unittest.mock import patch
+
+from src.data.cache import Cache, live_data_ttl
+from src.data.cache_store import SQLiteCacheStore
+from src.data.compressed_events import CompressedEvents
+from src.data.models import CompanyNews, InsiderTrade, Price
+from tests.helpers import news_row, price_row, trade_row
+
+
+class TestPersistentCache:
+    """Test suite for the persistent tier behind Cache."""
+
+    def test_entries_survive_a_new_cache_instance(self, store):
+        """Test that data written by one Cache is readable by the next one."""
+        first = Cache(store=store)
+        first.set_prices("AAPL", [price_row("2024-01-02", 101.0)])
+
+        second = Cache(store=store)
+        assert second.get_prices("AAPL").to_prices() == [Price(**price_row("2024-01-02", 101.0))]
+
+    def test_merge_is_written_through(self, store):
+        """Test that merged entries are persisted, not just the latest batch."""
+        cache = Cache(store=store)
+        cache.set_company_news("AAPL", [news_row("2024-01-01")])
+        cache.set_company_news("AAPL", [news_row("2024-01-01"), news_row("2024-01-02", "b")])
+
+        data, expires_at = store.load("company_news", "AAPL")
+        assert [item.date for item in CompressedEvents.from_payload(CompanyNews, "date", data)] == ["2024-01-01", "2024-01-02"]
+        assert expires_at is None
+
+    @patch("src.data.cache.time.time")
+    @patch("src.data.cache_store.time.time")
+    def test_expired_entries_are_dropped(self, mock_store_time, mock_cache_time, store):
+        """Test that entries with a TTL expire in memory and on disk."""
+        mock_store_time.return_value = mock_cache_time.return_value = 1000.0
+        cache = Cache(store=store)
+        cache.set_company_news("AAPL", [news_row("2024-01-02")], start_date="2024-01-01", end_date="2024-01-02", ttl=60)
+        assert cache.get_company_news("AAPL", "2024-01-02", start_date="2024-01-01") is not None
+
+        mock_store_time.return_value = mock_cache_time.return_value = 1061.0
+        assert cache.get_company_news("AAPL", "2024-01-02", start_date="2024-01-01") is None
+        assert Cache(store=store).get_company_news("AAPL", "2024-01-02", start_date="2024-01-01") is None
+
+    def test_memory_only_cache_without_store(self):
+        """Test that a Cache without a store keeps working in memory."""
+        cache = Cache()
+        cache.set_store(None)
+        cache.set_insider_trades("AAPL", [trade_row("2024-01-02")])
+        assert cache.get_insider_trades("AAPL") == [InsiderTrade(**trade_row("2024-01-02"))]
+
+    def test_entries_from_an_older_schema_are_misses(self, store):
+        """Test that persisted rows failing validation are refetched instead of raising."""
+        store.save("company_news", "AAPL", [{"date": "2024-01-02"}])
+        assert Cache(store=store).get_company_news("AAPL") is None
+
+    def test_live_data_ttl(self):
+        """Test that only data reaching today gets a TTL."""
+        assert live_data_ttl("prices", "2000-01-01") is None
+        assert live_data_ttl("prices", "2999-01-01") is not None
+
+
+def _write_prices(path, worker):
+    cache = Cache(store=SQLiteCacheStore(path))
+    for day in range(1, 11):
+        date = f"2024-{worker + 1:02d}-{day:02d}"
+        cache.set_prices("AAPL", [price_row(f"{date}T05:00:00Z")], start_date=date, end_date=date)
+
+
+class TestSharedStore:
+    """Test suite for sharing the persistent tier between processes."""
+
+    def test_memory_copy_follows_other_writers(self, tmp_path):
+        """Test that an entry rewritten by another process is reloaded instead of served stale."""
+        path = str(tmp_path / "cache.sqlite3")
+        first, second = Cache(store=SQLiteCacheStore(path)), Cache(store=SQLiteCacheStore(path))
+
+        first.set_prices("AAPL", [price_row("2024-01-02")], start_date="2024-01-01", end_date="2024-01-31")
+        assert len(second.get_prices("AAPL", "2024-01-01", "2024-01-31")) == 1
+
+        second.set_prices("AAPL", [price_row("2024-02-01")], start_date="2024-02-01", end_date="2024-02-29")
+        assert len(first.get_prices("AAPL", "2024-01-01", "2024-02-29")) == 2
+
+    def test_conditional_writes_detect_conflicts(self, store):
+        """Test that a write based on an outdated version is rejected."""
+        version = store.save("prices", "AAPL", [])
+
+        assert store.compare_and_save("prices", "AAPL", [], None, version) == version + 1
+        assert store.compare_and_save("prices", "AAPL", [], None, version) is None
+        assert store.compare_and_save("prices", "MSFT", [], None, None) == 1
+        assert store.compare_and_save("prices", "MSFT", [], None, None) is None
+
+    def test_concurrent_processes_do_not_lose_writes(self, tmp_path):
+        """Test that processes merging into the same entry at once keep every write."""
+        path = str(tmp_path / "cache.sqlite3")
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_write_prices, args=(path, worker)) for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        cache = Cache(store=SQLiteCacheStore(path))
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert len(cache.get_prices("AAPL")) == 40
+        for month in range(1, 5):
+            assert cache.get_missing_price_ranges("AAPL", f"2024-{month:02d}-01", f"2024-{month:02d}-10") == []
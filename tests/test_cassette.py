@@ -0,0 +1,154 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from src.data.cache import Cache
+from src.tools import api
+from src.tools.api import configure_cassette, get_prices
+from src.tools.cassette import Cassette, CassetteMiss, request_key
+
+PRICES = {"ticker": "AAPL", "prices": [{"time": "2024-01-02T05:00:00Z", "open": 100.0, "close": 101.0, "high": 102.0, "low": 99.0, "volume": 1000}]}
+
+
+def _response(payload: dict, status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers["Content-Type"] = "application/json"
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+@pytest.fixture(autouse=True)
+def no_cassette():
+    yield
+    configure_cassette(None)
+
+
+class TestCassette:
+    """Test suite for recording and replaying API traffic."""
+
+    @patch("src.tools.api._session")
+    def test_replays_recorded_run_without_network(self, mock_session, tmp_path):
+        """Test that a recorded run can be replayed with the network unavailable."""
+        path = tmp_path / "run.jsonl"
+        mock_session.get.return_value = _response(PRICES)
+
+        configure_cassette(str(path), "record")
+        with patch("src.tools.api._cache", Cache(store=None)):
+            recorded = get_prices("AAPL", "2024-01-01", "2024-01-05")
+        assert mock_session.get.call_count == 1
+
+        mock_session.get.side_effect = AssertionError("network used during replay")
+        configure_cassette(str(path), "replay")
+        with patch("src.tools.api._cache", Cache(store=None)):
+            replayed = get_prices("AAPL", "2024-01-01", "2024-01-05")
+
+        assert replayed == recorded
+        assert mock_session.get.call_count == 1
+
+    def test_replay_miss_raises(self, tmp_path):
+        """Test that replaying a request that was never recorded fails loudly."""
+        path = tmp_path / "run.jsonl"
+        Cassette(str(path), "record")
+
+        configure_cassette(str(path), "replay")
+        with pytest.raises(CassetteMiss):
+            api._make_api_request("https://api.financialdatasets.ai/news/?ticker=AAPL&end_date=2024-01-31&limit=10", {})
+
+    def test_replay_pins_today_to_recording_date(self, tmp_path):
+        """Test that dates derived from today are those of the recording during replay."""
+        path = tmp_path / "run.jsonl"
+        path.write_text(json.dumps({"recorded_on": "2024-06-30"}) + "\n")
+
+        configure_cassette(str(path), "replay")
+
+        assert api._fundamentals_as_of("2024-01-31") == "2024-06-30"
+
+    @patch.object(api, "_line_item_limits", {})
+    @patch.object(api, "_line_item_fields", {})
+    def test_replay_does_not_depend_on_call_order(self, mock_server, tmp_path):
+        """Test that calls recorded in one order replay in another, though earlier calls change what later ones fetch."""
+        path = str(tmp_path / "run.jsonl")
+
+        def first():
+            return (
+                api.get_prices("AAPL", "2024-01-01", "2024-03-31"),
+                api.search_line_items("AAPL", ["revenue", "net_income"], "2024-03-31", period="annual", limit=5),
+                api.get_insider_trades("AAPL", "2024-03-31", limit=50),
+            )
+
+        def second():
+            return (
+                api.get_prices("AAPL", "2024-02-01", "2024-03-31"),
+                api.search_line_items("AAPL", ["net_income", "ebit"], "2024-03-31", period="annual", limit=5),
+                api.get_insider_trades("AAPL", "2024-03-31", limit=100),
+                api.get_market_cap("AAPL", "2024-03-28"),
+            )
+
+        configure_cassette(path, "record")
+        with patch.object(api, "_cache", Cache(store=None)):
+            recorded = (first(), second())
+
+        configure_cassette(path, "replay")
+        with patch.object(api, "_cache", Cache(store=None)), patch.object(api, "_session", side_effect=AssertionError("network used during replay")):
+            replayed_second = second()
+            replayed_first = first()
+
+        assert (replayed_first, replayed_second) == recorded
+
+    def test_cache_path_stays_active_while_recording_and_replaying(self, mock_server, tmp_path):
+        """Test that record and replay runs make the gap-only requests a run without a cassette makes."""
+        path = str(tmp_path / "run.jsonl")
+
+        def run():
+            api.get_prices("AAPL", "2024-01-01", "2024-03-31")
+            api.get_prices("AAPL", "2024-02-01", "2024-04-30")
+            api.get_company_news("AAPL", "2024-03-31", limit=10)
+            api.get_company_news("AAPL", "2024-03-31", limit=10)
+
+        configure_cassette(path, "record")
+        with patch.object(api, "_cache", Cache(store=None)) as cache:
+            run()
+        recorded = cache.stats()["datasets"]
+        assert mock_server.requests_served == 3
+        assert any(entry["url"].endswith("start_date=2024-04-01&end_date=2024-04-30") for entry in Cassette(path, "replay").recordings())
+
+        configure_cassette(path, "replay")
+        with patch.object(api, "_cache", Cache(store=None)) as cache, patch.object(api, "_session", side_effect=AssertionError("network used during replay")):
+            run()
+        assert {dataset: stats["requests"] for dataset, stats in cache.stats()["datasets"].items()} == {dataset: stats["requests"] for dataset, stats in recorded.items()}
+
+    def test_replay_of_data_outside_the_recording_raises(self, mock_server, tmp_path):
+        """Test that only requests no recorded response holds the data of are left unanswered."""
+        path = str(tmp_path / "run.jsonl")
+        configure_cassette(path, "record")
+        with patch.object(api, "_cache", Cache(store=None)):
+            recorded = api.get_prices("AAPL", "2024-01-01", "2024-03-31")
+
+        configure_cassette(path, "replay")
+        with patch.object(api, "_cache", Cache(store=None)):
+            assert api.get_prices("AAPL", "2024-02-01", "2024-02-29") == [price for price in recorded if "2024-02-01" <= price.time[:10] <= "2024-02-29"]
+            with pytest.raises(CassetteMiss):
+                api.get_prices("AAPL", "2024-03-01", "2024-04-30")
+            with pytest.raises(CassetteMiss):
+                api.get_company_facts("AAPL")
+
+    def test_recording_starts_the_file_over(self, tmp_path):
+        """Test that recording into an existing cassette replaces it, date included."""
+        path = tmp_path / "run.jsonl"
+        path.write_text(json.dumps({"recorded_on": "2000-01-01"}) + "\n" + json.dumps({"key": "old", "status_code": 200}) + "\n")
+
+        cassette = Cassette(str(path), "record")
+
+        assert len(cassette) == 0
+        assert path.read_text().splitlines() == [json.dumps({"recorded_on": cassette.recorded_on})]
+        assert cassette.recorded_on != "2000-01-01"
+
+    def test_request_key_ignores_headers_and_body_order(self):
+        """Test that requests are matched on method, URL and body content only."""
+        url = "https://api.financialdatasets.ai/financials/search/line-items"
+
+        assert request_key("post", url, {"a": 1, "b": 2}) == request_key("POST", url, {"b": 2, "a": 1})
+        assert request_key("POST", url, {"a": 1}) != request_key("POST", url, {"a": 2})
@@ -0,0 +1,52 @@
+import sys
+
+from src.data.compressed_events import BLOCK_ROWS, CompressedEvents
+from src.data.models import CompanyNews
+
+
+def _news(count, source="Reuters"):
+    days = [f"20{year:02d}-{month:02d}-{day:02d}" for year in range(10, 30) for month in range(1, 13) for day in range(1, 29)]
+    return [CompanyNews(ticker="AAPL", title=f"Headline {i}", author="Staff", source=source, date=days[i], url=f"https://example.com/{i}", sentiment="neutral") for i in range(count)]
+
+
+class TestCompressedEvents:
+    """Test suite for the compressed insider trade and news container."""
+
+    def test_rows_round_trip_in_date_order(self):
+        """Test that rows come back sorted by date and equal to the ones stored."""
+        news = _news(BLOCK_ROWS * 2 + 5)
+        events = CompressedEvents.from_rows(CompanyNews, "date", news[::-1])
+
+        assert len(events) == len(news) and len(events.blocks) == 3
+        assert list(events) == news
+        assert events[BLOCK_ROWS - 2 : BLOCK_ROWS + 2] == news[BLOCK_ROWS - 2 : BLOCK_ROWS + 2]
+        assert events[-1] == news[-1]
+        assert events.bisect_left(news[10].date) == 10 and events.bisect_right(news[10].date) == 11
+
+    def test_payload_round_trip_keeps_blocks_compressed(self):
+        """Test that the persisted form is rebuilt without touching the compressed blocks."""
+        events = CompressedEvents.from_rows(CompanyNews, "date", _news(BLOCK_ROWS + 1))
+
+        revived = CompressedEvents.from_payload(CompanyNews, "date", events.to_payload())
+
+        assert revived.blocks == events.blocks
+        assert revived == events
+
+    def test_repeated_strings_are_shared_and_storage_is_smaller(self):
+        """Test that repeated field values decode to one string object and rows take far less memory compressed."""
+        news = _news(BLOCK_ROWS)
+        events = CompressedEvents.from_rows(CompanyNews, "date", news)
+
+        assert events[0].source is events[BLOCK_ROWS - 1].source
+        assert events.nbytes * 4 < sum(sys.getsizeof(value) for row in news for value in row.__dict__.values())
+
+    def test_merge_skips_duplicates_and_keeps_order(self):
+        """Test that merging inserts new rows by date and drops exact duplicates."""
+        news = _news(6)
+        events = CompressedEvents.from_rows(CompanyNews, "date", news[::2])
+
+        merged, added = events.merge([news[1], news[2], news[5]])
+
+        assert added == [news[1], news[5]]
+        assert list(merged) == [news[0], news[1], news[2], news[4], news[5]]
+        assert list(events) == news[::2]
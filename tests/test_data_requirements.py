@@ -0,0 +1,114 @@
+import ast
+import inspect
+from pathlib import Path
+
+import pytest
+
+from src.tools import api
+from src.tools.warm_cache import WARM_FUNDAMENTALS_LIMIT, WARM_LINE_ITEMS
+from src.utils.data_requirements import DATA_REQUIREMENTS, RISK_MANAGER_REQUIREMENTS, combined_requirements, line_item_fields
+
+AGENTS_DIR = Path(__file__).resolve().parents[1] / "src" / "agents"
+
+# Analyst key -> agent module, where they differ
+AGENT_MODULES = {"technical_analyst": "technicals", "fundamentals_analyst": "fundamentals", "sentiment_analyst": "sentiment", "valuation_analyst": "valuation"}
+
+# Data function -> (dataset, parameter names after ticker)
+DATA_CALLS = {
+    "get_financial_metrics": ("financial_metrics", ["end_date", "period", "limit"]),
+    "search_line_items": ("line_items", ["line_items", "end_date", "period", "limit"]),
+    "get_insider_trades": ("insider_trades", ["end_date", "start_date", "limit"]),
+    "get_company_news": ("company_news", ["end_date", "start_date", "limit"]),
+    "get_market_cap": ("market_cap", ["end_date"]),
+    "get_price_series": ("prices", ["start_date", "end_date"]),
+    "get_prices": ("prices", ["start_date", "end_date"]),
+}
+
+
+def _defaults(function) -> dict[str, any]:
+    return {name: parameter.default for name, parameter in inspect.signature(function).parameters.items() if parameter.default is not inspect.Parameter.empty}
+
+
+def _lookback(node: ast.expr | None, function: ast.FunctionDef) -> any:
+    """What a start_date argument is: None, the run's start_date ("run") or a number of days before end_date."""
+    if node is None or (isinstance(node, ast.Constant) and node.value is None):
+        return None
+    if isinstance(node, ast.Name):
+        assigned = [child.value for child in ast.walk(function) if isinstance(child, ast.Assign) and any(isinstance(target, ast.Name) and target.id == node.id for target in child.targets)]
+        assert len(assigned) == 1, f"cannot tell where {node.id} comes from in {function.name}"
+        return _lookback(assigned[0], function)
+    if isinstance(node, ast.Subscript) and ast.literal_eval(node.slice) == "start_date":
+        return "run"
+    days = [keyword.value for child in ast.walk(node) if isinstance(child, ast.Call) and ast.unparse(child.func) == "timedelta" for keyword in child.keywords if keyword.arg == "days"]
+    assert days, f"unrecognized start_date {ast.unparse(node)}"
+    return ast.literal_eval(days[0])
+
+
+def _requirements_in_source(module: str) -> list[dict[str, any]]:
+    """The data calls in an agent module, in source order, as requirement dicts."""
+    tree = ast.parse((AGENTS_DIR / f"{module}.py").read_text(encoding="utf-8"))
+    found = {}
+    for function in (node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)):
+        for call in (node for node in ast.walk(function) if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in DATA_CALLS):
+            dataset, parameters = DATA_CALLS[call.func.id]
+            arguments = dict(zip(parameters, call.args[1:]))
+            arguments.update({keyword.arg: keyword.value for keyword in call.keywords})
+            defaults = _defaults(getattr(api, call.func.id))
+
+            requirement = {"dataset": dataset}
+            if "period" in parameters:
+                requirement["period"] = ast.literal_eval(arguments["period"]) if "period" in arguments else defaults["period"]
+            if "limit" in parameters:
+                requirement["limit"] = ast.literal_eval(arguments["limit"]) if "limit" in arguments else defaults["limit"]
+            if "line_items" in parameters:
+                requirement["fields"] = ast.literal_eval(arguments["line_items"])
+            if "start_date" in parameters:
+                requirement["lookback"] = _lookback(arguments.get("start_date"), function)
+            # Keyed by position so calls inside nested functions are counted once
+            found.setdefault((call.lineno, call.col_offset), requirement)
+    return [found[position] for position in sorted(found)]
+
+
+class TestDataRequirements:
+    """Test suite for the declared per-agent data requirements."""
+
+    @pytest.mark.parametrize("key", sorted(DATA_REQUIREMENTS))
+    def test_declared_requirements_match_the_agent_calls(self, key):
+        """Test that each analyst declares exactly the data calls its agent makes, with the same arguments."""
+        assert DATA_REQUIREMENTS[key] == _requirements_in_source(AGENT_MODULES.get(key, key))
+
+    def test_risk_manager_requirements_match_its_calls(self):
+        """Test that the risk manager's declared requirements match its calls."""
+        assert RISK_MANAGER_REQUIREMENTS == _requirements_in_source("risk_manager")
+
+    def test_every_agent_module_is_declared(self):
+        """Test that no agent making data calls is missing from the registry."""
+        declared = {AGENT_MODULES.get(key, key) for key in DATA_REQUIREMENTS} | {"risk_manager"}
+        with_calls = {path.stem for path in AGENTS_DIR.glob("*.py") if _requirements_in_source(path.stem)}
+        assert with_calls <= declared
+
+    def test_combined_requirements_deduplicate_across_analysts(self):
+        """Test that requirements for the same dataset and period merge into the deepest limit and all fields."""
+        combined = combined_requirements(["ben_graham", "bill_ackman", "technical_analyst"])
+
+        assert [requirement["dataset"] for requirement in combined] == ["financial_metrics", "line_items", "market_cap", "prices"]
+        assert combined[0] == {"dataset": "financial_metrics", "period": "annual", "limit": 10}
+        assert set(combined[1]["fields"]) == set(DATA_REQUIREMENTS["ben_graham"][1]["fields"]) | set(DATA_REQUIREMENTS["bill_ackman"][1]["fields"])
+        assert combined_requirements(["technical_analyst"], include_risk_manager=False) == [{"dataset": "prices", "lookback": "run"}]
+
+    def test_warm_cache_covers_every_analyst(self):
+        """Test that the cache warm-up fetches every line item, period and depth the analysts ask for."""
+        for requirements in DATA_REQUIREMENTS.values():
+            for requirement in requirements:
+                if requirement["dataset"] in ("financial_metrics", "line_items"):
+                    assert requirement["limit"] <= WARM_FUNDAMENTALS_LIMIT
+                if requirement["dataset"] == "line_items":
+                    assert set(requirement["fields"]) <= set(WARM_LINE_ITEMS[requirement["period"]])
+        assert WARM_LINE_ITEMS == line_item_fields()
+
+    def test_analyst_config_declares_requirements(self):
+        """Test that every ANALYST_CONFIG entry carries its requirements."""
+        pytest.importorskip("langchain_core")
+        from src.utils.analysts import ANALYST_CONFIG
+
+        assert {key: config["data_requirements"] for key, config in ANALYST_CONFIG.items()} == DATA_REQUIREMENTS
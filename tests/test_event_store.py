@@ -0,0 +1,75 @@
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from src.data.cache import Cache
+from src.tools import api
+from tests.helpers import api_response, news_row
+
+
+def _news_server(days):
+    """Fake news endpoint over one article per day, returning the newest `limit` in the window."""
+
+    def respond(url, headers):
+        params = {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+        news = [news_row(day) for day in sorted(days, reverse=True) if day <= params["end_date"] and day >= params.get("start_date", "")]
+        return api_response({"news": news[: int(params["limit"])]})
+
+    return respond
+
+
+class TestEventStore:
+    """Test suite for the per-ticker insider trade and news stores."""
+
+    @patch("src.tools.api._make_api_request", side_effect=_news_server([f"2024-01-{day:02d}" for day in range(1, 12)]))
+    def test_moving_window_fetches_only_new_days(self, mock_request, api_cache):
+        """Test that extending a window by a day requests just that day."""
+        api.get_company_news("AAPL", "2024-01-10", start_date="2024-01-01")
+        news = api.get_company_news("AAPL", "2024-01-11", start_date="2024-01-01")
+        inner = api.get_company_news("AAPL", "2024-01-05", start_date="2024-01-03")
+
+        assert mock_request.call_count == 2
+        assert "end_date=2024-01-11&start_date=2024-01-11" in mock_request.call_args[0][0]
+        assert [item.date for item in news] == [f"2024-01-{day:02d}" for day in range(11, 0, -1)]
+        assert [item.date for item in inner] == ["2024-01-05", "2024-01-04", "2024-01-03"]
+
+    @patch("src.tools.api._make_api_request", side_effect=_news_server([f"2024-01-{day:02d}" for day in range(1, 12)]))
+    def test_latest_events_roll_forward_from_high_water_mark(self, mock_request, api_cache):
+        """Test that a newest-N query for a later date only asks for events after the last fetch."""
+        api.get_company_news("AAPL", "2024-01-10", limit=3)
+        news = api.get_company_news("AAPL", "2024-01-11", limit=3)
+        again = api.get_company_news("AAPL", "2024-01-10", limit=2)
+
+        assert mock_request.call_count == 2
+        assert "end_date=2024-01-11&start_date=2024-01-11&limit=3" in mock_request.call_args[0][0]
+        assert [item.date for item in news] == ["2024-01-11", "2024-01-10", "2024-01-09"]
+        assert [item.date for item in again] == ["2024-01-10", "2024-01-09"]
+
+    def test_short_history_answers_any_limit(self):
+        """Test that a page shorter than its limit marks the whole history as fetched."""
+        cache = Cache(store=None)
+        cache.set_event_page("company_news", "AAPL", [news_row("2024-01-02"), news_row("2024-01-01")], end_date="2024-01-05", start_date=None, limit=10)
+
+        assert [item.date for item in cache.get_company_news("AAPL", "2024-01-05", limit=50)] == ["2024-01-02", "2024-01-01"]
+        assert cache.get_company_news("AAPL", "2024-01-06", limit=50) is None
+
+    def test_repeated_full_page_is_served_from_the_cache(self, mock_server, api_cache):
+        """Test that asking again for the same newest-N page, as several agents do on one day, makes no extra requests."""
+        first = api.get_company_news("AAPL", "2024-02-15", limit=50)
+        trades = api.get_insider_trades("AAPL", "2024-02-15", limit=20)
+        served = mock_server.requests_served
+
+        assert len(first) == 50 and len(trades) == 20
+        assert api.get_company_news("AAPL", "2024-02-15", limit=50) == first
+        assert api.get_company_news("AAPL", "2024-02-15", limit=10) == first[:10]
+        assert api.get_insider_trades("AAPL", "2024-02-15", limit=20) == trades
+        assert mock_server.requests_served == served
+
+    def test_full_page_floor_only_answers_what_the_page_held(self):
+        """Test that a full page answers up to its own limit but not a deeper or earlier page."""
+        cache = Cache(store=None)
+        page = [news_row("2024-01-05"), news_row("2024-01-04"), news_row("2024-01-03", "b")]
+        cache.set_event_page("company_news", "AAPL", page, end_date="2024-01-05", start_date=None, limit=3)
+
+        assert [item.date for item in cache.get_company_news("AAPL", "2024-01-05", limit=3)] == ["2024-01-05", "2024-01-04", "2024-01-03"]
+        assert cache.get_company_news("AAPL", "2024-01-05", limit=4) is None
+        assert cache.get_company_news("AAPL", "2024-01-04", limit=3) is None
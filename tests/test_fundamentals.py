@@ -0,0 +1,79 @@
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+from src.data.cache import Cache
+from src.data.models import FinancialMetrics
+from src.tools import api
+from tests.helpers import api_response, price_row
+
+PERIODS = [f"{year}-{month}" for year in range(2015, 2025) for month in ("03-31", "06-30", "09-30", "12-31")]
+
+
+def _metrics_server(url, headers):
+    """Fake metrics endpoint over quarterly periods since 2015, returning the newest `limit` up to report_period_lte."""
+    params = {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+    periods = [p for p in sorted(PERIODS, reverse=True) if p <= params["report_period_lte"]][: int(params["limit"])]
+    empty = {field: None for field in FinancialMetrics.model_fields}
+    return api_response({"financial_metrics": [{**empty, "ticker": "AAPL", "report_period": p, "period": params["period"], "currency": "USD"} for p in periods]})
+
+
+class TestPointInTimeFundamentals:
+    """Test suite for answering fundamentals queries for any date from one fetched history."""
+
+    @patch("src.tools.api._make_api_request", side_effect=_metrics_server)
+    def test_every_backtest_day_shares_one_fetch(self, mock_request, api_cache):
+        """Test that metrics for successive dates are answered from a single history fetch."""
+        results = {day: api.get_financial_metrics("AAPL", day, period="ttm", limit=4) for day in ("2023-05-01", "2023-05-02", "2023-08-15", "2024-01-02")}
+
+        assert mock_request.call_count == 1
+        assert f"limit={api.FUNDAMENTALS_HISTORY_LIMIT}" in mock_request.call_args[0][0]
+        assert [m.report_period for m in results["2023-05-01"]] == ["2023-03-31", "2022-12-31", "2022-09-30", "2022-06-30"]
+        assert results["2023-05-02"] == results["2023-05-01"]
+        assert results["2024-01-02"][0].report_period == "2023-12-31"
+
+    @patch("src.tools.api._make_api_request", side_effect=_metrics_server)
+    def test_old_dates_fetch_deeper_history(self, mock_request, api_cache):
+        """Test that a date older than the fetched history triggers one deeper fetch."""
+        metrics = api.get_financial_metrics("AAPL", "2015-12-31", period="ttm", limit=6)
+
+        assert [m.report_period for m in metrics] == ["2015-12-31", "2015-09-30", "2015-06-30", "2015-03-31"]
+        assert mock_request.call_count == 2
+
+    def test_line_items_answer_any_date_up_to_the_fetch(self):
+        """Test that line items fetched as of one date answer earlier dates when deep enough."""
+        cache = Cache(store=None)
+        rows = [{"ticker": "AAPL", "report_period": p, "period": "annual", "currency": "USD", "revenue": 1.0} for p in ("2023-12-31", "2022-12-31", "2021-12-31")]
+        cache.set_line_items("AAPL_annual", rows, ["revenue"], limit=3, end_date="2024-06-01")
+
+        assert [row.report_period for row in cache.get_line_items("AAPL_annual", ["revenue"], 2, end_date="2023-06-01")] == ["2022-12-31", "2021-12-31"]
+        assert cache.get_missing_line_items("AAPL_annual", ["revenue"], 3, end_date="2023-06-01") == ["revenue"]
+        assert cache.get_missing_line_items("AAPL_annual", ["revenue"], 1, end_date="2024-07-01") == ["revenue"]
+
+
+class TestMarketCapResolver:
+    """Test suite for resolving historical market caps from cached data."""
+
+    @patch("src.tools.api._make_api_request")
+    def test_market_cap_from_cached_close_and_shares(self, mock_request, api_cache):
+        """Test that a cached close and share count answer without any request, and are remembered."""
+        api_cache.set_prices("AAPL", [price_row("2024-01-05T05:00:00Z", close=10.0)], start_date="2024-01-01", end_date="2024-01-07")
+        api_cache.set_line_items("AAPL_ttm", [{"ticker": "AAPL", "report_period": "2023-12-31", "period": "ttm", "currency": "USD", "outstanding_shares": 1000.0}], ["outstanding_shares"], limit=10, end_date="2024-06-01")
+
+        first = api.get_market_cap("AAPL", "2024-01-07")
+        second = api.get_market_cap("AAPL", "2024-01-07")
+
+        assert first == second == 10000.0
+        mock_request.assert_not_called()
+        assert api_cache.stats()["datasets"]["market_cap"]["hits"] == 1
+        assert api_cache.stats()["datasets"]["market_cap"]["misses"] == 1
+
+    @patch("src.tools.api._make_api_request", side_effect=_metrics_server)
+    def test_falls_back_to_metrics(self, mock_request, api_cache):
+        """Test that the latest metrics row is used when prices for the date are not cached."""
+        api_cache.set_prices("AAPL", [price_row("2024-01-05T05:00:00Z", close=10.0)], start_date="2024-01-01", end_date="2024-01-05")
+
+        assert api_cache.latest_close("AAPL", "2024-01-08") is None
+        api.get_market_cap("AAPL", "2024-01-08")
+        api.get_market_cap("AAPL", "2024-01-08")
+
+        assert mock_request.call_count == 1
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from src.data.cache import Cache
+from src.data.models import LineItem
+from src.tools import api
+from tests.helpers import api_response, line_item_rows
+
+
+class TestLineItemCache:
+    """Test suite for the per-field line-item cache."""
+
+    def test_subset_of_fields_is_served(self):
+        """Test that any subset of cached fields is answered without a fetch."""
+        cache = Cache(store=None)
+        cache.set_line_items("AAPL_annual_2024-01-01", line_item_rows(["revenue", "net_income"]), ["revenue", "net_income"], limit=2)
+
+        rows = cache.get_line_items("AAPL_annual_2024-01-01", ["revenue"], limit=1)
+        assert rows == [LineItem(ticker="AAPL", report_period="2023-12-31", period="annual", currency="USD", revenue=1.0)]
+        assert cache.get_missing_line_items("AAPL_annual_2024-01-01", ["revenue", "ebit"], limit=2) == ["ebit"]
+        assert cache.get_missing_line_items("AAPL_annual_2024-01-01", ["revenue"], limit=5) == ["revenue"]
+
+    def test_hits_reuse_projected_rows(self):
+        """Test that repeated requests share one projection until the entry changes."""
+        cache = Cache(store=None)
+        cache.set_line_items("AAPL_annual_2024-01-01", line_item_rows(["revenue", "net_income"]), ["revenue", "net_income"], limit=2)
+
+        first = cache.get_line_items("AAPL_annual_2024-01-01", ["revenue"], limit=2)
+        assert cache.get_line_items("AAPL_annual_2024-01-01", ["revenue"], limit=2) is first
+
+        cache.set_line_items("AAPL_annual_2024-01-01", line_item_rows(["ebit"]), ["ebit"], limit=2)
+        rows = cache.get_line_items("AAPL_annual_2024-01-01", ["revenue", "ebit"], limit=2)
+        assert rows is not first
+        assert rows[0].revenue == 1.0 and rows[0].ebit == 1.0
+
+    def test_short_history_satisfies_deeper_requests(self):
+        """Test that a response shorter than its limit marks the fields complete."""
+        cache = Cache(store=None)
+        cache.set_line_items("AAPL_annual_2024-01-01", line_item_rows(["revenue"]), ["revenue"], limit=10)
+
+        assert cache.get_missing_line_items("AAPL_annual_2024-01-01", ["revenue"], limit=20) == []
+
+    @patch.object(api, "_line_item_limits", {})
+    @patch.object(api, "_line_item_fields", {})
+    @patch("src.tools.api._make_api_request")
+    def test_agents_share_line_item_fetches(self, mock_request, api_cache):
+        """Test that overlapping requests only fetch the fields not cached yet."""
+        mock_request.side_effect = lambda url, headers, method="GET", json_data=None: api_response({"search_results": line_item_rows(json_data["line_items"])})
+
+        api.search_line_items("AAPL", ["revenue", "net_income"], "2024-01-01", period="annual", limit=5)
+        api.search_line_items("AAPL", ["net_income", "ebit"], "2024-01-01", period="annual", limit=5)
+        items = api.search_line_items("AAPL", ["revenue", "ebit"], "2024-01-01", period="annual", limit=5)
+        # A second ticker fetches the whole learned vocabulary in one request
+        api.search_line_items("MSFT", ["revenue"], "2024-01-01", period="annual", limit=5)
+        api.search_line_items("MSFT", ["ebit", "net_income"], "2024-01-01", period="annual", limit=5)
+
+        requested = [c.kwargs["json_data"]["line_items"] for c in mock_request.call_args_list]
+        assert requested == [["net_income", "revenue"], ["ebit"], ["ebit", "net_income", "revenue"]]
+        assert items[0].revenue == 1.0 and items[0].ebit == 1.0
+
+    @patch.object(api, "_line_item_limits", {})
+    @patch.object(api, "_line_item_fields", {})
+    @patch("src.tools.api._make_api_request")
+    def test_batch_request_fills_cache_per_ticker(self, mock_request, api_cache):
+        """Test that one batched request is split back per ticker and cached."""
+        mock_request.return_value = api_response({"search_results": line_item_rows(["revenue"]) + line_item_rows(["revenue"], ticker="MSFT")})
+
+        results = api.search_line_items_batch(["AAPL", "MSFT"], ["revenue"], "2024-01-01", period="annual", limit=5)
+
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs["json_data"]["tickers"] == ["AAPL", "MSFT"]
+        assert [len(results[t]) for t in ("AAPL", "MSFT")] == [2, 2]
+        assert results["MSFT"][0].ticker == "MSFT"
@@ -0,0 +1,54 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from src.data.cache import Cache
+from src.tools import api
+
+
+class TestMockServer:
+    """Test suite for the local stand-in of the financial data API."""
+
+    def test_serves_every_endpoint_the_client_uses(self, mock_server, api_cache):
+        """Test that the client parses every mock endpoint into its models."""
+        prices = api.get_prices("AAPL", "2024-01-01", "2024-01-31")
+        metrics = api.get_financial_metrics("AAPL", "2024-01-31", limit=4)
+        line_items = api.search_line_items("AAPL", ["revenue", "net_income"], "2024-01-31", limit=4)
+        trades = api.get_insider_trades("AAPL", "2024-01-31", start_date="2023-10-01")
+        news = api.get_company_news("AAPL", "2024-01-31", start_date="2024-01-01")
+        market_cap = api.get_market_cap("AAPL", datetime.now().strftime("%Y-%m-%d"))
+
+        assert len(prices) == 23  # weekdays; the mock has no holidays
+        assert [m.report_period for m in metrics] == ["2023-12-31", "2023-09-30", "2023-06-30", "2023-03-31"]
+        assert len(line_items) == 4 and all(item.revenue is not None for item in line_items)
+        assert trades and all("2023-10-01" <= trade.filing_date <= "2024-01-31" for trade in trades)
+        assert news and all("2024-01-01" <= article.date[:10] <= "2024-01-31" for article in news)
+        assert market_cap > 0
+
+    def test_data_is_consistent_across_requests(self, mock_server):
+        """Test that overlapping requests see the same synthetic bars."""
+        with patch("src.tools.api._cache", Cache(store=None)):
+            month = api.get_prices("MSFT", "2024-01-01", "2024-01-31")
+        with patch("src.tools.api._cache", Cache(store=None)):
+            week = api.get_prices("MSFT", "2024-01-08", "2024-01-12")
+
+        assert week == [price for price in month if "2024-01-08" <= price.time[:10] <= "2024-01-12"]
+
+    @patch("src.tools.api.time.sleep")
+    def test_injects_rate_limits(self, mock_sleep, mock_server):
+        """Test that injected 429s carry Retry-After and are retried by the client."""
+        mock_server.rate_limit_rate = 1.0
+
+        response = api._make_api_request(f"{mock_server.base_url}/company/facts/?ticker=AAPL", {}, max_retries=2)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1.0"
+        assert mock_server.requests_served == 3
+
+    def test_injects_server_errors(self, mock_server, api_cache):
+        """Test that injected 500s surface as fetch errors."""
+        mock_server.error_rate = 1.0
+
+        with pytest.raises(Exception, match="500"):
+            api.get_prices("AAPL", "2024-01-01", "2024-01-31")
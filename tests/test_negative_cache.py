@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+from src.data.cache import EMPTY_RESULT_TTLS
+from src.tools import api
+from tests.helpers import api_response, news_row
+
+
+class TestNegativeCache:
+    """Test suite for remembering that a ticker has no data."""
+
+    @patch("src.data.cache.time.time", return_value=1000.0)
+    @patch("src.tools.api._make_api_request", return_value=api_response({"financial_metrics": []}))
+    def test_empty_metrics_are_cached_until_their_ttl(self, mock_request, mock_time, api_cache):
+        """Test that an empty metrics history is answered locally until it expires."""
+        assert api.get_financial_metrics("SPY", "2024-01-02") == []
+        assert api.get_financial_metrics("SPY", "2024-03-01") == []
+        assert mock_request.call_count == 1
+
+        mock_time.return_value = 1000.0 + EMPTY_RESULT_TTLS["financial_metrics"] + 1
+        api.get_financial_metrics("SPY", "2024-03-01")
+        assert mock_request.call_count == 2
+
+    @patch("src.tools.api._make_api_request", return_value=api_response({"news": []}))
+    def test_tickers_without_news_are_not_refetched(self, mock_request, api_cache):
+        """Test that a ticker with no news at all gets a negative entry, unlike an empty window of a ticker with news."""
+        api_cache.set_company_news("AAPL", [news_row("2023-06-01")], start_date="2023-06-01", end_date="2023-06-01")
+
+        with patch.object(api, "live_data_ttl", wraps=api.live_data_ttl) as ttl:
+            api.get_company_news("SPY", "2024-01-02", limit=10)
+            api.get_company_news("SPY", "2024-01-02", limit=10)
+            api.get_company_news("AAPL", "2024-01-02", start_date="2023-12-01", limit=10)
+
+        assert mock_request.call_count == 2
+        assert [call.kwargs.get("empty") for call in ttl.call_args_list] == [True, False]
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from src.data.cache import Cache
+from src.tools import api
+from tests.helpers import api_response, price_row
+
+
+def _bars(*days):
+    return [price_row(f"{day}T05:00:00Z") for day in days]
+
+
+class TestRangeAwarePrices:
+    """Test suite for serving price sub-ranges from cached supersets."""
+
+    def test_sub_range_is_served_from_superset(self):
+        """Test that a fetched range answers any slice inside it."""
+        cache = Cache(store=None)
+        cache.set_prices("AAPL", _bars("2024-01-02", "2024-01-03", "2024-01-04"), start_date="2024-01-01", end_date="2024-01-31")
+
+        sliced = cache.get_prices("AAPL", "2024-01-03", "2024-01-04")
+        assert [time[:10] for time in sliced.time] == ["2024-01-03", "2024-01-04"]
+        assert len(cache.get_prices("AAPL", "2024-01-06", "2024-01-07")) == 0
+
+    def test_missing_ranges_are_gaps_only(self):
+        """Test that only uncovered sub-ranges are reported as missing."""
+        cache = Cache(store=None)
+        cache.set_prices("AAPL", [], start_date="2024-01-10", end_date="2024-01-20")
+        cache.set_prices("AAPL", [], start_date="2024-01-21", end_date="2024-01-25")
+
+        assert cache.get_prices("AAPL", "2024-01-01", "2024-01-31") is None
+        assert cache.get_missing_price_ranges("AAPL", "2024-01-01", "2024-01-31") == [("2024-01-01", "2024-01-09"), ("2024-01-26", "2024-01-31")]
+        assert cache.get_missing_price_ranges("AAPL", "2024-01-12", "2024-01-24") == []
+
+    @patch("src.tools.api._make_api_request")
+    def test_get_prices_fetches_only_gaps(self, mock_request, api_cache):
+        """Test that get_prices requests just the part of the range it has not seen."""
+        mock_request.return_value = api_response({"ticker": "AAPL", "prices": _bars("2024-02-01")})
+
+        api_cache.set_prices("AAPL", _bars("2024-01-02"), start_date="2024-01-01", end_date="2024-01-31")
+        prices = api.get_prices("AAPL", "2024-01-02", "2024-02-01")
+        api.get_prices("AAPL", "2024-01-15", "2024-02-01")
+
+        assert mock_request.call_count == 1
+        assert "start_date=2024-02-01&end_date=2024-02-01" in mock_request.call_args[0][0]
+        assert [p.time[:10] for p in prices] == ["2024-01-02", "2024-02-01"]
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.models import Price
+from src.data.price_panel import PricePanel, write_price_panel
+from src.data.price_series import PriceSeries
+from src.tools import api
+from src.tools.api import configure_price_panel, prices_to_df
+
+
+def _series(*days, close=1.0):
+    return PriceSeries.from_prices([Price(time=f"{day}T05:00:00Z", open=close, close=close + i, high=close + 1, low=close - 1, volume=100 + i) for i, day in enumerate(days)])
+
+
+@pytest.fixture
+def panel_path(tmp_path):
+    path = str(tmp_path / "prices.panel")
+    series = {"AAPL": _series("2024-01-02", "2024-01-03", "2024-01-04"), "MSFT": _series("2024-01-02", "2024-01-04", close=50.0)}
+    write_price_panel(path, series, "2024-01-01", "2024-01-31", built_on="2024-06-30")
+    yield path
+    configure_price_panel(None)
+
+
+class TestPricePanel:
+    """Test suite for the memory-mapped price panel."""
+
+    def test_series_match_the_written_bars(self, panel_path):
+        """Test that each ticker's window reads back as the bars it was built from, gaps included."""
+        panel = PricePanel(panel_path)
+
+        assert panel.tickers == ["AAPL", "MSFT"]
+        assert np.isnan(panel.close[1, 1])
+        pd.testing.assert_frame_equal(prices_to_df(panel.series("MSFT", "2024-01-01", "2024-01-31")), prices_to_df(_series("2024-01-02", "2024-01-04", close=50.0).to_prices()))
+        assert panel.series("AAPL", "2024-01-03", "2024-01-03").to_prices() == _series("2024-01-02", "2024-01-03").to_prices()[1:]
+
+    def test_matrices_are_shared_read_only_maps(self, panel_path):
+        """Test that the matrices map the file and gap-free windows are views of them."""
+        panel = PricePanel(panel_path)
+        series = panel.series("AAPL", "2024-01-01", "2024-01-31")
+
+        assert isinstance(panel.close, np.memmap) and not panel.close.flags.writeable
+        assert np.shares_memory(series.close, panel.close)
+        assert panel.frame("close")["AAPL"].tolist() == [1.0, 2.0, 3.0]
+
+    @patch("src.tools.api._make_api_request")
+    def test_get_price_series_uses_the_configured_panel(self, mock_request, panel_path, api_cache):
+        """Test that covered historical ranges come from the panel and others still go to the API."""
+        mock_request.side_effect = AssertionError("API used for a range the panel covers")
+        configure_price_panel(panel_path)
+
+        assert len(api.get_prices("AAPL", "2024-01-02", "2024-01-05")) == 3
+        assert not api._get_price_panel().covers("AAPL", "2024-01-02", "2024-02-05")
+        assert not api._get_price_panel().covers("NVDA", "2024-01-02", "2024-01-05")
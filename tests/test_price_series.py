@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.data.models import Price
+from src.data.price_series import PriceSeries
+from src.tools.api import prices_to_df
+
+
+def _prices(*days, close=1.0):
+    return [Price(time=f"{day}T05:00:00Z", open=close, close=close, high=close + 1, low=close - 1, volume=100) for day in days]
+
+
+class TestPriceSeries:
+    """Test suite for the columnar price container."""
+
+    def test_frame_matches_prices_to_df(self):
+        """Test that to_frame builds the same DataFrame as converting Price models."""
+        prices = _prices("2024-01-03", "2024-01-02")
+        series = PriceSeries.from_prices(prices)
+
+        pd.testing.assert_frame_equal(series.to_frame(), prices_to_df(prices))
+        assert series.to_frame()["volume"].dtype == np.int64
+
+    def test_slicing_and_frames_share_memory(self):
+        """Test that date slices and frames are views of the same arrays."""
+        series = PriceSeries.from_prices(_prices("2024-01-02", "2024-01-03", "2024-01-04"))
+
+        sliced = series.slice("2024-01-03", "2024-01-31")
+        assert sliced.time.tolist() == ["2024-01-03T05:00:00Z", "2024-01-04T05:00:00Z"]
+        assert np.shares_memory(sliced.close, series.close)
+        assert np.shares_memory(sliced.to_frame()["close"].to_numpy(), series.close)
+        assert len(series.slice("2024-02-01", "2024-02-28")) == 0
+
+    def test_merge_replaces_bars_with_the_same_time(self):
+        """Test that merging keeps bars sorted and lets newer bars win."""
+        cached = PriceSeries.from_prices(_prices("2024-01-02", "2024-01-04"))
+        merged = cached.merge(PriceSeries.from_prices(_prices("2024-01-03", "2024-01-04", close=2.0)))
+
+        assert [time[:10] for time in merged.time] == ["2024-01-02", "2024-01-03", "2024-01-04"]
+        assert merged.close.tolist() == [1.0, 2.0, 2.0]
+
+    def test_empty_series(self):
+        """Test that an empty series is falsy and converts to an empty frame."""
+        series = PriceSeries.from_prices([])
+
+        assert not series
+        assert series.to_frame().empty
+        assert series.to_prices() == []
@@ -0,0 +1,68 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.tools import api
+from src.tools.single_flight import SingleFlight
+from tests.helpers import api_response
+
+
+class TestSingleFlight:
+    """Test suite for single-flight request deduplication."""
+
+    def _run_concurrently(self, func, count=5):
+        barrier = threading.Barrier(count)
+        results = [None] * count
+
+        def worker(i):
+            barrier.wait()
+            results[i] = func()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers arriving during a call get its result instead of calling again."""
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+
+        results = self._run_concurrently(lambda: flight.do("key", slow))
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert flight.in_flight() == 0
+
+    def test_errors_are_shared_and_not_cached(self):
+        """Test that a failing call raises for its waiters and the next call runs again."""
+        flight = SingleFlight()
+
+        with pytest.raises(ValueError):
+            flight.do("key", Mock(side_effect=ValueError("boom")))
+
+        assert flight.do("key", lambda: "ok") == "ok"
+
+    @patch("src.tools.api._make_api_request")
+    def test_identical_api_calls_hit_the_api_once(self, mock_request, api_cache):
+        """Test that concurrent identical get_financial_metrics calls make one request."""
+
+        def respond(url, headers):
+            time.sleep(0.05)
+            return api_response({"financial_metrics": []})
+
+        mock_request.side_effect = respond
+
+        results = self._run_concurrently(lambda: api.get_financial_metrics("MSFT", "2024-01-02", limit=10))
+
+        assert mock_request.call_count == 1
+        assert results == [[]] * 5
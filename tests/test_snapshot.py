@@ -0,0 +1,92 @@
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from src.data.cache import Cache
+from src.tools import api
+from tests.helpers import price_row
+
+
+def _agent_calls():
+    return (
+        api.get_prices("AAPL", "2024-01-01", "2024-03-31"),
+        api.get_financial_metrics("AAPL", "2024-03-31", period="ttm", limit=5),
+        api.search_line_items("AAPL", ["revenue", "outstanding_shares"], "2024-03-31", period="annual", limit=5),
+        api.get_insider_trades("AAPL", "2024-03-31", start_date="2024-01-01"),
+        api.get_company_news("AAPL", "2024-03-31", start_date="2024-03-01"),
+        api.get_market_cap("AAPL", "2024-03-28"),
+    )
+
+
+class TestSnapshot:
+    """Test suite for exporting and loading offline dataset bundles."""
+
+    def test_bundle_replays_a_run_without_the_api(self, mock_server, tmp_path):
+        """Test that a run's data exported to a bundle answers the same calls offline."""
+        path = str(tmp_path / "snapshot.zip")
+        with patch.object(api, "_cache", Cache(store=None)):
+            online = _agent_calls()
+            manifest = api._cache.export_snapshot(path)
+
+        assert manifest["tickers"] == ["AAPL"]
+        assert {"prices", "financial_metrics", "line_items", "insider_trades", "company_news"} <= set(manifest["datasets"])
+        assert {"manifest.json", "prices.npz", "company_news.json"} <= set(zipfile.ZipFile(path).namelist())
+
+        cache = Cache(store=None)
+        cache.load_snapshot(path)
+        with patch.object(api, "_cache", cache), patch.object(api, "_make_api_request", side_effect=AssertionError("API used offline")):
+            offline = _agent_calls()
+
+        assert offline == online
+
+    def test_export_can_be_limited_to_tickers(self, tmp_path):
+        """Test that only the entries of the requested tickers are exported."""
+        cache = Cache(store=None)
+        cache.set_financial_metrics("AAPL_ttm", [], "2024-01-31", 10)
+        cache.set_financial_metrics("MSFT_ttm", [], "2024-01-31", 10)
+
+        manifest = cache.export_snapshot(str(tmp_path / "snapshot.zip"), ["MSFT"])
+
+        assert manifest["tickers"] == ["MSFT"]
+        assert manifest["datasets"] == {"financial_metrics": 1}
+
+    def test_loaded_data_never_expires(self, tmp_path):
+        """Test that live ranges in a bundle are frozen instead of expiring."""
+        path = str(tmp_path / "snapshot.zip")
+        cache = Cache(store=None)
+        cache.set_company_news("AAPL", [{"ticker": "AAPL", "title": "t", "author": "a", "source": "s", "date": "2024-01-02", "url": "u"}], start_date="2024-01-01", end_date="2024-01-02", ttl=60)
+        cache.set_company_facts("AAPL", {"ticker": "AAPL", "name": "Apple", "market_cap": 100.0})
+        cache.export_snapshot(path)
+
+        loaded = Cache(store=None)
+        loaded.load_snapshot(path)
+        with patch("src.data.cache.time.time", return_value=time.time() + 365 * 24 * 3600):
+            assert len(loaded.get_company_news("AAPL", "2024-01-02", start_date="2024-01-01")) == 1
+            assert loaded.get_company_facts("AAPL")[0].market_cap == 100.0
+
+    def test_loaded_entries_win_over_the_store(self, store, tmp_path):
+        """Test that a shared store's copy of an entry never replaces the one loaded from a snapshot."""
+        path = str(tmp_path / "snapshot.zip")
+        recorded = Cache(store=None)
+        recorded.set_prices("AAPL", [price_row("2024-01-02", 100.0)], start_date="2024-01-01", end_date="2024-01-05")
+        recorded.export_snapshot(path)
+        Cache(store=store).set_prices("AAPL", [price_row("2024-01-02", 1.0)], start_date="2024-01-01", end_date="2024-01-05")
+
+        cache = Cache(store=store)
+        cache.load_snapshot(path)
+        with patch.object(api, "_cache", cache), patch.object(api, "_make_api_request", side_effect=AssertionError("API used offline")):
+            assert [price.close for price in api.get_prices("AAPL", "2024-01-01", "2024-01-05")] == [100.0]
+
+        cache.set_prices("AAPL", [price_row("2024-01-09", 2.0)], start_date="2024-01-06", end_date="2024-01-12")
+        assert [price.close for price in cache.get_prices("AAPL", "2024-01-01", "2024-01-12").to_prices()] == [100.0, 2.0]
+
+    def test_unknown_versions_are_rejected(self, tmp_path):
+        """Test that bundles of another format version fail loudly instead of loading partially."""
+        path = tmp_path / "snapshot.zip"
+        with zipfile.ZipFile(path, "w") as bundle:
+            bundle.writestr("manifest.json", '{"format": "ai-hedge-fund-snapshot", "version": 99}')
+
+        with pytest.raises(ValueError, match="version 99"):
+            Cache(store=None).load_snapshot(str(path))
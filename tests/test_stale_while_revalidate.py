@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+from src.data.cache import LIVE_DATA_TTLS, STALE_WHILE_REVALIDATE, Cache
+from src.data.stats import track_data_age
+from src.tools import api
+from tests.helpers import api_response, news_row, price_row
+
+
+def _prices(day, close):
+    return api_response({"ticker": "AAPL", "prices": [price_row(day, close)]})
+
+
+def _company_facts(market_cap):
+    return api_response({"company_facts": {"ticker": "AAPL", "name": "Apple", "market_cap": market_cap}})
+
+
+class TestStaleWhileRevalidate:
+    """Test suite for serving expired live data while it is refreshed in the background."""
+
+    @patch("src.data.cache.time.time", return_value=1000.0)
+    @patch("src.tools.api._make_api_request")
+    def test_expired_live_prices_are_served_while_refreshing(self, mock_request, mock_time, api_cache):
+        """Test that prices within the stale budget are returned at once and replaced by a background fetch."""
+        today = api._today()
+        mock_request.return_value = _prices(today, 1.0)
+
+        with track_data_age() as ages:
+            api.get_prices("AAPL", today, today)
+
+            mock_time.return_value = 1000.0 + LIVE_DATA_TTLS["prices"] + 60
+            mock_request.return_value = _prices(today, 2.0)
+            assert api.get_prices("AAPL", today, today)[0].close == 1.0
+
+            api.wait_for_background_refreshes()
+            assert mock_request.call_count == 2
+            assert api.get_prices("AAPL", today, today)[0].close == 2.0
+
+        stats = api_cache.stats()["datasets"]["prices"]
+        assert (stats["stale_hits"], stats["refreshes"]) == (1, 1)
+        assert ages["prices"]["AAPL"] == {"age_seconds": LIVE_DATA_TTLS["prices"] + 60, "stale": True}
+
+    @patch("src.data.cache.time.time", return_value=1000.0)
+    @patch("src.tools.api._make_api_request")
+    def test_data_past_the_stale_budget_is_fetched_first(self, mock_request, mock_time, api_cache):
+        """Test that live data older than its stale budget is refetched before answering."""
+        today = api._today()
+        mock_request.return_value = _prices(today, 1.0)
+        api.get_prices("AAPL", today, today)
+
+        mock_time.return_value = 1000.0 + LIVE_DATA_TTLS["prices"] + STALE_WHILE_REVALIDATE["prices"] + 1
+        mock_request.return_value = _prices(today, 2.0)
+        assert api.get_prices("AAPL", today, today)[0].close == 2.0
+        assert api_cache.stats()["datasets"]["prices"]["refreshes"] == 0
+
+    @patch("src.data.cache.time.time", return_value=1000.0)
+    @patch("src.tools.api._make_api_request", return_value=_company_facts(100.0))
+    def test_company_facts_are_cached_and_revalidated(self, mock_request, mock_time, api_cache):
+        """Test that today's market cap comes from cached company facts, refreshed once they expire."""
+        today = api._today()
+        assert api.get_market_cap("AAPL", today) == 100.0
+        assert api.get_market_cap("AAPL", today) == 100.0
+        assert mock_request.call_count == 1
+
+        mock_time.return_value = 1000.0 + LIVE_DATA_TTLS["company_facts"] + 60
+        mock_request.return_value = _company_facts(200.0)
+        assert api.get_market_cap("AAPL", today) == 100.0
+
+        api.wait_for_background_refreshes()
+        assert api.get_market_cap("AAPL", today) == 200.0
+        assert mock_request.call_count == 2
+
+    def test_expired_ranges_are_kept_for_the_stale_budget(self):
+        """Test that stale reads only see ranges that expired within the allowed budget."""
+        cache = Cache(store=None)
+        with patch("src.data.cache.time.time", return_value=1000.0):
+            cache.set_company_news("AAPL", [news_row("2024-01-02")], start_date="2024-01-01", end_date="2024-01-02", ttl=60)
+
+        with patch("src.data.cache.time.time", return_value=1100.0):
+            assert cache.get_company_news("AAPL", "2024-01-02", "2024-01-01") is None
+            assert len(cache.get_events("company_news", "AAPL", "2024-01-02", "2024-01-01", max_stale=60)) == 1
+            assert cache.get_events("company_news", "AAPL", "2024-01-02", "2024-01-01", max_stale=30) is None
+            assert cache.live_data_age("company_news", "AAPL", "2024-01-01", "2024-01-02") == 100.0
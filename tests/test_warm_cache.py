@@ -0,0 +1,80 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.data.cache import LIVE_DATA_TTLS, live_data_ttl, seconds_through_next_trading_day
+from src.tools import api
+from src.tools.warm_cache import WARM_TASKS, read_tickers, warm_cache
+
+
+class TestWarmCache:
+    """Test suite for the universe cache warm-up command."""
+
+    def test_read_tickers(self, tmp_path):
+        """Test that ticker files accept lines, commas and comments, without duplicates."""
+        path = tmp_path / "universe.txt"
+        path.write_text("# large caps\naapl, msft\n\nNVDA  # chips\nAAPL\n")
+
+        assert read_tickers(str(path)) == ["AAPL", "MSFT", "NVDA"]
+
+    def test_warms_every_dataset_and_agent_calls_hit(self, mock_server, api_cache, tmp_path):
+        """Test that a warm-up fetches each dataset once so later agent calls are answered locally."""
+        logged = []
+        summary = warm_cache(["AAPL", "MSFT"], "2024-01-01", "2024-03-31", workers=4, state_file=str(tmp_path / "state.jsonl"), log=logged.append)
+
+        assert summary["fetched"] == 2 * len(WARM_TASKS)
+        assert summary["failed"] == 0
+        assert len(logged) == 2
+
+        served = mock_server.requests_served
+        api.get_prices("AAPL", "2024-02-01", "2024-02-29")
+        api.get_financial_metrics("MSFT", "2024-03-01", period="ttm", limit=5)
+        api.search_line_items("AAPL", ["revenue", "outstanding_shares"], "2024-03-31", period="annual", limit=5)
+        api.get_company_news("MSFT", "2024-03-31", start_date="2024-03-01")
+        assert mock_server.requests_served == served
+
+    def test_resumes_after_failures(self, mock_server, api_cache, tmp_path):
+        """Test that a rerun with the same state file only redoes unfinished work."""
+        state_file = str(tmp_path / "state.jsonl")
+
+        mock_server.error_rate = 1.0
+        first = warm_cache(["AAPL"], "2024-01-01", "2024-01-31", state_file=state_file, log=lambda line: None)
+        assert first["failed"] == len(WARM_TASKS)
+
+        mock_server.error_rate = 0.0
+        second = warm_cache(["AAPL"], "2024-01-01", "2024-01-31", state_file=state_file, log=lambda line: None)
+        assert (second["fetched"], second["skipped"]) == (len(WARM_TASKS), 0)
+
+        third = warm_cache(["AAPL"], "2024-01-01", "2024-01-31", state_file=state_file, log=lambda line: None)
+        assert (third["fetched"], third["skipped"]) == (0, len(WARM_TASKS))
+
+        other_dates = warm_cache(["AAPL"], "2024-02-01", "2024-02-29", state_file=state_file, log=lambda line: None)
+        assert other_dates["skipped"] == 0
+
+    def test_fundamentals_warmed_as_of_today_last_through_the_next_trading_day(self, mock_server, api_cache):
+        """Test that fundamentals warmed for today outlive the live TTL, so an evening warm-up serves the next morning."""
+        today = date.today()
+        started = time.time()
+        warm_cache(["AAPL"], (today - timedelta(days=7)).isoformat(), today.isoformat(), log=lambda line: None)
+
+        keys = [("financial_metrics", "AAPL_ttm"), ("financial_metrics", "AAPL_annual"), ("line_items", "AAPL_ttm"), ("line_items", "AAPL_annual")]
+        for dataset, key in keys:
+            assert api_cache._expires_at[(dataset, key)] == pytest.approx(started + seconds_through_next_trading_day(started), abs=60)
+        assert live_data_ttl("line_items", today.isoformat()) == LIVE_DATA_TTLS["line_items"]
+
+    def test_fundamentals_ttl_can_be_configured(self, mock_server, api_cache):
+        """Test that an explicit fundamentals_ttl sets how long warmed fundamentals stay fresh."""
+        today = date.today()
+        started = time.time()
+        warm_cache(["AAPL"], (today - timedelta(days=7)).isoformat(), today.isoformat(), fundamentals_ttl=3 * 24 * 60 * 60, log=lambda line: None)
+
+        assert api_cache._expires_at[("line_items", "AAPL_annual")] == pytest.approx(started + 3 * 24 * 60 * 60, abs=60)
+
+    def test_next_trading_day_skips_weekends(self):
+        """Test that the time left runs to the end of the next weekday."""
+        tuesday_evening = datetime(2024, 1, 2, 18).timestamp()
+        friday_evening = datetime(2024, 1, 5, 18).timestamp()
+
+        assert seconds_through_next_trading_day(tuesday_evening) == (24 + 6) * 60 * 60
+        assert seconds_through_next_trading_day(friday_evening) == (3 * 24 + 6) * 60 * 60